@@ -12,25 +12,30 @@ CREATE TABLE dim_time (
 );
 
 DROP TABLE IF EXISTS dim_borrower_segment;
+-- Surrogate ids are stable 63-bit hashes of the attribute combination (see surrogate_keys.py)
 CREATE TABLE dim_borrower_segment (
-  borrower_segment_id INT PRIMARY KEY,
+  borrower_segment_id BIGINT PRIMARY KEY,
   homeownership VARCHAR(50),
   verified_income VARCHAR(50),
   income_band VARCHAR(20),
   emp_length_bucket VARCHAR(20),
-  state VARCHAR(10)
+  state VARCHAR(10),
+  INDEX idx_seg_income (income_band)
 );
 
 DROP TABLE IF EXISTS dim_loan_product;
 CREATE TABLE dim_loan_product (
-  loan_product_id INT PRIMARY KEY,
+  loan_product_id BIGINT PRIMARY KEY,
   loan_purpose VARCHAR(100),
   term VARCHAR(20),
   term_bucket VARCHAR(10),
   grade VARCHAR(5),
   sub_grade VARCHAR(5),
+  risk_band VARCHAR(20),
   disbursement_method VARCHAR(50),
-  application_type VARCHAR(50)
+  application_type VARCHAR(50),
+  INDEX idx_prod_grade (grade),
+  INDEX idx_prod_purpose (loan_purpose)
 );
 
 -- 2) Facts
@@ -62,6 +67,9 @@ CREATE TABLE fact_complaints_by_product_month (
 DROP TABLE IF EXISTS fact_loans;
 CREATE TABLE fact_loans (
   issue_month_start DATE,
+  borrower_segment_id BIGINT,
+  loan_product_id BIGINT,
+
   loan_amount DECIMAL(14,2),
   interest_rate DECIMAL(6,3),
   installment DECIMAL(14,2),
@@ -70,27 +78,144 @@ CREATE TABLE fact_loans (
 
   high_risk_flag TINYINT,
   behavioral_risk_flag TINYINT,
-  risk_band VARCHAR(20),
-
-  income_band VARCHAR(20),
-  emp_length_bucket VARCHAR(20),
+  debt_to_income DECIMAL(8,3),
 
-  term VARCHAR(20),
-  term_bucket VARCHAR(10),
-  loan_purpose VARCHAR(100),
-  grade VARCHAR(5),
-  sub_grade VARCHAR(5),
+  INDEX idx_loans_month (issue_month_start),
+  INDEX idx_loans_status (loan_status),
+  INDEX idx_loans_segment (borrower_segment_id),
+  INDEX idx_loans_product (loan_product_id)
+);
 
-  homeownership VARCHAR(50),
-  verified_income VARCHAR(50),
-  debt_to_income DECIMAL(8,3),
+-- Month features (lags, rolling mean/std, 12m z-score, YoY / MoM deltas) precomputed by
+-- time_features.py; one row per loan-window month, joins 1:1 onto fact_loans.issue_month_start
+DROP TABLE IF EXISTS fact_macro_features_monthly;
+CREATE TABLE fact_macro_features_monthly (
+  month_start DATE PRIMARY KEY,
 
   unemployment_rate DECIMAL(6,3),
+  unemployment_rate_lag1 DOUBLE,
+  unemployment_rate_lag3 DOUBLE,
+  unemployment_rate_lag12 DOUBLE,
+  unemployment_rate_mean3m DOUBLE,
+  unemployment_rate_std3m DOUBLE,
+  unemployment_rate_mean12m DOUBLE,
+  unemployment_rate_std12m DOUBLE,
+  unemployment_rate_z12m DOUBLE,
+  unemployment_rate_yoy DOUBLE,
+  unemployment_rate_mom_change DOUBLE,
+  unemployment_rate_mom_pct DOUBLE,
+
   cpi_inflation_proxy DECIMAL(10,4),
+  cpi_inflation_proxy_lag1 DOUBLE,
+  cpi_inflation_proxy_lag3 DOUBLE,
+  cpi_inflation_proxy_lag12 DOUBLE,
+  cpi_inflation_proxy_mean3m DOUBLE,
+  cpi_inflation_proxy_std3m DOUBLE,
+  cpi_inflation_proxy_mean12m DOUBLE,
+  cpi_inflation_proxy_std12m DOUBLE,
+  cpi_inflation_proxy_z12m DOUBLE,
+  cpi_inflation_proxy_yoy DOUBLE,
+  cpi_inflation_proxy_mom_change DOUBLE,
+  cpi_inflation_proxy_mom_pct DOUBLE,
+
   fed_funds_rate_avg DECIMAL(6,3),
+  fed_funds_rate_avg_lag1 DOUBLE,
+  fed_funds_rate_avg_lag3 DOUBLE,
+  fed_funds_rate_avg_lag12 DOUBLE,
+  fed_funds_rate_avg_mean3m DOUBLE,
+  fed_funds_rate_avg_std3m DOUBLE,
+  fed_funds_rate_avg_mean12m DOUBLE,
+  fed_funds_rate_avg_std12m DOUBLE,
+  fed_funds_rate_avg_z12m DOUBLE,
+  fed_funds_rate_avg_yoy DOUBLE,
+  fed_funds_rate_avg_mom_change DOUBLE,
+  fed_funds_rate_avg_mom_pct DOUBLE,
 
-  INDEX idx_loans_month (issue_month_start),
-  INDEX idx_loans_status (loan_status),
-  INDEX idx_loans_grade (grade),
-  INDEX idx_loans_purpose (loan_purpose)
+  complaints_count INT,
+  complaints_count_lag1 DOUBLE,
+  complaints_count_lag3 DOUBLE,
+  complaints_count_lag12 DOUBLE,
+  complaints_count_mean3m DOUBLE,
+  complaints_count_std3m DOUBLE,
+  complaints_count_mean12m DOUBLE,
+  complaints_count_std12m DOUBLE,
+  complaints_count_z12m DOUBLE,
+  complaints_count_yoy DOUBLE,
+  complaints_count_mom_change DOUBLE,
+  complaints_count_mom_pct DOUBLE,
+
+  INDEX idx_macro_feat_month (month_start)
+);
+
+DROP TABLE IF EXISTS fact_complaint_features_by_product_month;
+CREATE TABLE fact_complaint_features_by_product_month (
+  month_start DATE,
+  product VARCHAR(100),
+  complaints_count INT,
+  complaints_count_lag1 DOUBLE,
+  complaints_count_lag3 DOUBLE,
+  complaints_count_lag12 DOUBLE,
+  complaints_count_mean3m DOUBLE,
+  complaints_count_std3m DOUBLE,
+  complaints_count_mean12m DOUBLE,
+  complaints_count_std12m DOUBLE,
+  complaints_count_z12m DOUBLE,
+  complaints_count_yoy DOUBLE,
+  complaints_count_mom_change DOUBLE,
+  complaints_count_mom_pct DOUBLE,
+  PRIMARY KEY (month_start, product),
+  INDEX idx_cmp_feat_prod (product)
+);
+
+-- Complaint early-warning scores (stress_signals.py): one row per month and segment
+-- (dimension = total / product / state), z-score against the EWMA seasonal baseline
+DROP TABLE IF EXISTS fact_stress_signals;
+CREATE TABLE fact_stress_signals (
+  month_start DATE,
+  dimension VARCHAR(20),
+  segment VARCHAR(100),
+  complaints_count INT,
+  expected_count DOUBLE,
+  baseline_std DOUBLE,
+  z_score DOUBLE,
+  is_anomaly TINYINT,
+  is_provisional TINYINT,
+  PRIMARY KEY (month_start, dimension, segment),
+  INDEX idx_stress_segment (dimension, segment)
+);
+
+DROP TABLE IF EXISTS fact_stress_signal_correlation;
+CREATE TABLE fact_stress_signal_correlation (
+  dimension VARCHAR(20),
+  segment VARCHAR(100),
+  lag_months INT,
+  n_months INT,
+  correlation DOUBLE,
+  PRIMARY KEY (dimension, segment, lag_months)
+);
+
+-- Hardship language in complaint narratives (narrative_index.py, hardship_terms.json):
+-- complaints mentioning each keyword / any keyword of a topic, per month and product
+DROP TABLE IF EXISTS fact_complaint_keywords_monthly;
+CREATE TABLE fact_complaint_keywords_monthly (
+  month_start DATE,
+  product VARCHAR(100),
+  topic VARCHAR(50),
+  keyword VARCHAR(100),
+  complaint_count INT,
+  mention_count INT,
+  PRIMARY KEY (month_start, product, keyword),
+  INDEX idx_kw_topic (topic, month_start)
+);
+
+DROP TABLE IF EXISTS fact_complaint_topics_monthly;
+CREATE TABLE fact_complaint_topics_monthly (
+  month_start DATE,
+  product VARCHAR(100),
+  topic VARCHAR(50),
+  complaint_count INT,
+  narratives_count INT,
+  topic_share DOUBLE,
+  PRIMARY KEY (month_start, product, topic),
+  INDEX idx_topic_month (topic, month_start)
 );
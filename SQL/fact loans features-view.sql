@@ -0,0 +1,24 @@
+-- vw_fact_loans plus the precomputed month features of the issue month. The features
+-- table has one row per month_start (its primary key), so the join never adds rows.
+CREATE OR REPLACE VIEW vw_fact_loans_features AS
+SELECT
+  l.*,
+  f.unemployment_rate_lag3,
+  f.unemployment_rate_lag12,
+  f.unemployment_rate_mean12m,
+  f.unemployment_rate_z12m,
+  f.unemployment_rate_yoy,
+  f.cpi_inflation_proxy_lag12,
+  f.cpi_inflation_proxy_z12m,
+  f.cpi_inflation_proxy_yoy,
+  f.fed_funds_rate_avg_lag3,
+  f.fed_funds_rate_avg_lag12,
+  f.fed_funds_rate_avg_z12m,
+  f.fed_funds_rate_avg_yoy,
+  f.complaints_count AS complaints_count_month,
+  f.complaints_count_mean3m,
+  f.complaints_count_z12m,
+  f.complaints_count_yoy
+FROM vw_fact_loans l
+LEFT JOIN fact_macro_features_monthly f
+  ON f.month_start = l.issue_month_start;
@@ -0,0 +1,33 @@
+-- Loan-level view with segment/product attributes and macro context resolved through
+-- the dims; same columns as the former wide fact_loans table.
+CREATE OR REPLACE VIEW vw_fact_loans AS
+SELECT
+  l.issue_month_start,
+  l.loan_amount,
+  l.interest_rate,
+  l.installment,
+  l.balance,
+  l.loan_status,
+  l.high_risk_flag,
+  l.behavioral_risk_flag,
+  p.risk_band,
+  b.income_band,
+  b.emp_length_bucket,
+  p.term,
+  p.term_bucket,
+  p.loan_purpose,
+  p.grade,
+  p.sub_grade,
+  b.homeownership,
+  b.verified_income,
+  l.debt_to_income,
+  m.unemployment_rate,
+  m.cpi_inflation_proxy,
+  m.fed_funds_rate_avg
+FROM fact_loans l
+LEFT JOIN dim_borrower_segment b
+  ON b.borrower_segment_id = l.borrower_segment_id
+LEFT JOIN dim_loan_product p
+  ON p.loan_product_id = l.loan_product_id
+LEFT JOIN fact_macro_monthly m
+  ON m.month_start = l.issue_month_start;
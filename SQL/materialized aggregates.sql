@@ -0,0 +1,56 @@
+USE credit_risk_analytics;
+
+-- Summary tables behind vw_portfolio_monthly, vw_risk_by_product and vw_risk_by_segment.
+-- Populated by the Python pipeline (aggregates.py / db_loader.py); each load only
+-- replaces the months it touched, so views no longer re-scan fact_loans.
+
+DROP TABLE IF EXISTS agg_portfolio_monthly;
+CREATE TABLE agg_portfolio_monthly (
+  month_start DATE,
+  year INT,
+  month INT,
+  loan_count INT,
+  total_exposure DECIMAL(18,2),
+  high_risk_exposure DECIMAL(18,2),
+  high_risk_exposure_pct DECIMAL(8,4),
+  avg_interest_rate DECIMAL(6,3),
+  behavioral_risk_rate DECIMAL(8,4),
+  unemployment_rate DECIMAL(6,3),
+  cpi_proxy DECIMAL(10,4),
+  fed_funds_rate DECIMAL(6,3),
+  INDEX idx_aggp_month (month_start)
+);
+
+DROP TABLE IF EXISTS agg_risk_by_product;
+CREATE TABLE agg_risk_by_product (
+  month_start DATE,
+  loan_purpose VARCHAR(100),
+  term_bucket VARCHAR(10),
+  grade VARCHAR(7),
+  loan_count INT,
+  exposure DECIMAL(18,2),
+  avg_interest_rate DECIMAL(6,3),
+  high_risk_rate DECIMAL(8,4),
+  behavioral_risk_rate DECIMAL(8,4),
+  high_risk_exposure DECIMAL(18,2),
+  INDEX idx_aggprod_month (month_start),
+  INDEX idx_aggprod_grade (grade)
+);
+
+DROP TABLE IF EXISTS agg_risk_by_segment;
+CREATE TABLE agg_risk_by_segment (
+  month_start DATE,
+  income_band VARCHAR(20),
+  emp_length_bucket VARCHAR(20),
+  homeownership VARCHAR(50),
+  verified_income VARCHAR(50),
+  grade VARCHAR(7),
+  loan_count INT,
+  exposure DECIMAL(18,2),
+  avg_interest_rate DECIMAL(6,3),
+  high_risk_rate DECIMAL(8,4),
+  behavioral_risk_rate DECIMAL(8,4),
+  high_risk_exposure DECIMAL(18,2),
+  INDEX idx_aggseg_month (month_start),
+  INDEX idx_aggseg_grade (grade)
+);
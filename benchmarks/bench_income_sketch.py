@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+from functools import reduce
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from income_bands import fit_cut_points  # noqa: E402
+from loan_features import income_band  # noqa: E402
+from quantile_sketch import QuantileSketch  # noqa: E402
+
+# -----------------------------
+# Sketch cut points vs exact pd.qcut (income_band)
+# -----------------------------
+def synthetic_incomes(n: int, rounded: bool, seed: int = 0) -> pd.Series:
+    """Log-normal incomes; rounded=True snaps them to $1,000 like most reported incomes."""
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(mean=11.0, sigma=0.6, size=n)
+    if rounded:
+        income = np.round(income, -3)
+    income[rng.random(n) < 0.01] = np.nan
+    return pd.Series(income)
+
+def sketch_partitions(income: pd.Series, partitions: int, alpha: float, max_exact: int) -> QuantileSketch:
+    """One sketch per partition, merged as the partitioned engine does."""
+    values = income.to_numpy(dtype=float)
+    sketches = [QuantileSketch(alpha, max_exact).update(part) for part in np.array_split(values, partitions)]
+    return reduce(QuantileSketch.merge, sketches, QuantileSketch(alpha, max_exact))
+
+def compare(income: pd.Series, exact_bands: pd.Series, exact_bins: list[float],
+            alpha: float, max_exact: int, partitions: int) -> dict:
+    t0 = time.perf_counter()
+    sketch = sketch_partitions(income, partitions, alpha, max_exact)
+    bins = fit_cut_points(sketch)
+    fit_s = time.perf_counter() - t0
+
+    # Merge order / partitioning must not change the cut points
+    one_pass = fit_cut_points(QuantileSketch(alpha, max_exact).update(income.to_numpy(dtype=float)))
+    bands, _ = income_band(income, bins)
+    inner = slice(1, -1)
+    rel_err = np.abs(np.array(bins[inner]) - np.array(exact_bins[inner])) / np.array(exact_bins[inner])
+    return {
+        "mode": "exact" if sketch.exact else "buckets",
+        "alpha": alpha,
+        "fit_s": round(fit_s, 3),
+        "sketch_kb": round(sketch.nbytes / 1024, 1),
+        "max_rel_err_pct": round(100 * float(rel_err.max()), 4),
+        "band_diff_pct": round(100 * float((bands.astype(object) != exact_bands.astype(object))[income.notna()].mean()), 4),
+        "merge_stable": bool(np.allclose(bins, one_pass, rtol=0, atol=0)),
+    }
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy of sketch-fitted income bands against exact pd.qcut.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--alphas", type=float, nargs="+", default=[0.01, 0.001, 0.0001])
+    args = parser.parse_args()
+
+    results = []
+    for rounded in (True, False):
+        income = synthetic_incomes(args.rows, rounded)
+        t0 = time.perf_counter()
+        exact_bands, exact_bins = pd.qcut(income, q=4, labels=["Low", "Lower-Mid", "Upper-Mid", "High"], retbins=True)
+        exact_s = time.perf_counter() - t0
+        data = "rounded" if rounded else "continuous"
+        print(f"{data}: {income.nunique():,} distinct incomes, exact qcut {exact_s:.3f}s "
+              f"({income.memory_usage(deep=True) / 1e6:.1f} MB column)")
+
+        # Default sketch (exact while distinct values are few), then forced bucket mode per alpha
+        runs = [(QuantileSketch().alpha, QuantileSketch().max_exact)] + [(a, 0) for a in args.alphas]
+        for alpha, max_exact in runs:
+            results.append({"data": data, "max_exact": max_exact,
+                            **compare(income, exact_bands, list(exact_bins), alpha, max_exact, args.partitions)})
+
+    report = pd.DataFrame(results)
+    print("\n===== SKETCH vs EXACT QCUT =====")
+    print(report.to_string(index=False))
+    if not report["merge_stable"].all():
+        print("\nWARNING: partitioned merge gave different cut points than a single pass")
+        sys.exit(1)
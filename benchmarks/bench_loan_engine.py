@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from date_parsing import month_start, parse_dates  # noqa: E402
+from loan_features import engineer_features, fit_income_bins  # noqa: E402
+from partitioned_engine import (concat_partitions, loans_features_partition, map_partitions,  # noqa: E402
+                                plan_partitions, scan_loans)
+from risk_rules import RiskRuleEngine  # noqa: E402
+from schemas import read_loans_csv  # noqa: E402
+
+# -----------------------------
+# pandas path vs partitioned engine (section-5 loan features)
+# -----------------------------
+def pandas_path(path: str, macro_monthly: pd.DataFrame) -> pd.DataFrame:
+    loans = read_loans_csv(path)
+    issue_month_dt = parse_dates(loans["issue_month"])
+    issue_months = pd.DataFrame({"issue_month_dt": issue_month_dt, "issue_month_start": month_start(issue_month_dt)})
+    loans, _ = engineer_features(loans, issue_months, macro_monthly, RiskRuleEngine.from_file())
+    return loans
+
+def partitioned_path(path: str, macro_monthly: pd.DataFrame, workers: int, partitions: int) -> pd.DataFrame:
+    parts = plan_partitions(path, partitions)
+    scan = scan_loans(parts, workers)
+    bins = fit_income_bins(scan["income"]) if scan["income"] is not None else None
+    return concat_partitions(map_partitions(loans_features_partition, parts, workers,
+                                            macro_monthly=macro_monthly, income_bins=bins))
+
+def assert_same(expected: pd.DataFrame, actual: pd.DataFrame):
+    """Same columns and values; dtypes may differ where partitions pin int columns to float64."""
+    assert list(expected.columns) == list(actual.columns), "column order differs"
+    for c in expected.columns:
+        e, a = expected[c], actual[c]
+        if isinstance(e.dtype, pd.CategoricalDtype) or isinstance(a.dtype, pd.CategoricalDtype):
+            e, a = e.astype(object), a.astype(object)
+        pd.testing.assert_series_equal(e, a, check_dtype=False, check_names=False, obj=c)
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time the partitioned loans engine against pandas.")
+    parser.add_argument("--loans", default=os.path.join("data", "raw", "loans_full_schema.csv"))
+    parser.add_argument("--macro", default=os.path.join("data", "analytics", "fact_macro_monthly.csv"),
+                        help="fact_macro_monthly.csv to join (skipped if missing)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--partitions", type=int, default=None, help="default: 4 x workers")
+    args = parser.parse_args()
+
+    if os.path.exists(args.macro):
+        macro = pd.read_csv(args.macro, parse_dates=["month_start"])
+    else:
+        macro = pd.DataFrame({"month_start": pd.to_datetime([])})
+
+    t0 = time.perf_counter()
+    expected = pandas_path(args.loans, macro)
+    t_pandas = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = partitioned_path(args.loans, macro, args.workers, args.partitions or 4 * args.workers)
+    t_part = time.perf_counter() - t0
+
+    assert_same(expected, actual)
+
+    print(f"===== LOAN ENGINE BENCHMARK ({len(expected):,} rows, {args.workers} worker(s)) =====")
+    print("outputs match: yes")
+    print(f"pandas (one frame, one core) : {t_pandas:8.3f}s")
+    print(f"partitioned (two passes)     : {t_part:8.3f}s  ({t_pandas / max(t_part, np.finfo(float).eps):5.1f}x)")
@@ -0,0 +1,89 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from synthetic_data import _companies, _zipf_p, complaints_chunk, parse_scale
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from narrative_index import NarrativeIndex, keyword_facts, load_topics  # noqa: E402
+
+# -----------------------------
+# Narrative index vs grepping the narrative column
+# -----------------------------
+def synthetic_complaints(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    companies = _companies()
+    company_p = _zipf_p(len(companies), 1.3)
+    raw = complaints_chunk(rng, n, 1, companies, company_p)
+    return pd.DataFrame({
+        "complaint_id": raw["Complaint ID"].astype("int64"),
+        "product": raw["Product"],
+        "month_start": pd.to_datetime(raw["Date received"]).dt.to_period("M").dt.to_timestamp(),
+        "complaint_narrative": raw["Consumer complaint narrative"],
+    })
+
+def grep_counts(complaints: pd.DataFrame, pattern: str) -> pd.DataFrame:
+    """What analysts did before: a case-insensitive substring scan over every narrative."""
+    hits = complaints["complaint_narrative"].str.contains(pattern, case=False, regex=False, na=False)
+    return complaints[hits].groupby(["month_start", "product"]).size().reset_index(name="complaint_count")
+
+def timed(fn, repeat: int = 5) -> tuple[float, object]:
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build / query times of the complaint narrative index.")
+    parser.add_argument("--rows", type=parse_scale, default=parse_scale("1m"), help="complaints, e.g. 200k / 1m")
+    parser.add_argument("--batches", type=int, default=4, help="incremental batches (one segment each)")
+    parser.add_argument("--phrases", nargs="+", default=["forbearance", "lost my job", "foreclosure", "hardship"])
+    args = parser.parse_args()
+
+    complaints = synthetic_complaints(args.rows)
+    n_text = int(complaints["complaint_narrative"].notna().sum())
+    print(f"{len(complaints):,} complaints, {n_text:,} with a narrative "
+          f"({complaints['complaint_narrative'].str.len().sum() / 1e6:,.0f} MB of text)")
+
+    path = tempfile.mkdtemp(prefix="narrative_index_")
+    try:
+        index = NarrativeIndex(path)
+        t0 = time.perf_counter()
+        for part in np.array_split(np.arange(len(complaints)), args.batches):
+            index.add(complaints.iloc[part])
+        build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index.compact()
+        compact_s = time.perf_counter() - t0
+        size_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 1e6
+        print(f"Index: built in {build_s:.1f}s ({n_text / build_s:,.0f} narratives/s, {args.batches} segments), "
+              f"compacted in {compact_s:.1f}s, {size_mb:,.1f} MB on disk")
+
+        # Re-open from disk: postings are memory-mapped, nothing is loaded up front
+        index = NarrativeIndex(path)
+        rows = []
+        for phrase in args.phrases:
+            index_s, counts = timed(lambda: index.counts([phrase]))
+            grep_s, grepped = timed(lambda: grep_counts(complaints, phrase), repeat=1)
+            rows.append({"phrase": phrase, "complaints": int(counts["complaint_count"].sum()),
+                         "grep_complaints": int(grepped["complaint_count"].sum()),
+                         "index_ms": round(1e3 * index_s, 2), "grep_ms": round(1e3 * grep_s, 1),
+                         "speedup": round(grep_s / index_s, 1)})
+        print("\n===== PHRASE COUNTS BY MONTH x PRODUCT =====")
+        print(pd.DataFrame(rows).to_string(index=False))
+        print("(stopwords are ignored by the index, so e.g. 'lost my job' also matches 'lost job')")
+
+        facts_s, (keywords, topics) = timed(lambda: keyword_facts(index, load_topics()), repeat=1)
+        print(f"\nkeyword_facts: {len(keywords):,} keyword rows, {len(topics):,} topic rows in {1e3 * facts_s:.0f} ms")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
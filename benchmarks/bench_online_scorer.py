@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from date_parsing import month_start, parse_dates  # noqa: E402
+from loan_features import engineer_features  # noqa: E402
+from online_scorer import LoanScorer  # noqa: E402
+from schemas import read_loans_csv  # noqa: E402
+from scoring_service import ScoringService  # noqa: E402
+
+# -----------------------------
+# Online scorer: parity with the batch features, latency and throughput
+# -----------------------------
+def check_parity(scorer: LoanScorer, loans: pd.DataFrame, records: list[dict]):
+    """score_frame == engineer_features (same cut points), and score() == score_records()."""
+    issue_month_dt = parse_dates(loans["issue_month"])
+    issue_months = pd.DataFrame({"issue_month_dt": issue_month_dt, "issue_month_start": month_start(issue_month_dt)})
+    expected, _ = engineer_features(loans.copy(), issue_months, scorer.macro.reset_index(), scorer.risk_rules,
+                                    scorer.income_bins)
+    actual = scorer.score_frame(loans)
+    for c in actual.columns:
+        e, a = expected[c].astype(object), actual[c].astype(object)
+        assert e.where(e.notna(), None).tolist() == a.where(a.notna(), None).tolist(), f"{c} differs from batch"
+    assert scorer.score_records(records) == [scorer.score(r) for r in records], "record and batch paths differ"
+
+def single_latency(scorer: LoanScorer, records: list[dict], n: int) -> dict:
+    times = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        scorer.score(records[i % len(records)])
+        times[i] = time.perf_counter() - t0
+    return {"p50_us": 1e6 * np.percentile(times, 50), "p99_us": 1e6 * np.percentile(times, 99)}
+
+def batch_throughput(scorer: LoanScorer, records: list[dict], size: int, min_records: int) -> float:
+    batches = [records[i:i + size] for i in range(0, len(records) - size + 1, size)] or [records[:size]]
+    scored = 0
+    t0 = time.perf_counter()
+    while scored < min_records:
+        for batch in batches:
+            scorer.score_records(batch)
+            scored += len(batch)
+    return scored / (time.perf_counter() - t0)
+
+# -----------------------------
+# HTTP round trips (service on a background event loop)
+# -----------------------------
+def start_service(scorer: LoanScorer) -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def run():
+        server = await asyncio.start_server(ScoringService(scorer).serve_connection, "127.0.0.1", port)
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True).start()
+    ready.wait()
+    return port
+
+def http_latency(port: int, records: list[dict], n: int, batch: int) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port)  # one kept-alive connection
+    path = "/score" if batch == 1 else "/score/batch"
+    bodies = [json.dumps(records[i % len(records)] if batch == 1 else records[i:i + batch])
+              for i in range(0, max(1, len(records) - batch), batch)][:n]
+    times = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        conn.request("POST", path, bodies[i % len(bodies)], {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        times.append(time.perf_counter() - t0)
+        assert response.status == 200, response.status
+    conn.close()
+    times = np.array(times)
+    return {"p50_ms": 1e3 * np.percentile(times, 50), "p99_ms": 1e3 * np.percentile(times, 99),
+            "records_per_s": batch * n / times.sum()}
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency / throughput of the online loan scorer and its HTTP service.")
+    parser.add_argument("--loans", default=os.path.join("data", "raw", "loans_full_schema.csv"))
+    parser.add_argument("--analytics-dir", default=os.path.join("data", "analytics"))
+    parser.add_argument("--rows", type=int, default=50_000, help="applications sampled from --loans")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256, 1024, 8192])
+    parser.add_argument("--requests", type=int, default=2000, help="HTTP requests per measurement")
+    parser.add_argument("--no-http", action="store_true")
+    args = parser.parse_args()
+
+    scorer = LoanScorer.from_artifacts(args.analytics_dir)
+    loans = read_loans_csv(args.loans).head(args.rows)
+    records = loans.astype(object).where(loans.notna(), None).to_dict("records")
+    print(f"{len(records):,} applications, income bands v{scorer.band_version}, rules {scorer.risk_rules.fingerprint}")
+
+    t0 = time.perf_counter()
+    check_parity(scorer, loans, records)
+    print(f"Parity with engineer_features and between record / batch paths: OK ({time.perf_counter() - t0:.1f}s)")
+
+    latency = single_latency(scorer, records, min(len(records), 100_000))
+    print(f"\nscore(): p50 {latency['p50_us']:.1f} us, p99 {latency['p99_us']:.1f} us per application")
+    t0 = time.perf_counter()
+    scorer.score_frame(loans)
+    print(f"score_frame(): {len(loans) / (time.perf_counter() - t0):,.0f} applications/s")
+
+    rows = [{"batch": size, "records_per_s": round(batch_throughput(scorer, records, size, max(20_000, size)))}
+            for size in args.batch_sizes]
+    print("\n===== score_records() THROUGHPUT =====")
+    print(pd.DataFrame(rows).to_string(index=False))
+
+    if not args.no_http:
+        port = start_service(scorer)
+        rows = [{"batch": size, **{k: round(v, 3) for k, v in http_latency(port, records, args.requests, size).items()}}
+                for size in args.batch_sizes if size <= 1024]
+        print("\n===== HTTP (keep-alive, one client) =====")
+        print(pd.DataFrame(rows).to_string(index=False))
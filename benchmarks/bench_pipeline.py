@@ -0,0 +1,140 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from synthetic_data import generate, parse_scale
+
+PIPELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning",
+                        "02_clean_feature_engineer.py")
+
+# -----------------------------
+# One pipeline run per scale
+# -----------------------------
+def run_pipeline(workdir: str, engine: str, workers: int, stages: list[str] | None) -> tuple[float, dict]:
+    """Run 02 with workdir as cwd (so data/raw is the synthetic set); return wall seconds and the run report."""
+    cmd = [sys.executable, PIPELINE, "--no-cache", "--engine", engine, "--workers", str(workers)]
+    for stage in stages or []:
+        cmd += ["--stage", stage]
+    before = set(glob.glob(os.path.join(workdir, "data", "run_reports", "run_*.json")))
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"pipeline failed in {workdir}:\n{proc.stdout[-2000:]}\n{proc.stderr[-4000:]}")
+
+    new = sorted(set(glob.glob(os.path.join(workdir, "data", "run_reports", "run_*.json"))) - before)
+    with open(new[-1]) as f:
+        return elapsed, json.load(f)
+
+def report_rows(report: dict, scale: str, loans: int) -> list[dict]:
+    rows = [{"scale": scale, "loans": loans, **{k: rec.get(k) for k in
+             ["stage", "wall_s", "cpu_s", "rows_in", "rows_out", "peak_rss_mb", "rss_growth_mb"]}}
+            for rec in report["stages"]]
+    # Stage peaks are cumulative for the process: a stage's own footprint is its growth; TOTAL carries the peak
+    rows.append({"scale": scale, "loans": loans, "stage": "TOTAL", "wall_s": report["total_wall_s"],
+                 "peak_rss_mb": report["peak_rss_mb"], "rss_growth_mb": report["peak_rss_mb"]})
+    return rows
+
+# -----------------------------
+# Trends and regressions
+# -----------------------------
+def scaling_exponents(results: pd.DataFrame) -> pd.DataFrame:
+    """Slope of log(wall_s) vs log(loans) between consecutive scales: ~1 is linear, >1.3 is a warning sign."""
+    wall = results.pivot_table(index="stage", columns="loans", values="wall_s", sort=False)
+    loans = np.array(wall.columns, dtype=float)
+    if len(loans) < 2:
+        return pd.DataFrame(index=wall.index)
+    # Stages under 50 ms are dominated by fixed overhead; their slope is noise
+    logs = np.log(wall.clip(lower=0.05).to_numpy())
+    slopes = np.diff(logs, axis=1) / np.diff(np.log(loans))
+    cols = [f"{a:,.0f}->{b:,.0f}" for a, b in zip(loans[:-1], loans[1:])]
+    return pd.DataFrame(np.round(slopes, 2), index=wall.index, columns=cols)
+
+def find_regressions(results: pd.DataFrame, baseline: pd.DataFrame, tolerance: float, min_delta_s: float,
+                     min_delta_mb: float) -> pd.DataFrame:
+    """Stages slower (or growing memory more) than the baseline at the same scale, beyond tolerance and an absolute floor."""
+    keys = ["loans", "stage"]
+    merged = results.merge(baseline[keys + ["wall_s", "rss_growth_mb"]], on=keys, suffixes=("", "_base"))
+    slow = ((merged["wall_s"] > merged["wall_s_base"] * (1 + tolerance))
+            & (merged["wall_s"] - merged["wall_s_base"] > min_delta_s))
+    heavy = ((merged["rss_growth_mb"] > merged["rss_growth_mb_base"] * (1 + tolerance))
+             & (merged["rss_growth_mb"] - merged["rss_growth_mb_base"] > min_delta_mb))
+    out = merged[slow | heavy].copy()
+    out["wall_ratio"] = (out["wall_s"] / out["wall_s_base"]).round(2)
+    return out[["scale", "stage", "wall_s_base", "wall_s", "wall_ratio", "rss_growth_mb_base", "rss_growth_mb"]]
+
+def load_results(path: str) -> pd.DataFrame:
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)["rows"])
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every stage of 02 at several data scales and track time / memory.")
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k", "1m"], help="loan rows, e.g. 10k 1m 10m 50m")
+    parser.add_argument("--complaints-per-loan", type=float, default=1.0)
+    parser.add_argument("--loan-months", type=int, default=3)
+    parser.add_argument("--engine", choices=["pandas", "partitioned"], default="pandas")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stage", action="append", dest="stages", metavar="NAME", help="only this stage and its inputs")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "credit_risk_bench"),
+                        help="synthetic data per scale is generated once here and reused")
+    parser.add_argument("--save", help="write this run's results (JSON) for use as a later --baseline")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    parser.add_argument("--min-delta-s", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    parser.add_argument("--min-delta-mb", type=float, default=64, help="ignore memory growth smaller than this")
+    args = parser.parse_args()
+
+    rows = []
+    for scale in args.scales:
+        loans = parse_scale(scale)
+        workdir = os.path.join(args.workdir, scale)
+        t0 = time.perf_counter()
+        generate(os.path.join(workdir, "data", "raw"), loans, int(loans * args.complaints_per_loan), args.loan_months)
+        gen_s = time.perf_counter() - t0
+        elapsed, report = run_pipeline(workdir, args.engine, args.workers, args.stages)
+        print(f"{scale:>6}: generate {gen_s:7.1f}s | pipeline {elapsed:7.1f}s | peak RSS {report['peak_rss_mb']:8.1f} MB")
+        rows += report_rows(report, scale, loans)
+
+    results = pd.DataFrame(rows)
+    order = list(dict.fromkeys(results["stage"]))
+    header = f"(engine={args.engine}, workers={args.workers})"
+
+    print(f"\n===== WALL SECONDS BY STAGE {header} =====")
+    print(results.pivot_table(index="stage", columns="scale", values="wall_s", sort=False)
+          .reindex(index=order, columns=args.scales).round(3).to_string())
+    print("\n===== RSS GROWTH MB BY STAGE (TOTAL = process peak) =====")
+    print(results.pivot_table(index="stage", columns="scale", values="rss_growth_mb", sort=False)
+          .reindex(index=order, columns=args.scales).round(1).to_string())
+    exponents = scaling_exponents(results)
+    if exponents.shape[1]:
+        print("\n===== SCALING EXPONENT (log time / log rows) =====")
+        print(exponents.reindex(order).to_string())
+
+    if args.save:
+        meta = {"engine": args.engine, "workers": args.workers, "stages": args.stages, "python": platform.python_version(),
+                "pandas": pd.__version__, "cpus": os.cpu_count(), "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "rows": rows}, f, indent=2, default=float)
+        print(f"\nSaved results: {args.save}")
+
+    if args.baseline:
+        regressions = find_regressions(results, load_results(args.baseline), args.tolerance,
+                                       args.min_delta_s, args.min_delta_mb)
+        print(f"\n===== REGRESSIONS vs {args.baseline} (tolerance {args.tolerance:.0%}) =====")
+        if regressions.empty:
+            print("none")
+        else:
+            print(regressions.to_string(index=False))
+            sys.exit(1)
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from scenarios import ScenarioModel  # noqa: E402
+
+# -----------------------------
+# Synthetic fact_loans with product attributes
+# -----------------------------
+GRADES = np.array(list("ABCDEFG"), dtype=object)
+BANDS = {"A": "Low", "B": "Low", "C": "Medium", "D": "High", "E": "High", "F": "High", "G": "High"}
+PURPOSES = np.array(["debt_consolidation", "credit_card", "other", "home_improvement", "house",
+                     "small_business", "car", "medical"], dtype=object)
+
+def synthetic_loans(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    grade = GRADES[rng.choice(len(GRADES), n, p=[0.25, 0.3, 0.2, 0.12, 0.08, 0.03, 0.02])]
+    dti = rng.gamma(4, 5, n)
+    dti[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        "grade": grade,
+        "risk_band": pd.Series(grade).map(BANDS).to_numpy(),
+        "loan_purpose": PURPOSES[rng.integers(0, len(PURPOSES), n)],
+        "loan_amount": rng.integers(1_000, 40_000, n).astype(float),
+        "interest_rate": rng.uniform(5, 30, n),
+        "debt_to_income": dti,
+    })
+
+# -----------------------------
+# Reference: one scenario at a time, straight from the hazard definition
+# -----------------------------
+def reference_ear(model: ScenarioModel, loans: pd.DataFrame, paths: np.ndarray) -> np.ndarray:
+    base_logit, beta, exposure = model.loan_arrays(loans)
+    out = np.empty(len(paths))
+    for s, path in enumerate(paths):
+        hazard = 1 / (1 + np.exp(-(base_logit[:, None] + beta @ path.T)))  # (loans, months)
+        out[s] = (exposure * (1 - np.prod(1 - hazard, axis=1))).sum()
+    return out
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scenario engine cost vs portfolio size.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--scenarios", type=int, default=500)
+    parser.add_argument("--chunk-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    model = ScenarioModel.from_file()
+    paths = model.monte_carlo_paths(args.scenarios)
+
+    check = synthetic_loans(2_000, seed=1)
+    expected = reference_ear(model, check, paths[:50])
+    actual = model.evaluate(check, paths[:50], chunk_bytes=1024 ** 2)["portfolio"]["all"]
+    np.testing.assert_allclose(actual, expected, rtol=1e-9)
+
+    print(f"===== SCENARIO ENGINE BENCHMARK ({args.scenarios} scenarios x {model.horizon} months) =====")
+    print("matches per-scenario reference: yes")
+    print(f"{'loans':>10} {'seconds':>9} {'ns / loan-scenario':>19}")
+    for n in args.rows:
+        loans = synthetic_loans(n)
+        t0 = time.perf_counter()
+        model.evaluate(loans, paths, chunk_bytes=args.chunk_mb * 1024 ** 2)
+        elapsed = time.perf_counter() - t0
+        print(f"{n:>10,} {elapsed:>9.2f} {elapsed / (n * args.scenarios) * 1e9:>19.1f}")
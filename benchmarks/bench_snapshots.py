@@ -0,0 +1,105 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from synthetic_data import _job_titles, _zipf_p, loan_months, loans_chunk, parse_scale
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from snapshots import Snapshot, write_snapshot  # noqa: E402
+
+# -----------------------------
+# Profiling loans from CSV vs the memory-mapped snapshot
+# -----------------------------
+COUNT_COLS = ["loan_status", "grade", "emp_length", "homeownership"]
+
+def synthetic_loans(n: int, n_months: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    titles = _job_titles()
+    loans = loans_chunk(rng, n, loan_months(n_months), titles, _zipf_p(len(titles)))
+    loans["issue_month_start"] = pd.to_datetime(loans["issue_month"], format="%b-%Y")
+    return loans
+
+def profile(loans: pd.DataFrame) -> dict:
+    """The checks 01_data_exploration.py runs: missing %, value counts, date range."""
+    return {
+        "missing_pct": loans.isna().mean() * 100,
+        **{c: loans[c].value_counts(dropna=False) for c in COUNT_COLS},
+        "date_range": (loans["issue_month_start"].min(), loans["issue_month_start"].max()),
+    }
+
+def profile_arrays(snap: Snapshot) -> dict:
+    """Same checks with the Snapshot helpers (codes / masks, no DataFrame)."""
+    return {
+        "missing_pct": snap.missing_pct(),
+        **{c: snap.value_counts(c) for c in COUNT_COLS},
+        "date_range": snap.date_range("issue_month_start"),
+    }
+
+def timed(fn, repeat: int = 3) -> tuple[float, object]:
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def _counts(counts: pd.Series) -> dict:
+    # Categorical value_counts also lists unused categories; NaN keys compare as "nan"
+    return {str(k): int(v) for k, v in counts.items() if v}
+
+def check_same(a: dict, b: dict):
+    assert np.allclose(a["missing_pct"].to_numpy(), b["missing_pct"][a["missing_pct"].index].to_numpy())
+    for c in COUNT_COLS:
+        assert _counts(a[c]) == _counts(b[c]), f"{c} counts differ"
+    assert a["date_range"] == b["date_range"]
+
+def dir_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 1e6
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile loans from CSV vs a memory-mapped columnar snapshot.")
+    parser.add_argument("--rows", type=parse_scale, default=parse_scale("2m"), help="loans, e.g. 500k / 2m")
+    parser.add_argument("--months", type=int, default=36)
+    args = parser.parse_args()
+
+    loans = synthetic_loans(args.rows, args.months)
+    path = tempfile.mkdtemp(prefix="snapshots_")
+    try:
+        csv_path = os.path.join(path, "loans.csv")
+        t0 = time.perf_counter()
+        loans.to_csv(csv_path, index=False)
+        csv_write_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        write_snapshot(loans, "loans", path)
+        snap_write_s = time.perf_counter() - t0
+        print(f"{len(loans):,} loans x {loans.shape[1]} columns: CSV {os.path.getsize(csv_path) / 1e6:,.0f} MB "
+              f"(written in {csv_write_s:.1f}s), snapshot {dir_mb(os.path.join(path, 'loans')):,.0f} MB "
+              f"(written in {snap_write_s:.1f}s)")
+
+        csv_s, from_csv = timed(lambda: profile(pd.read_csv(csv_path, parse_dates=["issue_month_start"])), repeat=1)
+        load_s, _ = timed(lambda: Snapshot("loans", path).to_frame())
+        frame_s, from_frame = timed(lambda: profile(Snapshot("loans", path).to_frame()))
+        arrays_s, from_arrays = timed(lambda: profile_arrays(Snapshot("loans", path)))
+        check_same(from_csv, from_frame)
+        check_same(from_csv, from_arrays)
+
+        rows = [
+            {"path": "read_csv + pandas profile", "seconds": round(csv_s, 3)},
+            {"path": "snapshot to_frame (zero-copy)", "seconds": round(load_s, 4)},
+            {"path": "snapshot to_frame + pandas profile", "seconds": round(frame_s, 3)},
+            {"path": "snapshot array helpers", "seconds": round(arrays_s, 3)},
+        ]
+        out = pd.DataFrame(rows)
+        out["speedup_vs_csv"] = (csv_s / out["seconds"]).round(1)
+        print("\n===== MISSING % / VALUE COUNTS / DATE RANGE =====")
+        print(out.to_string(index=False))
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,81 @@
+import argparse
+import copy
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
+from stress_signals import StressBaselines, update_stress_signals  # noqa: E402
+
+# -----------------------------
+# Synthetic complaint counts: seasonal Poisson series per product / state
+# -----------------------------
+def synthetic_counts(months: int, products: int, states: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    month_start = pd.date_range("2000-01-01", periods=months, freq="MS")
+    keys = [("product", f"product_{i}") for i in range(products)] + [("state", f"S{i:02d}") for i in range(states)]
+    base = rng.uniform(20, 2000, len(keys))
+    season = 1 + 0.15 * np.sin(2 * np.pi * (month_start.month.to_numpy() - 1) / 12)
+    lam = np.outer(season, base) * np.linspace(1, 1.5, months)[:, None]
+    counts = rng.poisson(lam)
+
+    return pd.DataFrame({
+        "month_start": np.repeat(month_start, len(keys)),
+        "dimension": np.tile([k[0] for k in keys], months),
+        "segment": np.tile([k[1] for k in keys], months),
+        "complaints_count": counts.ravel(),
+    })
+
+def timed(fn, *args, repeat: int = 3):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def full_rebuild(counts: pd.DataFrame):
+    return update_stress_signals(counts, StressBaselines())
+
+def one_month_update(counts: pd.DataFrame, baselines: StressBaselines):
+    # Baselines are mutated in place: every repeat starts from the same state
+    return update_stress_signals(counts, copy.deepcopy(baselines))
+
+def closed_rows(signals: pd.DataFrame) -> pd.DataFrame:
+    closed = signals[signals["is_provisional"] == 0]
+    return closed.sort_values(["month_start", "dimension", "segment"]).reset_index(drop=True)
+
+# -----------------------------
+# Run
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress-signal update cost per new month vs full recompute.")
+    parser.add_argument("--history", type=int, nargs="+", default=[60, 120, 240, 480], help="months already folded in")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--states", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    counts = synthetic_counts(max(args.history) + 2, args.products, args.states)
+    segments = args.products + args.states
+
+    print(f"===== STRESS SIGNAL BENCHMARK ({segments} segments) =====")
+    print(f"{'history':>8} {'full (s)':>10} {'+1 month (s)':>13} {'speedup':>8}")
+    for history in args.history:
+        months = counts["month_start"].drop_duplicates().iloc[:history + 2]
+        # state after `history` closed months (the next month was the open one)
+        _, baselines, _ = full_rebuild(counts[counts["month_start"] <= months.iloc[history]])
+        # a new month arrives: month `history` closes, month `history + 1` is the open one
+        upto = counts[counts["month_start"] <= months.iloc[history + 1]]
+
+        t_full, (expected, _, _) = timed(full_rebuild, upto, repeat=args.repeat)
+        t_inc, (actual, _, rebuilt) = timed(one_month_update, upto, baselines, repeat=args.repeat)
+
+        assert not rebuilt, "incremental update unexpectedly rebuilt the baselines"
+        inc = closed_rows(actual)
+        pd.testing.assert_frame_equal(inc, closed_rows(expected).iloc[-len(inc):].reset_index(drop=True),
+                                      check_dtype=False)
+        print(f"{history:>8} {t_full:>10.4f} {t_inc:>13.4f} {t_full / max(t_inc, np.finfo(float).eps):>7.1f}x")
+    print("incremental rows match full recompute: yes")
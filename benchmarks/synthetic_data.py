@@ -0,0 +1,347 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Synthetic raw inputs for 02_clean_feature_engineer.py
+# -----------------------------
+# Writes data/raw/ files with the same names, columns and value formats as the private
+# originals: loans_full_schema.csv (all 55 columns of the lending-club style export),
+# a CFPB complaints export and the FRED UNRATE / CPALTT01USM657N / DFF series.
+# Cardinalities follow the real files (50 states + DC, 7 grades / 35 sub-grades,
+# 12 purposes, thousands of employer titles and companies with Zipf-like frequencies),
+# so categorical, hashing and group-by costs scale like production. Rows are written
+# in chunks with a per-chunk seed: any scale up to tens of millions of rows is
+# generated in bounded memory and the output is reproducible.
+
+CHUNK_ROWS = 500_000
+PARAMS_FILE = "_synthetic.json"
+
+LOANS_FILE = "loans_full_schema.csv"
+COMPLAINTS_FILE = "complaints-2025-12-17_01_04.csv"
+
+STATES = ["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA", "NC", "MI", "NJ", "VA", "WA", "AZ", "MA",
+          "TN", "IN", "MO", "MD", "WI", "CO", "MN", "SC", "AL", "LA", "KY", "OR", "OK", "CT", "UT",
+          "IA", "NV", "AR", "MS", "KS", "NM", "NE", "ID", "WV", "HI", "NH", "ME", "MT", "RI", "DE",
+          "SD", "ND", "AK", "DC", "VT", "WY"]
+GRADES = list("ABCDEFG")
+GRADE_P = [0.16, 0.25, 0.25, 0.2, 0.11, 0.024, 0.006]
+GRADE_RATE = {"A": 6.0, "B": 10.0, "C": 14.0, "D": 19.0, "E": 24.0, "F": 27.5, "G": 30.0}
+PURPOSES = ["debt_consolidation", "credit_card", "other", "home_improvement", "major_purchase", "small_business",
+            "medical", "car", "house", "moving", "vacation", "renewable_energy"]
+PURPOSE_P = [0.51, 0.22, 0.09, 0.07, 0.03, 0.02, 0.02, 0.015, 0.01, 0.008, 0.005, 0.002]
+LOAN_STATUS = ["Current", "Fully Paid", "In Grace Period", "Late (31-120 days)", "Late (16-30 days)", "Charged Off"]
+LOAN_STATUS_P = [0.9375, 0.0447, 0.0067, 0.0066, 0.0038, 0.0007]
+
+JOB_TITLES = ["teacher", "manager", "registered nurse", "owner", "driver", "supervisor", "sales", "engineer",
+              "project manager", "director", "office manager", "general manager", "truck driver", "technician",
+              "accountant", "analyst", "operations manager", "police officer", "president", "attorney",
+              "administrative assistant", "mechanic", "nurse", "store manager", "consultant", "vice president",
+              "account manager", "software engineer", "electrician", "customer service", "pharmacist",
+              "paralegal", "physician", "social worker", "clerk", "cashier", "chef", "machine operator",
+              "warehouse associate", "branch manager", "professor", "firefighter", "controller", "bartender",
+              "server", "designer", "developer", "laborer", "realtor", "therapist"]
+JOB_PREFIXES = ["", "senior ", "lead ", "assistant ", "chief ", "staff ", "junior ", "principal "]
+JOB_DEPTS = ["", " - operations", " - sales", " - finance", " - it", " - hr", " - logistics", " - support",
+             " - marketing", " - research", " - production", " - quality"]
+
+PRODUCTS = {
+    "Credit reporting or other personal consumer reports": (0.46, ["Credit reporting", "Other personal consumer report"]),
+    "Credit reporting, credit repair services, or other personal consumer reports": (0.2, ["Credit reporting", "Credit repair services"]),
+    "Debt collection": (0.09, ["Other debt", "Credit card debt", "Medical debt", "I do not know", "Auto debt"]),
+    "Credit card or prepaid card": (0.04, ["General-purpose credit card or charge card", "Store credit card"]),
+    "Credit card": (0.04, ["General-purpose credit card or charge card", "Store credit card"]),
+    "Checking or savings account": (0.04, ["Checking account", "Savings account", "Other banking product or service"]),
+    "Mortgage": (0.04, ["Conventional home mortgage", "FHA mortgage", "VA mortgage", "Home equity loan or line of credit (HELOC)"]),
+    "Money transfer, virtual currency, or money service": (0.02, ["Domestic (US) money transfer", "Mobile or digital wallet", "Virtual currency"]),
+    "Vehicle loan or lease": (0.015, ["Loan", "Lease"]),
+    "Student loan": (0.012, ["Federal student loan servicing", "Private student loan"]),
+    "Payday loan, title loan, personal loan, or advance loan": (0.01, ["Installment loan", "Payday loan", "Personal line of credit"]),
+    "Bank account or service": (0.006, ["Checking account", "Savings account", "CD (Certificate of Deposit)"]),
+    "Consumer Loan": (0.004, ["Vehicle loan", "Installment loan"]),
+    "Prepaid card": (0.002, ["General-purpose prepaid card", "Gift card"]),
+    "Debt or credit management": (0.001, ["Debt settlement", "Credit repair services"]),
+}
+ISSUES = ["Incorrect information on your report", "Improper use of your report", "Problem with a company's investigation into an existing problem",
+          "Attempts to collect debt not owed", "Written notification about debt", "Managing an account", "Trouble during payment process",
+          "Problem with a purchase shown on your statement", "Struggling to pay mortgage", "Dealing with your lender or servicer",
+          "Fees or interest", "Closing an account", "Getting a credit card", "Fraud or scam", "Struggling to pay your loan",
+          "Communication tactics", "Took or threatened to take negative or legal action", "Applying for a mortgage or refinancing an existing mortgage",
+          "Managing the loan or lease", "Unable to get your credit report or credit score"]
+SUB_ISSUES = [None, "Information belongs to someone else", "Reporting company used your report improperly", "Account status incorrect",
+              "Debt is not yours", "Their investigation did not fix an error on your report", "Didn't receive enough information to verify debt",
+              "Problem with fees", "Card was charged for something you did not purchase with the card", "Frequent or repeated calls",
+              "Account information incorrect", "Credit inquiries on your report that you don't recognize", "Debt was paid"]
+NARRATIVE_SENTENCES = [
+    "I lost my job last month and cannot make the full payment.",
+    "I asked for forbearance but the servicer never responded.",
+    "There is an account on my credit report that does not belong to me.",
+    "The collection agency keeps calling me several times a day.",
+    "I was charged a late fee even though I paid on time.",
+    "My hours were reduced and I am struggling to pay my loan.",
+    "I disputed the information with the credit bureau and nothing was fixed.",
+    "This is a case of identity theft and I have filed a police report.",
+    "The company increased my interest rate without notice.",
+    "I am behind on my mortgage and facing foreclosure.",
+    "They reported my account as delinquent after I set up a payment plan.",
+    "I requested a hardship program and was denied.",
+    "My payment was applied to the wrong account.",
+    "I never received a written validation notice for this debt.",
+    "The bank closed my account and kept my funds.",
+    "I have medical bills that went to collections.",
+    "I want this inquiry removed from my credit file.",
+    "They refused to refund an unauthorized charge on my card.",
+]
+COMPANY_HEADS = ["EQUIFAX, INC.", "TRANSUNION INTERMEDIATE HOLDINGS, INC.", "Experian Information Solutions Inc.",
+                 "BANK OF AMERICA, NATIONAL ASSOCIATION", "WELLS FARGO & COMPANY", "JPMORGAN CHASE & CO.",
+                 "CAPITAL ONE FINANCIAL CORPORATION", "CITIBANK, N.A.", "SYNCHRONY FINANCIAL", "Navient Solutions, LLC."]
+N_COMPANIES = 6_000
+RESPONSES = ["Closed with explanation", "Closed with non-monetary relief", "In progress", "Closed with monetary relief",
+             "Untimely response", "Closed"]
+RESPONSES_P = [0.62, 0.22, 0.08, 0.06, 0.01, 0.01]
+SUBMITTED_VIA = ["Web", "Referral", "Phone", "Postal mail", "Fax", "Email", "Web Referral"]
+SUBMITTED_P = [0.86, 0.07, 0.03, 0.02, 0.005, 0.005, 0.01]
+CONSENT = ["Consent not provided", "Consent provided", "N/A", "Other", "Consent withdrawn", None]
+CONSENT_P = [0.45, 0.3, 0.1, 0.03, 0.01, 0.11]
+TAGS = [None, "Servicemember", "Older American", "Older American, Servicemember"]
+TAGS_P = [0.88, 0.07, 0.04, 0.01]
+COMPLAINTS_START, COMPLAINTS_END = "2011-12-01", "2025-12-17"
+
+def _zipf_p(n: int, s: float = 1.1) -> np.ndarray:
+    p = 1.0 / np.arange(1, n + 1) ** s
+    return p / p.sum()
+
+def _state_p() -> np.ndarray:
+    # Roughly population-shaped: big states first, long flat tail
+    p = np.linspace(3.0, 0.3, len(STATES)) ** 2
+    return p / p.sum()
+
+def _with_nan(rng, x: np.ndarray, p_null: float) -> np.ndarray:
+    x = x.astype(float)
+    x[rng.random(len(x)) < p_null] = np.nan
+    return x
+
+def _job_titles() -> np.ndarray:
+    return np.array([f"{p}{t}{d}" for t in JOB_TITLES for p in JOB_PREFIXES for d in JOB_DEPTS], dtype=object)
+
+def _companies() -> np.ndarray:
+    tail = [f"Company {i:05d} LLC" for i in range(N_COMPANIES - len(COMPANY_HEADS))]
+    return np.array(COMPANY_HEADS + tail, dtype=object)
+
+# -----------------------------
+# Loans
+# -----------------------------
+def loan_months(n_months: int, last_month: str = "2018-03-01") -> list[str]:
+    return list(pd.date_range(end=last_month, periods=n_months, freq="MS").strftime("%b-%Y"))
+
+def loans_chunk(rng: np.random.Generator, n: int, months: list[str], titles: np.ndarray, title_p: np.ndarray) -> pd.DataFrame:
+    grade = np.array(GRADES, dtype=object)[rng.choice(len(GRADES), n, p=GRADE_P)]
+    sub = rng.integers(1, 6, n)
+    rate = np.array([GRADE_RATE[g] for g in grade]) + (sub - 3) * 0.6 + rng.normal(0, 0.4, n)
+    term = rng.choice([36, 60], n, p=[0.57, 0.43])
+    amount = (rng.integers(40, 1601, n) * 25).astype(float)
+    r = rate / 1200
+    installment = amount * r / (1 - (1 + r) ** -term)
+    joint = rng.random(n) < 0.15
+    income = np.round(rng.lognormal(11.1, 0.6, n), -2)
+    income[rng.random(n) < 0.001] = 0
+    total_limit = np.round(rng.lognormal(11.8, 0.9, n))
+    paid_principal = np.round(amount * rng.uniform(0, 0.2, n), 2)
+    paid_interest = np.round(paid_principal * rate / 100 * rng.uniform(0.5, 2, n), 2)
+    late_fees = np.where(rng.random(n) < 0.01, np.round(rng.uniform(5, 60, n), 2), 0.0)
+    emp_title = titles[rng.choice(len(titles), n, p=title_p)]
+    emp_title[rng.random(n) < 0.08] = None
+    opened = rng.integers(2, 60, n)
+
+    return pd.DataFrame({
+        "emp_title": emp_title,
+        "emp_length": _with_nan(rng, rng.integers(0, 11, n), 0.08),
+        "state": np.array(STATES, dtype=object)[rng.choice(len(STATES), n, p=_state_p())],
+        "homeownership": rng.choice(["MORTGAGE", "RENT", "OWN"], n, p=[0.48, 0.39, 0.13]),
+        "annual_income": income,
+        "verified_income": rng.choice(["Source Verified", "Not Verified", "Verified"], n, p=[0.42, 0.36, 0.22]),
+        "debt_to_income": _with_nan(rng, np.round(rng.gamma(3.5, 5.5, n), 2), 0.002),
+        "annual_income_joint": np.where(joint, income + np.round(rng.lognormal(10.8, 0.6, n), -2), np.nan),
+        "verification_income_joint": np.where(joint, rng.choice(["Source Verified", "Not Verified", "Verified"], n), None),
+        "debt_to_income_joint": np.where(joint, np.round(rng.gamma(3.5, 4.5, n), 2), np.nan),
+        "delinq_2y": rng.poisson(0.2, n),
+        "months_since_last_delinq": _with_nan(rng, rng.integers(0, 120, n), 0.57),
+        "earliest_credit_line": rng.integers(1963, 2016, n),
+        "inquiries_last_12m": rng.poisson(1.9, n),
+        "total_credit_lines": opened,
+        "open_credit_lines": np.maximum(1, (opened * rng.uniform(0.2, 0.8, n)).astype(int)),
+        "total_credit_limit": total_limit,
+        "total_credit_utilized": np.round(total_limit * rng.beta(2, 5, n)),
+        "num_collections_last_12m": rng.poisson(0.01, n),
+        "num_historical_failed_to_pay": rng.poisson(0.17, n),
+        "months_since_90d_late": _with_nan(rng, rng.integers(0, 120, n), 0.77),
+        "current_accounts_delinq": rng.poisson(0.001, n),
+        "total_collection_amount_ever": np.where(rng.random(n) < 0.13, np.round(rng.lognormal(6.5, 1.2, n)), 0),
+        "current_installment_accounts": rng.poisson(2.7, n),
+        "accounts_opened_24m": rng.poisson(4.4, n),
+        "months_since_last_credit_inquiry": _with_nan(rng, rng.integers(0, 24, n), 0.13),
+        "num_satisfactory_accounts": np.maximum(1, (opened * 0.45).astype(int)),
+        "num_accounts_120d_past_due": np.where(rng.random(n) < 0.999, 0, rng.integers(1, 3, n)),
+        "num_accounts_30d_past_due": rng.poisson(0.002, n),
+        "num_active_debit_accounts": rng.poisson(3.6, n),
+        "total_debit_limit": np.round(rng.lognormal(10, 0.8, n), -2),
+        "num_total_cc_accounts": rng.poisson(13, n),
+        "num_open_cc_accounts": rng.poisson(8, n),
+        "num_cc_carrying_balance": rng.poisson(5, n),
+        "num_mort_accounts": rng.poisson(1.4, n),
+        "account_never_delinq_percent": np.round(np.clip(100 - rng.exponential(6, n), 14, 100), 1),
+        "tax_liens": rng.poisson(0.04, n),
+        "public_record_bankrupt": rng.poisson(0.12, n),
+        "loan_purpose": np.array(PURPOSES, dtype=object)[rng.choice(len(PURPOSES), n, p=PURPOSE_P)],
+        "application_type": np.where(joint, "joint", "individual"),
+        "loan_amount": amount.astype(int),
+        "term": term,
+        "interest_rate": np.round(np.clip(rate, 5.31, 30.94), 2),
+        "installment": np.round(installment, 2),
+        "grade": grade,
+        "sub_grade": np.char.add(grade.astype(str), sub.astype(str)),
+        "issue_month": np.array(months, dtype=object)[rng.integers(0, len(months), n)],
+        "loan_status": np.array(LOAN_STATUS, dtype=object)[rng.choice(len(LOAN_STATUS), n, p=LOAN_STATUS_P)],
+        "initial_listing_status": rng.choice(["whole", "fractional"], n, p=[0.82, 0.18]),
+        "disbursement_method": rng.choice(["Cash", "DirectPay"], n, p=[0.86, 0.14]),
+        "balance": np.round(amount - paid_principal, 2),
+        "paid_total": np.round(paid_principal + paid_interest + late_fees, 2),
+        "paid_principal": paid_principal,
+        "paid_interest": paid_interest,
+        "paid_late_fees": late_fees,
+    })
+
+# -----------------------------
+# Complaints (CFPB export)
+# -----------------------------
+def complaints_chunk(rng: np.random.Generator, n: int, first_id: int, companies: np.ndarray, company_p: np.ndarray) -> pd.DataFrame:
+    start, end = pd.Timestamp(COMPLAINTS_START), pd.Timestamp(COMPLAINTS_END)
+    days = (end - start).days
+    # Volume grows over time (density ~ e^(2.5 t)), as in the real export
+    t = np.log1p(rng.random(n) * (np.exp(2.5) - 1)) / 2.5
+    received = start + pd.to_timedelta((t * days).astype(int), unit="D")
+    sent = received + pd.to_timedelta(rng.integers(0, 15, n), unit="D")
+
+    names = list(PRODUCTS)
+    product_p = np.array([PRODUCTS[p][0] for p in names])
+    product_idx = rng.choice(len(names), n, p=product_p / product_p.sum())
+    sub_pick = rng.integers(0, 5, n)
+    sub_product = [PRODUCTS[names[i]][1][k % len(PRODUCTS[names[i]][1])] for i, k in zip(product_idx, sub_pick)]
+
+    has_text = rng.random(n) < 0.35
+    n_sent = rng.integers(1, 6, n)
+    sentences = np.array(NARRATIVE_SENTENCES, dtype=object)
+    narrative = np.full(n, None, dtype=object)
+    for i in np.flatnonzero(has_text):
+        narrative[i] = " ".join(sentences[rng.integers(0, len(sentences), n_sent[i])])
+
+    zip_code = np.char.zfill(rng.integers(0, 1000, n).astype(str), 3).astype(object) + "XX"
+    full_zip = rng.random(n) < 0.5
+    zip_code[full_zip] = np.char.zfill(rng.integers(500, 99951, full_zip.sum()).astype(str), 5)
+    zip_code[rng.random(n) < 0.01] = None
+    state = np.array(STATES + ["PR", "GU", "AE"], dtype=object)[rng.integers(0, len(STATES) + 3, n)]
+    state[rng.random(n) < 0.02] = None
+
+    return pd.DataFrame({
+        "Date received": received.strftime("%Y-%m-%d"),
+        "Product": np.array(names, dtype=object)[product_idx],
+        "Sub-product": sub_product,
+        "Issue": np.array(ISSUES, dtype=object)[rng.choice(len(ISSUES), n, p=_zipf_p(len(ISSUES), 0.9))],
+        "Sub-issue": np.array(SUB_ISSUES, dtype=object)[rng.integers(0, len(SUB_ISSUES), n)],
+        "Consumer complaint narrative": narrative,
+        "Company public response": np.where(rng.random(n) < 0.4, "Company has responded to the consumer and the CFPB and chooses not to provide a public response", None),
+        "Company": companies[rng.choice(len(companies), n, p=company_p)],
+        "State": state,
+        "ZIP code": zip_code,
+        "Tags": np.array(TAGS, dtype=object)[rng.choice(len(TAGS), n, p=TAGS_P)],
+        "Consumer consent provided?": np.array(CONSENT, dtype=object)[rng.choice(len(CONSENT), n, p=CONSENT_P)],
+        "Submitted via": np.array(SUBMITTED_VIA, dtype=object)[rng.choice(len(SUBMITTED_VIA), n, p=SUBMITTED_P)],
+        "Date sent to company": sent.strftime("%Y-%m-%d"),
+        "Company response to consumer": np.array(RESPONSES, dtype=object)[rng.choice(len(RESPONSES), n, p=RESPONSES_P)],
+        "Timely response?": np.where(rng.random(n) < 0.98, "Yes", "No"),
+        "Consumer disputed?": np.where(received < pd.Timestamp("2017-04-24"), rng.choice(["No", "Yes"], n, p=[0.8, 0.2]), "N/A"),
+        "Complaint ID": first_id + np.arange(n),
+    })
+
+# -----------------------------
+# FRED series
+# -----------------------------
+def fred_series(rng: np.random.Generator, start: str = "2000-01-01", end: str = COMPLAINTS_END) -> dict[str, pd.DataFrame]:
+    months = pd.date_range(start, end, freq="MS")
+    days = pd.date_range(start, end, freq="D")
+    unrate = np.clip(5 + np.cumsum(rng.normal(0, 0.15, len(months))), 3.4, 14.8)
+    cpi = rng.normal(0.2, 0.3, len(months))
+    dff_monthly = np.clip(2 + np.cumsum(rng.normal(0, 0.2, len(months))), 0.05, 6.5)
+    dff = np.clip(dff_monthly[np.searchsorted(months, days, side="right") - 1] + rng.normal(0, 0.02, len(days)), 0.04, 6.6)
+    return {
+        "UNRATE.csv": pd.DataFrame({"observation_date": months.strftime("%Y-%m-%d"), "UNRATE": np.round(unrate, 1)}),
+        "CPALTT01USM657N.csv": pd.DataFrame({"observation_date": months.strftime("%Y-%m-%d"), "CPALTT01USM657N": cpi}),
+        "DFF.csv": pd.DataFrame({"observation_date": days.strftime("%Y-%m-%d"), "DFF": np.round(dff, 2)}),
+    }
+
+# -----------------------------
+# Files
+# -----------------------------
+def _write_chunks(path: str, total: int, make_chunk, seed: int, chunk_rows: int = CHUNK_ROWS):
+    tmp = path + ".tmp"
+    for i, start in enumerate(range(0, total, chunk_rows)):
+        rng = np.random.default_rng([seed, i])
+        make_chunk(rng, min(chunk_rows, total - start), start).to_csv(tmp, mode="w" if i == 0 else "a",
+                                                                      header=i == 0, index=False)
+    os.replace(tmp, path)
+
+def generate(raw_dir: str, loans: int, complaints: int, n_loan_months: int = 3, seed: int = 0,
+             chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Write every raw file into raw_dir (skipped if the same parameters were generated there before)."""
+    params = {"loans": loans, "complaints": complaints, "loan_months": n_loan_months, "seed": seed}
+    params_path = os.path.join(raw_dir, PARAMS_FILE)
+    if os.path.exists(params_path):
+        with open(params_path) as f:
+            if json.load(f) == params:
+                return params
+    os.makedirs(raw_dir, exist_ok=True)
+
+    titles = _job_titles()
+    title_p = _zipf_p(len(titles))
+    months = loan_months(n_loan_months)
+    _write_chunks(os.path.join(raw_dir, LOANS_FILE), loans,
+                  lambda rng, n, _: loans_chunk(rng, n, months, titles, title_p), seed, chunk_rows)
+
+    companies = _companies()
+    company_p = _zipf_p(len(companies), 1.3)
+    _write_chunks(os.path.join(raw_dir, COMPLAINTS_FILE), complaints,
+                  lambda rng, n, start: complaints_chunk(rng, n, 1_000_000 + start, companies, company_p),
+                  seed + 1, chunk_rows)
+
+    for name, df in fred_series(np.random.default_rng(seed + 2)).items():
+        df.to_csv(os.path.join(raw_dir, name), index=False)
+
+    with open(params_path, "w") as f:
+        json.dump(params, f)
+    return params
+
+def parse_scale(value: str) -> int:
+    """'10k' -> 10_000, '1.5m' -> 1_500_000, '50M' -> 50_000_000."""
+    value = value.strip().lower().replace("_", "")
+    units = {"k": 1_000, "m": 1_000_000}
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+# -----------------------------
+# CLI
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic raw inputs for the pipeline.")
+    parser.add_argument("--out", default=os.path.join("data", "raw"))
+    parser.add_argument("--loans", type=parse_scale, default=parse_scale("10k"), help="e.g. 10k, 1m, 50m")
+    parser.add_argument("--complaints", type=parse_scale, default=None, help="default: same as --loans")
+    parser.add_argument("--loan-months", type=int, default=3, help="issue months (the real file has 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    params = generate(args.out, args.loans, args.complaints if args.complaints is not None else args.loans,
+                      args.loan_months, args.seed)
+    print(f"Synthetic raw files in {args.out}: {params}")
@@ -1,18 +1,33 @@
+import time
 import pandas as pd
 import numpy as np
 
+from loan_features import first_existing_col
+from snapshots import SNAPSHOT_DIR, Snapshot
+
 # -----------------------------
 # 1. Load Data
 # -----------------------------
 DATA_PATH = "data/raw/"
 
-loans = pd.read_csv(f"{DATA_PATH}loans_full_schema.csv")
-complaints = pd.read_csv(f"{DATA_PATH}complaints-2025-12-17_01_04.csv")
+# Profile the memory-mapped snapshots written by 02_clean_feature_engineer.py when they
+# exist (columns are mapped, not parsed, so repeated profiling of millions of rows takes
+# well under a second). Set to False to profile the raw CSVs instead.
+USE_SNAPSHOTS = True
+
+t0 = time.perf_counter()
+if USE_SNAPSHOTS and Snapshot.exists("fact_loans") and Snapshot.exists("complaints_processed"):
+    loans = Snapshot("fact_loans").to_frame()
+    complaints = Snapshot("complaints_processed").to_frame()
+    print(f"Loans / complaints from snapshots in {SNAPSHOT_DIR}/")
+else:
+    loans = pd.read_csv(f"{DATA_PATH}loans_full_schema.csv")
+    complaints = pd.read_csv(f"{DATA_PATH}complaints-2025-12-17_01_04.csv")
 unrate = pd.read_csv(f"{DATA_PATH}UNRATE.csv")
 cpi = pd.read_csv(f"{DATA_PATH}CPALTT01USM657N.csv")
 rates = pd.read_csv(f"{DATA_PATH}DFF.csv")
 
-print("Datasets loaded successfully\n")
+print(f"Datasets loaded successfully ({time.perf_counter() - t0:.2f}s)\n")
 
 # -----------------------------
 # 2. Dataset Inventory
@@ -34,6 +49,7 @@ dataset_inventory(rates, "Federal Funds Rate")
 # -----------------------------
 # 3. Column Profiling (Loans)
 # -----------------------------
+t0 = time.perf_counter()
 print("===== LOANS COLUMN PROFILING =====")
 profile = (
     loans
@@ -72,23 +88,35 @@ if "grade" in loans.columns:
     print(loans["grade"].value_counts())
     print("\n")
 
-if "int_rate" in loans.columns:
+rate_col = first_existing_col(loans, ["int_rate", "interest_rate"])
+if rate_col:
     print("Interest rate summary:")
-    print(loans["int_rate"].describe())
+    print(loans[rate_col].describe())
     print("\n")
 
 # ---- Borrower Segmentation ----
 print("===== BORROWER SEGMENT CHECK =====")
 
-if "annual_inc" in loans.columns:
+# The raw CSV has annual income / emp_length; the fact_loans snapshot only has their
+# bands, and a band is also missing for non-positive incomes, so it is reported as such
+income_col = first_existing_col(loans, ["annual_inc", "annual_income"])
+if income_col:
     print("Annual income missing %:")
-    print(loans["annual_inc"].isna().mean() * 100)
+    print(loans[income_col].isna().mean() * 100)
+    print("\n")
+elif "income_band" in loans.columns:
+    print("Income band coverage (missing % of income_band):")
+    print(loans["income_band"].isna().mean() * 100)
     print("\n")
 
 if "emp_length" in loans.columns:
     print("Employment length distribution:")
     print(loans["emp_length"].value_counts(dropna=False))
     print("\n")
+elif "emp_length_bucket" in loans.columns:
+    print("Employment length bucket distribution:")
+    print(loans["emp_length_bucket"].value_counts(dropna=False))
+    print("\n")
 
 # -----------------------------
 # 5. Complaint Data Feasibility
@@ -108,6 +136,8 @@ if "product" in complaints.columns:
     print(complaints["product"].value_counts().head(10))
     print("\n")
 
+print(f"Loan / complaint profiling took {time.perf_counter() - t0:.2f}s\n")
+
 # -----------------------------
 # 6. Macroeconomic Data Feasibility
 # -----------------------------
@@ -127,7 +157,7 @@ macro_check(rates, "Federal Funds Rate")
 # -----------------------------
 print("===== TIME ALIGNMENT CHECK =====")
 
-loan_date_cols = [col for col in loans.columns if "date" in col.lower()]
+loan_date_cols = [col for col in loans.columns if "date" in col.lower() or "month" in col.lower()]
 print("Potential loan date columns:", loan_date_cols)
 
 print("\nMacro datasets are monthly and can be aligned to loan origination month.")
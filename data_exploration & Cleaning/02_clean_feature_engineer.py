@@ -1,6 +1,30 @@
+import argparse
+import glob
+import json
 import os
 import pandas as pd
-import numpy as np
+
+from aggregates import AGG_TABLES, build_aggregates
+from date_parsing import detect_format, merge_parse_stats, month_start, parse_dates, parse_failure_report
+from instrumentation import RunReport
+from pipeline_dag import Stage, resolve, run_stages
+from income_bands import BANDS_FILE, IncomeBandVersions, income_sketch
+from incremental import (MANIFEST_FILE, combine_hashes, diff_partitions, load_manifest, month_hashes, month_key,
+                         save_manifest, slice_hashes)
+from narrative_index import INDEX_DIR, MAX_SEGMENTS, MANIFEST_FILE as INDEX_MANIFEST, NarrativeIndex, keyword_facts, load_topics
+from loan_features import clean_income, engineer_features, first_existing_col, fit_income_bins, loan_columns
+from olap_cube import CODES_TABLE, CUBE_TABLE, build_codes, build_cube
+from partitioned_engine import concat_partitions, loans_features_partition, map_partitions, plan_partitions, scan_loans
+from quantile_sketch import QuantileSketch
+from risk_rules import RiskRuleEngine
+from schemas import read_loans_csv
+from snapshots import META_FILE as SNAPSHOT_META, SnapshotWriter, write_snapshot
+from stage_cache import CACHE_DIR, StageCache, code_fingerprint
+from stress_signals import STATE_FILE, StressBaselines, signal_correlation, signal_counts, update_stress_signals
+from surrogate_keys import BORROWER_SEGMENT_COLS, LOAN_PRODUCT_COLS, build_dim, surrogate_key
+from table_io import ChunkedTableWriter, read_table, replace_partitions, table_paths, write_table
+from time_features import LOOKBACK_MONTHS, complaint_features_by_product, join_month_features, macro_features_monthly
+from validation import ValidationEngine
 
 # -----------------------------
 # 0) Paths
@@ -8,9 +32,82 @@ import numpy as np
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
 ANALYTICS_DIR = "data/analytics"
-
-os.makedirs(PROCESSED_DIR, exist_ok=True)
-os.makedirs(ANALYTICS_DIR, exist_ok=True)
+SNAPSHOT_DIR = "data/snapshots"
+
+# Output formats for every processed/analytics table: "csv", "parquet" or both.
+# Parquet needs pyarrow and writes loans partitioned by issue_month_start.
+OUTPUT_FORMATS = ["csv"]
+
+# Incremental rebuild: only issue months / macro months whose raw input slice changed
+# since the last run (hashes in data/analytics/_partitions.json) are recomputed and
+# replaced in the loans tables. Use with "parquet" so writes touch only those partitions.
+INCREMENTAL = False
+
+# Bump whenever feature logic changes: the next incremental run then rebuilds everything
+PIPELINE_VERSION = "5"
+
+# Risk bands / flags policy (thresholds, grade mappings, lookback months)
+RISK_RULES = RiskRuleEngine.from_file()
+
+# Income band cut points are fitted from a mergeable quantile sketch on full builds and
+# kept as versions in data/analytics/_income_bands.json (income_bands.py). Set a version
+# number here to freeze the bands for reporting: every build then applies those cut points.
+INCOME_BAND_VERSION = None
+# Incremental runs keep the last full build's cut points (months that are not rebuilt keep
+# their bands), so bands only follow new incomes on the next full build. Each incremental
+# run refits on all current incomes and warns when a cut point would move by more than this.
+INCOME_BAND_DRIFT_WARN = 0.05
+
+# Data-quality checks (ranges, allowed values, date window, dim_time reference) and the
+# violation rates that fail the run. Rows failing an "error" check go to dq_quarantine.
+VALIDATION_RULES = ValidationEngine.from_file()
+
+# Editing risk_rules.json / validation_rules.json (or freezing another band version) changes the
+# build version too, so incremental runs rebuild
+BUILD_VERSION = f"{PIPELINE_VERSION}+{RISK_RULES.fingerprint}+{VALIDATION_RULES.fingerprint}"
+if INCOME_BAND_VERSION is not None:
+    BUILD_VERSION += f"+bands{INCOME_BAND_VERSION}"
+
+# Section-5 engine: "pandas" loads loans_full_schema.csv into one frame; "partitioned"
+# parses and transforms newline-aligned byte ranges of it on ENGINE_WORKERS processes
+# (partitioned_engine.py). Both produce the same loans / facts.
+LOANS_ENGINE = "pandas"
+ENGINE_WORKERS = os.cpu_count() or 1
+LOANS_PARTITIONS = 4 * ENGINE_WORKERS
+
+# Push the analytics tables straight into the star schema (SQL/database and schema.sql)
+# at the end of the run instead of hand-loading the CSVs. See db_loader.py.
+LOAD_TO_DB = False
+DB_URL = os.environ.get("CREDIT_RISK_DB_URL", "mysql+pymysql://root@localhost/credit_risk_analytics")
+DB_LOAD_METHOD = "insert"  # or "infile" (LOAD DATA LOCAL INFILE, MySQL only)
+
+# Per-stage wall/CPU time, rows in/out and memory, written as JSON to RUN_REPORT_DIR.
+# PROFILE_STAGE (or env PIPELINE_PROFILE_STAGE) runs one stage, e.g. "loans_features",
+# under cProfile and/or tracemalloc and drops the dumps next to the report.
+RUN_REPORT_DIR = "data/run_reports"
+PROFILE_STAGE = os.environ.get("PIPELINE_PROFILE_STAGE")
+PROFILERS = ("cprofile",)  # and/or "tracemalloc"
+
+# Stage cache (stage_cache.py): stages whose raw files, upstream stages and code/config
+# are unchanged since an earlier run are not re-run. --no-cache bypasses it.
+USE_CACHE = True
+CACHE_MAX_BYTES = 5 * 1024 ** 3
+
+LOANS_FILE = os.path.join(RAW_DIR, "loans_full_schema.csv")
+COMPLAINTS_FILE = os.path.join(RAW_DIR, "complaints-2025-12-17_01_04.csv")
+
+# The CFPB export is millions of rows with free-text narratives, so it is streamed
+# in bounded chunks and folded into the monthly facts instead of loaded whole.
+COMPLAINTS_CHUNKSIZE = 250_000
+
+# Set to False to skip data/processed/complaints_processed.csv; the stream then only
+# reads the columns the analytics facts need (no narrative/tags/zip).
+WRITE_COMPLAINTS_PROCESSED = True
+
+# Memory-mapped columnar snapshots (snapshots.py) of fact_loans (the loan-level wide
+# view) and the processed complaints in data/snapshots/, for repeated analysis
+# (01_data_exploration.py / 03_macro_debug.py profile these instead of the CSVs).
+WRITE_SNAPSHOTS = True
 
 # -----------------------------
 # 1) Helpers
@@ -21,13 +118,7 @@ def safe_read_csv(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
 def to_month_start(dt_series: pd.Series) -> pd.Series:
-    return dt_series.dt.to_period("M").dt.to_timestamp()
-
-def first_existing_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
-    for c in candidates:
-        if c in df.columns:
-            return c
-    return None
+    return month_start(dt_series)
 
 def parse_issue_month(series: pd.Series) -> pd.Series:
     """
@@ -35,18 +126,16 @@ def parse_issue_month(series: pd.Series) -> pd.Series:
     - '2018-01'
     - 'Jan-2018'
     - '2018-01-01'
+    The format is detected from a sample and only distinct values are parsed;
+    unparseable values are counted under 'issue_month' in parse_failure_report().
     """
-    s = pd.to_datetime(series, errors="coerce", infer_datetime_format=True)
-    # fallback if many NaT
-    if s.isna().mean() > 0.25:
-        s = pd.to_datetime(series, errors="coerce", format="%b-%Y")
-    return s
+    return parse_dates(series, name="issue_month")
 
 def process_monthly_series(df: pd.DataFrame, date_col: str, value_col: str, out_name: str,
                            start_month: pd.Timestamp, end_month: pd.Timestamp,
                            agg: str = "mean") -> pd.DataFrame:
     out = df[[date_col, value_col]].copy()
-    out[date_col] = pd.to_datetime(out[date_col], errors="coerce")
+    out[date_col] = parse_dates(out[date_col], name=f"{value_col}.{date_col}")
     out = out.dropna(subset=[date_col])
 
     out["month_start"] = to_month_start(out[date_col])
@@ -62,346 +151,882 @@ def process_monthly_series(df: pd.DataFrame, date_col: str, value_col: str, out_
     out = out.rename(columns={value_col: out_name})
     return out
 
+# Standardize complaint column names to snake_case for processed/analytics
+COMPLAINTS_RENAME_MAP = {
+    "Date received": "date_received",
+    "Product": "product",
+    "Sub-product": "sub_product",
+    "Issue": "issue",
+    "Sub-issue": "sub_issue",
+    "Company": "company",
+    "State": "state",
+    "Submitted via": "submitted_via",
+    "Date sent to company": "date_sent_to_company",
+    "Company response to consumer": "company_response",
+    "Timely response?": "timely_response",
+    "Consumer disputed?": "consumer_disputed",
+    "Complaint ID": "complaint_id",
+    "Consumer consent provided?": "consumer_consent_provided",
+    "Company public response": "company_public_response",
+    "Tags": "tags",
+    "ZIP code": "zip_code",
+    "Consumer complaint narrative": "complaint_narrative",
+}
+COMPLAINTS_DATE_COLS = ["date_received", "date_sent_to_company"]
+COMPLAINTS_FACT_COLS = ["date_received", "product", "state", "complaint_id"]
+
+def stream_complaints(path: str, chunksize: int = COMPLAINTS_CHUNKSIZE,
+                      processed_writers: list[ChunkedTableWriter | SnapshotWriter] | None = None
+                      ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Read the complaints export chunk by chunk and fold each chunk into running
+    monthly / product-monthly / state-monthly counts, so peak memory depends on chunksize only.
+
+    If processed_writers are given, every (renamed, date-parsed) chunk is appended to
+    each of them; otherwise only the columns needed for the facts are read.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing file: {path}")
+
+    header = pd.read_csv(path, nrows=0).columns
+    if processed_writers:
+        usecols = list(header)
+    else:
+        usecols = [c for c in header if COMPLAINTS_RENAME_MAP.get(c, c) in COMPLAINTS_FACT_COLS]
+
+    # Pin dtypes up front: text stays text in every chunk (ZIP codes, IDs never
+    # flip between float and str), dates are parsed explicitly below.
+    dtypes = {c: "string" for c in usecols}
+    if "Complaint ID" in dtypes:
+        dtypes["Complaint ID"] = "Int64"
+
+    monthly = None
+    by_product = None
+    by_state = None
+    date_formats = {}
+
+    reader = pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        chunk = chunk.rename(columns={k: v for k, v in COMPLAINTS_RENAME_MAP.items() if k in chunk.columns})
+
+        for dc in COMPLAINTS_DATE_COLS:
+            if dc in chunk.columns:
+                # Format detected on the first chunk is pinned for the rest of the file
+                if dc not in date_formats:
+                    date_formats[dc] = detect_format(chunk[dc])
+                chunk[dc] = parse_dates(chunk[dc], name=dc, fmt=date_formats[dc])
+
+        for writer in processed_writers or []:
+            writer.write(chunk)
+
+        if "date_received" not in chunk.columns:
+            continue
+
+        # count(complaint_id) semantics: rows without an ID are not counted
+        keys = pd.DataFrame({"month_start": to_month_start(chunk["date_received"])})
+        if "complaint_id" in chunk.columns:
+            keys = keys[chunk["complaint_id"].notna()]
+
+        counts = keys.groupby("month_start").size()
+        monthly = counts if monthly is None else monthly.add(counts, fill_value=0)
+
+        if "product" in chunk.columns:
+            keys["product"] = chunk["product"]
+            counts = keys.groupby(["month_start", "product"]).size()
+            by_product = counts if by_product is None else by_product.add(counts, fill_value=0)
+
+        if "state" in chunk.columns:
+            counts = keys[["month_start"]].assign(state=chunk["state"]).groupby(["month_start", "state"]).size()
+            by_state = counts if by_state is None else by_state.add(counts, fill_value=0)
+
+    if monthly is not None:
+        complaints_monthly = monthly.astype("int64").sort_index().reset_index(name="complaints_count")
+    else:
+        complaints_monthly = pd.DataFrame(columns=["month_start", "complaints_count"])
+
+    if by_product is not None:
+        complaints_by_product_month = by_product.astype("int64").sort_index().reset_index(name="complaints_count")
+    else:
+        complaints_by_product_month = pd.DataFrame(columns=["month_start", "product", "complaints_count"])
+
+    if by_state is not None:
+        complaints_by_state_month = by_state.astype("int64").sort_index().reset_index(name="complaints_count")
+    else:
+        complaints_by_state_month = pd.DataFrame(columns=["month_start", "state", "complaints_count"])
+
+    return complaints_monthly, complaints_by_product_month, complaints_by_state_month
+
 # -----------------------------
 # 2) Load Raw (untouched)
 # -----------------------------
-loans_raw = safe_read_csv(os.path.join(RAW_DIR, "loans_full_schema.csv"))
-complaints_raw = safe_read_csv(os.path.join(RAW_DIR, "complaints-2025-12-17_01_04.csv"))
-unrate_raw = safe_read_csv(os.path.join(RAW_DIR, "UNRATE.csv"))
-cpi_raw = safe_read_csv(os.path.join(RAW_DIR, "CPALTT01USM657N.csv"))
-dff_raw = safe_read_csv(os.path.join(RAW_DIR, "DFF.csv"))
+# Every section below is a stage: a function from named inputs to named outputs,
+# wired together in build_stages() and run by pipeline_dag.run_stages.
 
-print("Loaded raw datasets")
+def load_loans() -> dict:
+    # Schema-driven: categorical / float32 / small-int columns are pinned at parse time (schemas.py)
+    loans_raw = read_loans_csv(LOANS_FILE)
+    print(f"Loaded raw loans: {len(loans_raw):,} rows")
+    return {"loans_raw": loans_raw}
 
 # -----------------------------
 # 3) Detect Loan Month Window (for macro alignment)
 # -----------------------------
-if "issue_month" not in loans_raw.columns:
-    raise ValueError("loans_full_schema.csv must contain 'issue_month' column (it exists in your earlier output).")
+def detect_window(loans_raw: pd.DataFrame) -> dict:
+    if "issue_month" not in loans_raw.columns:
+        raise ValueError("loans_full_schema.csv must contain 'issue_month' column (it exists in your earlier output).")
 
-loans_tmp = loans_raw.copy()
-loans_tmp["issue_month_dt"] = parse_issue_month(loans_tmp["issue_month"])
-loans_tmp["issue_month_start"] = to_month_start(loans_tmp["issue_month_dt"])
+    # Parsed once here; the feature step (section 5) reuses the same series
+    issue_month_dt = parse_issue_month(loans_raw["issue_month"])
+    issue_month_start = to_month_start(issue_month_dt)
 
-loan_min_month = loans_tmp["issue_month_start"].min()
-loan_max_month = loans_tmp["issue_month_start"].max()
+    # Per-month content hashes of the loans file decide what an incremental run rebuilds
+    loan_hashes = slice_hashes(loans_raw, issue_month_start, salt=BUILD_VERSION)
 
-if pd.isna(loan_min_month) or pd.isna(loan_max_month):
-    raise ValueError("Could not parse issue_month into dates. Check loans_raw['issue_month'].head(20).")
+    return {
+        "issue_months": pd.DataFrame({"issue_month_dt": issue_month_dt, "issue_month_start": issue_month_start}),
+        **window_state(issue_month_start, loan_hashes),
+    }
 
-print(f"Loan month window detected: {loan_min_month.date()} to {loan_max_month.date()}")
+def window_state(issue_month_start: pd.Series, loan_hashes: dict) -> dict:
+    """Loan month window plus what an incremental run has to rebuild (shared by both engines)."""
+    loan_min_month = issue_month_start.min()
+    loan_max_month = issue_month_start.max()
+
+    if pd.isna(loan_min_month) or pd.isna(loan_max_month):
+        raise ValueError("Could not parse issue_month into dates. Check loans_raw['issue_month'].head(20).")
+
+    print(f"Loan month window detected: {loan_min_month.date()} to {loan_max_month.date()}")
+
+    manifest = load_manifest(ANALYTICS_DIR) if INCREMENTAL else {}
+    full_rebuild = manifest.get("pipeline_version") != BUILD_VERSION
+
+    if full_rebuild:
+        changed_loan_months, removed_loan_months = list(loan_hashes), []
+    else:
+        changed_loan_months, removed_loan_months = diff_partitions(manifest.get("fact_loans", {}), loan_hashes)
+
+    return {
+        "loan_window": (loan_min_month, loan_max_month),
+        "manifest": manifest,
+        "full_rebuild": full_rebuild,
+        "loan_hashes": loan_hashes,
+        "changed_loan_months": changed_loan_months,
+        "removed_loan_months": removed_loan_months,
+    }
+
+def plan_loan_partitions() -> dict:
+    parts = plan_partitions(LOANS_FILE, LOANS_PARTITIONS)
+    print(f"Loans file split into {len(parts['ranges'])} partition(s) for {ENGINE_WORKERS} worker(s)")
+    return {"loan_partitions": parts}
+
+def detect_window_partitioned(loan_partitions: dict) -> dict:
+    # Pass 1: months, row hashes and income of every partition; no partition is kept
+    scan = scan_loans(loan_partitions, ENGINE_WORKERS)
+    for stats in scan["parse_stats"]:
+        merge_parse_stats(stats)
+
+    # Partitions use their own column dtypes, so their hashes are salted apart from the
+    # pandas engine's (switching engines triggers one full rebuild)
+    loan_hashes = month_hashes(scan["row_hashes"], scan["months"], loan_partitions["columns"],
+                               salt=f"{BUILD_VERSION}+partitioned")
+    return {"income_sketch": scan["income"], **window_state(scan["months"], loan_hashes)}
 
 # -----------------------------
 # 4) Process Macroeconomic Data (filtered to loan window)
 # -----------------------------
 # FRED standard uses observation_date + series column
-date_col = "observation_date"
-
-unrate_val_col = first_existing_col(unrate_raw, ["UNRATE"])
-cpi_val_col = first_existing_col(cpi_raw, ["CPALTT01USM657N"])
-dff_val_col = first_existing_col(dff_raw, ["DFF"])
-
-if not unrate_val_col or not cpi_val_col or not dff_val_col:
-    raise ValueError("Macro files must include columns: UNRATE, CPALTT01USM657N, DFF (plus observation_date).")
-
-macro_unrate = process_monthly_series(
-    unrate_raw, date_col, unrate_val_col, "unemployment_rate",
-    loan_min_month, loan_max_month, agg="mean"
-)
+MACRO_DATE_COL = "observation_date"
+
+# (stage / output name, raw file, FRED value column, analytics column). Each series
+# is its own stage, so the three files are read and aggregated independently.
+MACRO_SERIES = [
+    ("macro_unrate", "UNRATE.csv", "UNRATE", "unemployment_rate"),
+    ("macro_cpi", "CPALTT01USM657N.csv", "CPALTT01USM657N", "cpi_inflation_proxy"),
+    # DFF is daily -> monthly avg (mean)
+    ("macro_dff", "DFF.csv", "DFF", "fed_funds_rate_avg"),
+]
 
-macro_cpi = process_monthly_series(
-    cpi_raw, date_col, cpi_val_col, "cpi_inflation_proxy",
-    loan_min_month, loan_max_month, agg="mean"
-)
+def macro_months(df: pd.DataFrame) -> pd.Series:
+    return to_month_start(parse_dates(df[MACRO_DATE_COL]))
+
+def process_macro_series(loan_window: tuple, name: str, file_name: str, value_col: str, out_name: str) -> dict:
+    raw = safe_read_csv(os.path.join(RAW_DIR, file_name))
+    if MACRO_DATE_COL not in raw.columns or not first_existing_col(raw, [value_col]):
+        raise ValueError("Macro files must include columns: UNRATE, CPALTT01USM657N, DFF (plus observation_date).")
+
+    # FRED files are a few thousand rows, so every window month is re-aggregated;
+    # the hashes only decide which loan months an incremental run rebuilds. The series
+    # starts LOOKBACK_MONTHS early so lags / rolling windows of the first loan month are defined.
+    loan_min_month, loan_max_month = loan_window
+    history_start = loan_min_month - pd.DateOffset(months=LOOKBACK_MONTHS)
+    monthly = process_monthly_series(raw, MACRO_DATE_COL, value_col, out_name, history_start, loan_max_month, agg="mean")
+    return {name: monthly, f"{name}_hashes": slice_hashes(raw, macro_months(raw), salt=BUILD_VERSION)}
+
+def combine_macro(loan_window: tuple, manifest: dict, full_rebuild: bool,
+                  macro_unrate: pd.DataFrame, macro_cpi: pd.DataFrame, macro_dff: pd.DataFrame,
+                  macro_unrate_hashes: dict, macro_cpi_hashes: dict, macro_dff_hashes: dict) -> dict:
+    loan_min_month, loan_max_month = loan_window
+    window_months = {month_key(m) for m in pd.date_range(loan_min_month, loan_max_month, freq="MS")}
+    macro_hashes = {
+        m: h for m, h in combine_hashes(macro_unrate_hashes, macro_cpi_hashes, macro_dff_hashes).items()
+        if m in window_months
+    }
+
+    if full_rebuild:
+        changed_macro_months = list(macro_hashes)
+    else:
+        changed_macro_months, _ = diff_partitions(manifest.get("fact_macro_monthly", {}), macro_hashes)
+        print(f"Incremental: {len(changed_macro_months)} macro month(s) changed")
 
-# DFF is daily -> monthly avg (mean)
-macro_dff = process_monthly_series(
-    dff_raw, date_col, dff_val_col, "fed_funds_rate_avg",
-    loan_min_month, loan_max_month, agg="mean"
-)
+    macro_history = (
+        macro_unrate.merge(macro_cpi, on="month_start", how="left")
+                    .merge(macro_dff, on="month_start", how="left")
+    )
+    macro_monthly = macro_history[macro_history["month_start"] >= loan_min_month].reset_index(drop=True)
 
-macro_monthly = (
-    macro_unrate.merge(macro_cpi, on="month_start", how="left")
-               .merge(macro_dff, on="month_start", how="left")
-)
+    print("\n===== MACRO COVERAGE CHECK (after filtering) =====")
+    print(macro_monthly)
+    print("\nMissing % by macro column:")
+    print((macro_monthly.isna().mean() * 100).round(2))
 
-print("\n===== MACRO COVERAGE CHECK (after filtering) =====")
-print(macro_monthly)
-print("\nMissing % by macro column:")
-print((macro_monthly.isna().mean() * 100).round(2))
+    write_table(macro_monthly, "macro_monthly_processed", PROCESSED_DIR, OUTPUT_FORMATS)
+    write_table(macro_monthly, "fact_macro_monthly", ANALYTICS_DIR, OUTPUT_FORMATS)
+    print("Saved macro_monthly_processed and fact_macro_monthly")
 
-macro_monthly.to_csv(os.path.join(PROCESSED_DIR, "macro_monthly_processed.csv"), index=False)
-macro_monthly.to_csv(os.path.join(ANALYTICS_DIR, "fact_macro_monthly.csv"), index=False)
-print("Saved macro_monthly_processed.csv and fact_macro_monthly.csv")
+    return {"macro_monthly": macro_monthly, "macro_history": macro_history, "macro_hashes": macro_hashes,
+            "changed_macro_months": changed_macro_months}
 
 # -----------------------------
 # 5) Process Loans (clean + features)
 # -----------------------------
-loans = loans_raw.copy()
-
-# Parse issue_month and create join key
-loans["issue_month_dt"] = parse_issue_month(loans["issue_month"])
-loans["issue_month_start"] = to_month_start(loans["issue_month_dt"])
-
-# Exclude out-of-scope / low-quality fields from analytics layer (do NOT touch raw)
-DROP_LOANS_ANALYTICS = [
-    "annual_income_joint",
-    "verification_income_joint",
-    "debt_to_income_joint",
-]
-for col in DROP_LOANS_ANALYTICS:
-    if col in loans.columns:
-        loans.drop(columns=[col], inplace=True)
-
-# Normalize common numeric fields (light-touch sanity guards)
-annual_inc_col = first_existing_col(loans, ["annual_income", "annual_inc"])
-int_rate_col = first_existing_col(loans, ["interest_rate", "int_rate"])
-loan_amt_col = first_existing_col(loans, ["loan_amount", "loan_amnt"])
+# The transform itself lives in loan_features.py (shared with the partitioned engine)
+
+def rebuild_plan(loan_hashes: dict, changed_loan_months: list, removed_loan_months: list,
+                 changed_macro_months: list) -> list[str]:
+    # A month is rebuilt if its loans changed or its macro values did (macro is merged on)
+    rebuild_months = sorted(set(changed_loan_months) | (set(changed_macro_months) & set(loan_hashes)))
+    print(f"Incremental: rebuilding {len(rebuild_months)} of {len(loan_hashes)} loan month(s), "
+          f"dropping {len(removed_loan_months)}")
+    return rebuild_months
+
+def save_loans_processed(loans: pd.DataFrame, full_rebuild: bool, touched_months: list):
+    if full_rebuild:
+        write_table(loans, "loans_processed", PROCESSED_DIR, OUTPUT_FORMATS, partition_by="issue_month_start")
+    else:
+        replace_partitions(loans, "loans_processed", PROCESSED_DIR, OUTPUT_FORMATS,
+                           partition_by="issue_month_start", replace_keys=touched_months)
+    print("Saved processed loans: data/processed/loans_processed")
+
+def report_band_drift(income_bins: list[float], refit: list[float]):
+    # Largest relative move of an inner cut point (the outer ones are opened to +/- inf)
+    drift = max(abs(r - b) / max(abs(b), 1.0) for b, r in zip(income_bins[1:-1], refit[1:-1]))
+    if drift > INCOME_BAND_DRIFT_WARN:
+        print(f"WARNING: income bands are {drift:.1%} off the current incomes (refit: {refit}, applied: "
+              f"{income_bins}); run a full build (INCREMENTAL = False) to refit them")
+
+def income_cut_points(sketch: QuantileSketch | None, full_rebuild: bool, manifest: dict) -> list[float] | None:
+    """Cut points for income_band: the frozen version, the last full build's (incremental) or a new fit."""
+    versions = IncomeBandVersions.load(ANALYTICS_DIR)
+    if INCOME_BAND_VERSION is not None:
+        return versions.get(INCOME_BAND_VERSION)["cut_points"]
+    if not full_rebuild:
+        # Incremental runs reuse the cut points of the last full build so bands stay comparable
+        income_bins = manifest.get("income_bins")
+        if sketch is not None and income_bins:
+            report_band_drift(income_bins, fit_income_bins(sketch))
+        return income_bins
+    if sketch is None:
+        return None
+
+    version = versions.record(fit_income_bins(sketch), sketch)
+    versions.save(ANALYTICS_DIR)
+    print(f"Income bands v{version['version']}: {version['cut_points']} "
+          f"({'exact' if sketch.exact else 'bucketed'} sketch of {sketch.n:,} incomes)")
+    return version["cut_points"]
+
+def build_loan_features(loans_raw: pd.DataFrame, issue_months: pd.DataFrame, macro_monthly: pd.DataFrame,
+                        manifest: dict, full_rebuild: bool, loan_hashes: dict, changed_loan_months: list,
+                        removed_loan_months: list, changed_macro_months: list) -> dict:
+    if full_rebuild:
+        rebuild_months = changed_loan_months
+        # No copy: nothing downstream reads the raw frame, so features are added in place
+        loans = loans_raw
+    else:
+        rebuild_months = rebuild_plan(loan_hashes, changed_loan_months, removed_loan_months, changed_macro_months)
+        rebuild = issue_months["issue_month_start"].isin(pd.to_datetime(pd.Series(rebuild_months, dtype=object)))
+        loans = loans_raw[rebuild].copy()
+
+    annual_inc_col, _, _ = loan_columns(loans_raw)
+    # Fitted on full builds; on incremental runs only checked for drift against the applied bands
+    sketch = income_sketch(clean_income(loans_raw[annual_inc_col])) if annual_inc_col else None
+    income_bins = income_cut_points(sketch, full_rebuild, manifest)
+    loans, income_bins = engineer_features(loans, issue_months, macro_monthly, RISK_RULES, income_bins)
+
+    touched_months = rebuild_months + removed_loan_months
+    save_loans_processed(loans, full_rebuild, touched_months)
+    return {"engineered_loans": loans, "touched_months": touched_months, "income_bins": income_bins}
+
+def build_loan_features_partitioned(loan_partitions: dict, income_sketch: QuantileSketch | None,
+                                    macro_monthly: pd.DataFrame, manifest: dict, full_rebuild: bool,
+                                    loan_hashes: dict, changed_loan_months: list, removed_loan_months: list,
+                                    changed_macro_months: list) -> dict:
+    if full_rebuild:
+        rebuild_months = changed_loan_months
+    else:
+        rebuild_months = rebuild_plan(loan_hashes, changed_loan_months, removed_loan_months, changed_macro_months)
+    # Quartiles over every loan's income (the sketch merged in pass 1), not per partition
+    income_bins = income_cut_points(income_sketch, full_rebuild, manifest)
 
-if annual_inc_col:
-    loans.loc[loans[annual_inc_col] <= 0, annual_inc_col] = np.nan
+    # Pass 2: every partition is transformed in its own process, then stitched back in file order
+    loans = concat_partitions(map_partitions(
+        loans_features_partition, loan_partitions, ENGINE_WORKERS, macro_monthly=macro_monthly,
+        income_bins=income_bins, rebuild_months=None if full_rebuild else rebuild_months,
+    ))
 
-if int_rate_col:
-    loans.loc[(loans[int_rate_col] < 0) | (loans[int_rate_col] > 100), int_rate_col] = np.nan
+    touched_months = rebuild_months + removed_loan_months
+    save_loans_processed(loans, full_rebuild, touched_months)
+    return {"engineered_loans": loans, "touched_months": touched_months, "income_bins": income_bins}
 
-if loan_amt_col:
-    loans.loc[loans[loan_amt_col] <= 0, loan_amt_col] = np.nan
+# -----------------------------
+# 5b) Validate Loans (declared checks; failing rows quarantined, not loaded)
+# -----------------------------
+def validate_loans(engineered_loans: pd.DataFrame, dim_time: pd.DataFrame, full_rebuild: bool,
+                   touched_months: list) -> dict:
+    loans, quarantine, dq_summary = VALIDATION_RULES.validate(engineered_loans, refs={"dim_time": dim_time})
 
-# --- Risk Segmentation (Grade proxy)
-GRADE_ORDER = ["A", "B", "C", "D", "E", "F", "G"]
-grade_to_num = {g: i + 1 for i, g in enumerate(GRADE_ORDER)}  # A=1 ... G=7
+    if full_rebuild:
+        write_table(quarantine, "dq_quarantine", ANALYTICS_DIR, OUTPUT_FORMATS, partition_by="issue_month_start")
+    else:
+        replace_partitions(quarantine, "dq_quarantine", ANALYTICS_DIR, OUTPUT_FORMATS,
+                           partition_by="issue_month_start", replace_keys=touched_months)
+    write_table(dq_summary, "dq_check_summary", ANALYTICS_DIR, OUTPUT_FORMATS)
 
-if "grade" in loans.columns:
-    loans["grade_clean"] = loans["grade"].astype(str).str.strip().str.upper()
-    loans["grade_score"] = loans["grade_clean"].map(grade_to_num)
+    print("\n===== DATA QUALITY CHECKS (loans) =====")
+    print(dq_summary.to_string(index=False))
+    # Raises (and so fails the run) once any check is over its max_pct
+    VALIDATION_RULES.enforce(dq_summary)
+    return {"loans": loans, "dq_summary": dq_summary}
 
-    loans["risk_band"] = np.select(
-        [
-            loans["grade_clean"].isin(["A", "B"]),
-            loans["grade_clean"].isin(["C"]),
-            loans["grade_clean"].isin(["D", "E", "F", "G"]),
-        ],
-        ["Low", "Medium", "High"],
-        default="Unknown"
-    )
-    loans["high_risk_flag"] = (loans["risk_band"] == "High").astype(int)
-else:
-    loans["risk_band"] = "Unknown"
-    loans["high_risk_flag"] = 0
-
-# --- Behavioral Risk Flag (interpretable)
-behavior_cols = [
-    "months_since_last_delinqu",
-    "months_since_90d_late",
-    "num_accounts_120d_past_due",
-    "num_historical_failed_to_pay",
-    "account_never_delinqu_percent",
-]
-for c in behavior_cols:
-    if c not in loans.columns:
-        loans[c] = np.nan
-
-loans["behavioral_risk_flag"] = (
-    (loans["num_accounts_120d_past_due"].fillna(0) > 0) |
-    (loans["num_historical_failed_to_pay"].fillna(0) > 0) |
-    (loans["months_since_90d_late"].fillna(999) < 24) |
-    (loans["months_since_last_delinqu"].fillna(999) < 24)
-).astype(int)
-
-# --- Income banding (quantiles) using individual income only
-if annual_inc_col:
-    try:
-        loans["income_band"] = pd.qcut(
-            loans[annual_inc_col],
-            q=4,
-            labels=["Low", "Lower-Mid", "Upper-Mid", "High"]
-        )
-    except ValueError:
-        bins = [0, 40000, 80000, 120000, np.inf]
-        labels = ["Low", "Lower-Mid", "Upper-Mid", "High"]
-        loans["income_band"] = pd.cut(loans[annual_inc_col], bins=bins, labels=labels)
-
-# --- Employment length bucket (your emp_length is numeric float in your earlier output)
-if "emp_length" in loans.columns:
-    loans["emp_length_bucket"] = pd.cut(
-        loans["emp_length"],
-        bins=[-np.inf, 0, 2, 5, 10, np.inf],
-        labels=["0 or less", "1-2", "3-5", "6-10", "10+"]
+# -----------------------------
+# 6) Process Complaints (streamed)
+# -----------------------------
+def process_complaints() -> dict:
+    writers = []
+    if WRITE_COMPLAINTS_PROCESSED:
+        writers.append(ChunkedTableWriter("complaints_processed", PROCESSED_DIR, OUTPUT_FORMATS))
+    if WRITE_SNAPSHOTS:
+        writers.append(SnapshotWriter("complaints_processed", SNAPSHOT_DIR))
+
+    # Processed dump keeps narrative/tags; the analytics facts only ever see month/product/id
+    complaints_monthly, complaints_by_product_month, complaints_by_state_month = stream_complaints(
+        COMPLAINTS_FILE, chunksize=COMPLAINTS_CHUNKSIZE, processed_writers=writers
     )
 
-# --- Term bucket
-if "term" in loans.columns:
-    loans["term_bucket"] = loans["term"].astype(str).str.replace(" months", "", regex=False)
+    for writer in writers:
+        writer.close()
+    if WRITE_COMPLAINTS_PROCESSED:
+        print("Saved processed complaints: data/processed/complaints_processed")
+    if WRITE_SNAPSHOTS:
+        print("Saved complaints snapshot: data/snapshots/complaints_processed")
+
+    write_table(complaints_monthly, "fact_complaints_monthly", ANALYTICS_DIR, OUTPUT_FORMATS)
+    write_table(complaints_by_product_month, "fact_complaints_by_product_month", ANALYTICS_DIR, OUTPUT_FORMATS)
 
-# --- Join macro onto loans (monthly)
-loans = loans.merge(macro_monthly, left_on="issue_month_start", right_on="month_start", how="left")
+    print("Saved analytics complaints facts:")
+    print("   - data/analytics/fact_complaints_monthly")
+    print("   - data/analytics/fact_complaints_by_product_month")
 
-# Save processed loans
-loans.to_csv(os.path.join(PROCESSED_DIR, "loans_processed.csv"), index=False)
-print("Saved processed loans: data/processed/loans_processed.csv")
+    return {"complaints_monthly": complaints_monthly, "complaints_by_product_month": complaints_by_product_month,
+            "complaints_by_state_month": complaints_by_state_month}
 
 # -----------------------------
-# 6) Process Complaints
+# 6b) Month Features (lags / rolling / z-scores / YoY)
 # -----------------------------
-complaints = complaints_raw.copy()
+def build_month_features(loan_window: tuple, macro_history: pd.DataFrame, complaints_monthly: pd.DataFrame,
+                         complaints_by_product_month: pd.DataFrame) -> dict:
+    # A few hundred months: always rebuilt in full, including on incremental runs
+    loan_min_month, loan_max_month = loan_window
+    macro_features = macro_features_monthly(macro_history, complaints_monthly, loan_min_month, loan_max_month)
+    complaint_features = complaint_features_by_product(complaints_by_product_month)
 
-# Standardize column names to snake_case for processed/analytics
-rename_map = {
-    "Date received": "date_received",
-    "Product": "product",
-    "Sub-product": "sub_product",
-    "Issue": "issue",
-    "Sub-issue": "sub_issue",
-    "Company": "company",
-    "State": "state",
-    "Submitted via": "submitted_via",
-    "Date sent to company": "date_sent_to_company",
-    "Company response to consumer": "company_response",
-    "Timely response?": "timely_response",
-    "Consumer disputed?": "consumer_disputed",
-    "Complaint ID": "complaint_id",
-    "Consumer consent provided?": "consumer_consent_provided",
-    "Company public response": "company_public_response",
-    "Tags": "tags",
-    "ZIP code": "zip_code",
-    "Consumer complaint narrative": "complaint_narrative",
-}
-complaints.rename(columns={k: v for k, v in rename_map.items() if k in complaints.columns}, inplace=True)
-
-# Parse dates
-for dc in ["date_received", "date_sent_to_company"]:
-    if dc in complaints.columns:
-        complaints[dc] = pd.to_datetime(complaints[dc], errors="coerce")
+    write_table(macro_features, "fact_macro_features_monthly", ANALYTICS_DIR, OUTPUT_FORMATS)
+    write_table(complaint_features, "fact_complaint_features_by_product_month", ANALYTICS_DIR, OUTPUT_FORMATS)
+    print("Saved month features:")
+    print(f"   - data/analytics/fact_macro_features_monthly ({len(macro_features)} months x {macro_features.shape[1] - 1} features)")
+    print(f"   - data/analytics/fact_complaint_features_by_product_month ({len(complaint_features):,} rows)")
 
-# Save processed complaints (keep narrative/tags in processed, but drop from analytics facts)
-complaints.to_csv(os.path.join(PROCESSED_DIR, "complaints_processed.csv"), index=False)
-print("Saved processed complaints: data/processed/complaints_processed.csv")
+    return {"macro_features_monthly": macro_features, "complaint_features_by_product_month": complaint_features}
 
-# Build complaint analytics facts (monthly)
-complaints_analytics = complaints.copy()
-DROP_COMPLAINTS_ANALYTICS = ["complaint_narrative", "tags", "zip_code"]
-complaints_analytics = complaints_analytics.drop(columns=[c for c in DROP_COMPLAINTS_ANALYTICS if c in complaints_analytics.columns])
-
-if "date_received" in complaints_analytics.columns:
-    complaints_analytics["month_start"] = to_month_start(complaints_analytics["date_received"])
-
-id_col = "complaint_id" if "complaint_id" in complaints_analytics.columns else None
+# -----------------------------
+# 6c) Complaint Narrative Index (hardship keywords)
+# -----------------------------
+NARRATIVE_COLS = ["date_received", "product", "complaint_id", "complaint_narrative"]
+
+def index_narratives(full_rebuild: bool) -> dict:
+    index_path = os.path.join(ANALYTICS_DIR, INDEX_DIR)
+    # Full builds re-index from scratch; incremental runs only add complaint IDs not indexed yet
+    index = NarrativeIndex.reset(index_path) if full_rebuild else NarrativeIndex(index_path)
+
+    header = pd.read_csv(COMPLAINTS_FILE, nrows=0).columns
+    usecols = [c for c in header if COMPLAINTS_RENAME_MAP.get(c, c) in NARRATIVE_COLS]
+    dtypes = {c: "Int64" if COMPLAINTS_RENAME_MAP.get(c) == "complaint_id" else "string" for c in usecols}
+    date_format = None
+    added = 0
+    for chunk in pd.read_csv(COMPLAINTS_FILE, usecols=usecols, dtype=dtypes, chunksize=COMPLAINTS_CHUNKSIZE):
+        chunk = chunk.rename(columns=COMPLAINTS_RENAME_MAP)
+        if "complaint_narrative" not in chunk.columns:
+            break
+        if date_format is None:
+            date_format = detect_format(chunk["date_received"])
+        chunk["month_start"] = to_month_start(parse_dates(chunk["date_received"], fmt=date_format))
+        added += index.add(chunk)
+        if len(index.segments) > MAX_SEGMENTS:
+            index.compact()
+    if full_rebuild:
+        index.compact()
+
+    keywords, topics = keyword_facts(index, load_topics())
+    write_table(keywords, "fact_complaint_keywords_monthly", ANALYTICS_DIR, OUTPUT_FORMATS)
+    write_table(topics, "fact_complaint_topics_monthly", ANALYTICS_DIR, OUTPUT_FORMATS)
+    print(f"Narrative index: {added:,} complaints added, {index.n_docs:,} indexed in {len(index.segments)} segment(s)")
+    print("Saved complaint keyword facts:")
+    print("   - data/analytics/fact_complaint_keywords_monthly")
+    print("   - data/analytics/fact_complaint_topics_monthly")
+    return {"complaint_keywords_monthly": keywords, "complaint_topics_monthly": topics}
 
-# Monthly totals
-if id_col:
-    complaints_monthly = complaints_analytics.groupby("month_start", as_index=False).agg(
-        complaints_count=(id_col, "count")
+# -----------------------------
+# 7) Build Analytics Tables (Dims + Facts)
+# -----------------------------
+def build_dim_time(loan_hashes: dict, macro_monthly: pd.DataFrame, complaints_monthly: pd.DataFrame) -> dict:
+    # DIM: time (month grain)
+    time_months = pd.Series(pd.to_datetime([]))
+    for s in [
+        pd.Series(list(loan_hashes)),
+        macro_monthly["month_start"] if "month_start" in macro_monthly.columns else pd.Series([]),
+        complaints_monthly["month_start"] if "month_start" in complaints_monthly.columns else pd.Series([]),
+    ]:
+        s = pd.to_datetime(s, errors="coerce")
+        time_months = pd.concat([time_months, s])
+
+    dim_time = pd.DataFrame({"month_start": time_months.dropna().drop_duplicates().sort_values()})
+    dim_time["year"] = dim_time["month_start"].dt.year
+    dim_time["month"] = dim_time["month_start"].dt.month
+    dim_time["quarter"] = dim_time["month_start"].dt.to_period("Q").astype(str)
+
+    write_table(dim_time, "dim_time", ANALYTICS_DIR, OUTPUT_FORMATS)
+    return {"dim_time": dim_time}
+
+def build_dims(loans: pd.DataFrame, full_rebuild: bool) -> dict:
+    # Stable surrogate keys (hash of the attribute combination) link fact_loans to its dims
+    borrower_cols = [c for c in BORROWER_SEGMENT_COLS if c in loans.columns]
+    product_cols = [c for c in LOAN_PRODUCT_COLS if c in loans.columns]
+    loan_keys = pd.DataFrame({
+        "borrower_segment_id": surrogate_key(loans, borrower_cols),
+        "loan_product_id": surrogate_key(loans, product_cols),
+    }, index=loans.index)
+    keyed = loans[borrower_cols + product_cols].assign(**loan_keys)
+
+    # DIM: borrower segment (no borrower_id → segment key)
+    dim_borrower_segment = build_dim(
+        keyed, borrower_cols, "borrower_segment_id",
+        existing=None if full_rebuild else read_table("dim_borrower_segment", ANALYTICS_DIR),
     )
-else:
-    complaints_monthly = complaints_analytics.groupby("month_start", as_index=False).size().rename(columns={"size": "complaints_count"})
+    write_table(dim_borrower_segment, "dim_borrower_segment", ANALYTICS_DIR, OUTPUT_FORMATS)
 
-# Monthly by product
-if "product" in complaints_analytics.columns and id_col:
-    complaints_by_product_month = complaints_analytics.groupby(["month_start", "product"], as_index=False).agg(
-        complaints_count=(id_col, "count")
+    # DIM: loan product (risk_band depends on grade only, so it lives here too)
+    dim_loan_product = build_dim(
+        keyed, product_cols, "loan_product_id",
+        existing=None if full_rebuild else read_table("dim_loan_product", ANALYTICS_DIR),
     )
-elif "product" in complaints_analytics.columns:
-    complaints_by_product_month = complaints_analytics.groupby(["month_start", "product"], as_index=False).size().rename(columns={"size": "complaints_count"})
-else:
-    complaints_by_product_month = pd.DataFrame(columns=["month_start", "product", "complaints_count"])
+    write_table(dim_loan_product, "dim_loan_product", ANALYTICS_DIR, OUTPUT_FORMATS)
 
-complaints_monthly.to_csv(os.path.join(ANALYTICS_DIR, "fact_complaints_monthly.csv"), index=False)
-complaints_by_product_month.to_csv(os.path.join(ANALYTICS_DIR, "fact_complaints_by_product_month.csv"), index=False)
+    return {"dim_borrower_segment": dim_borrower_segment, "dim_loan_product": dim_loan_product, "loan_keys": loan_keys}
 
-print("Saved analytics complaints facts:")
-print("   - data/analytics/fact_complaints_monthly.csv")
-print("   - data/analytics/fact_complaints_by_product_month.csv")
-
-# -----------------------------
-# 7) Build Analytics Tables (Dims + Facts)
-# -----------------------------
-
-# DIM: time (month grain)
-time_months = pd.Series(pd.to_datetime([]))
-for s in [
-    loans["issue_month_start"] if "issue_month_start" in loans.columns else pd.Series([]),
-    macro_monthly["month_start"] if "month_start" in macro_monthly.columns else pd.Series([]),
-    complaints_monthly["month_start"] if "month_start" in complaints_monthly.columns else pd.Series([]),
-]:
-    s = pd.to_datetime(s, errors="coerce")
-    time_months = pd.concat([time_months, s])
-
-dim_time = pd.DataFrame({"month_start": time_months.dropna().drop_duplicates().sort_values()})
-dim_time["year"] = dim_time["month_start"].dt.year
-dim_time["month"] = dim_time["month_start"].dt.month
-dim_time["quarter"] = dim_time["month_start"].dt.to_period("Q").astype(str)
-
-dim_time.to_csv(os.path.join(ANALYTICS_DIR, "dim_time.csv"), index=False)
-
-# DIM: borrower segment (no borrower_id → segment key)
-borrower_cols = [c for c in ["homeownership", "verified_income", "income_band", "emp_length_bucket", "state"] if c in loans.columns]
-dim_borrower_segment = loans[borrower_cols].drop_duplicates().reset_index(drop=True).copy()
-dim_borrower_segment["borrower_segment_id"] = np.arange(1, len(dim_borrower_segment) + 1)
-dim_borrower_segment.to_csv(os.path.join(ANALYTICS_DIR, "dim_borrower_segment.csv"), index=False)
-
-# DIM: loan product
-product_cols = [c for c in ["loan_purpose", "term", "term_bucket", "grade", "sub_grade", "disbursement_method", "application_type"] if c in loans.columns]
-dim_loan_product = loans[product_cols].drop_duplicates().reset_index(drop=True).copy()
-dim_loan_product["loan_product_id"] = np.arange(1, len(dim_loan_product) + 1)
-dim_loan_product.to_csv(os.path.join(ANALYTICS_DIR, "dim_loan_product.csv"), index=False)
-
-# FACT: loans (SQL-ready)
-fact_cols = []
-for c in [
+# FACT: loans (SQL-ready, narrow). Segment/product attributes are reached through the
+# dim keys and macro context through fact_macro_monthly (see vw_fact_loans).
+FACT_LOANS_COLS = [
     "issue_month_start",
-    loan_amt_col,
-    int_rate_col,
+    "borrower_segment_id",
+    "loan_product_id",
+    "loan_amount",
+    "interest_rate",
     "installment",
     "balance",
     "loan_status",
     "high_risk_flag",
     "behavioral_risk_flag",
-    "risk_band",
-    "income_band",
-    "emp_length_bucket",
-    "term",
-    "term_bucket",
-    "loan_purpose",
-    "grade",
-    "sub_grade",
-    "homeownership",
-    "verified_income",
     "debt_to_income",
-    "unemployment_rate",
-    "cpi_inflation_proxy",
-    "fed_funds_rate_avg",
-]:
-    if c and c in loans.columns:
-        fact_cols.append(c)
+]
 
-fact_loans = loans[fact_cols].copy()
+def build_facts(loans: pd.DataFrame, loan_keys: pd.DataFrame, macro_monthly: pd.DataFrame,
+                full_rebuild: bool, touched_months: list) -> dict:
+    _, int_rate_col, loan_amt_col = loan_columns(loans)
+
+    # Loan-level view with all attributes resolved (feeds the aggregates and the sanity check)
+    wide_cols = []
+    for c in [
+        "issue_month_start",
+        loan_amt_col,
+        int_rate_col,
+        "installment",
+        "balance",
+        "loan_status",
+        "high_risk_flag",
+        "behavioral_risk_flag",
+        "risk_band",
+        "income_band",
+        "emp_length_bucket",
+        "term",
+        "term_bucket",
+        "loan_purpose",
+        "grade",
+        "sub_grade",
+        "homeownership",
+        "verified_income",
+        "debt_to_income",
+        "unemployment_rate",
+        "cpi_inflation_proxy",
+        "fed_funds_rate_avg",
+    ]:
+        if c and c in loans.columns:
+            wide_cols.append(c)
+
+    # Rename amount/rate columns into standard names for BI friendliness
+    rename_fact = {}
+    if loan_amt_col and loan_amt_col in wide_cols:
+        rename_fact[loan_amt_col] = "loan_amount"
+    if int_rate_col and int_rate_col in wide_cols:
+        rename_fact[int_rate_col] = "interest_rate"
+    fact_loans_wide = pd.concat([loans[wide_cols], loan_keys], axis=1).rename(columns=rename_fact)
+
+    fact_loans = fact_loans_wide[[c for c in FACT_LOANS_COLS if c in fact_loans_wide.columns]]
+
+    if full_rebuild:
+        write_table(fact_loans, "fact_loans", ANALYTICS_DIR, OUTPUT_FORMATS, partition_by="issue_month_start")
+    else:
+        replace_partitions(fact_loans, "fact_loans", ANALYTICS_DIR, OUTPUT_FORMATS,
+                           partition_by="issue_month_start", replace_keys=touched_months)
+
+    if WRITE_SNAPSHOTS:
+        # Snapshot the wide view: fact_loans plus the resolved grade / band / status attributes
+        if full_rebuild:
+            write_snapshot(fact_loans_wide, "fact_loans", SNAPSHOT_DIR)
+        else:
+            write_snapshot(fact_loans_wide, "fact_loans", SNAPSHOT_DIR,
+                           replace_col="issue_month_start", replace_keys=touched_months)
+
+    # AGGREGATES: materialized rows behind vw_portfolio_monthly / vw_risk_by_product / vw_risk_by_segment.
+    # fact_loans only holds the rebuilt months on incremental runs, so only those months are replaced.
+    aggregates = build_aggregates(fact_loans_wide, macro_monthly)
+    for name, agg in aggregates.items():
+        if full_rebuild:
+            write_table(agg, name, ANALYTICS_DIR, OUTPUT_FORMATS, partition_by="month_start")
+        else:
+            replace_partitions(agg, name, ANALYTICS_DIR, OUTPUT_FORMATS,
+                               partition_by="month_start", replace_keys=touched_months)
+
+    print(f"Saved analytics tables ({', '.join(OUTPUT_FORMATS)}):")
+    print("   - data/analytics/dim_time")
+    print("   - data/analytics/dim_borrower_segment")
+    print("   - data/analytics/dim_loan_product")
+    print("   - data/analytics/fact_loans")
+    print("   - data/analytics/fact_macro_monthly")
+    print("   - data/analytics/agg_portfolio_monthly, agg_risk_by_product, agg_risk_by_segment")
+    if WRITE_SNAPSHOTS:
+        print("   - data/snapshots/fact_loans")
+
+    return {"fact_loans_wide": fact_loans_wide, "fact_loans": fact_loans, "aggregates": aggregates}
 
-# Rename amount/rate columns into standard names for BI friendliness
-rename_fact = {}
-if loan_amt_col and loan_amt_col in fact_loans.columns:
-    rename_fact[loan_amt_col] = "loan_amount"
-if int_rate_col and int_rate_col in fact_loans.columns:
-    rename_fact[int_rate_col] = "interest_rate"
-fact_loans.rename(columns=rename_fact, inplace=True)
+# -----------------------------
+# 7b) Complaint Stress Signals (incremental EWMA baselines)
+# -----------------------------
+def score_stress_signals(complaints_monthly: pd.DataFrame, complaints_by_product_month: pd.DataFrame,
+                         complaints_by_state_month: pd.DataFrame, aggregates: dict, full_rebuild: bool) -> dict:
+    # aggregates is an ordering input: agg_portfolio_monthly is read back whole below
+    baselines = StressBaselines() if full_rebuild else StressBaselines.load(ANALYTICS_DIR)
+    counts = signal_counts(complaints_monthly, complaints_by_product_month, complaints_by_state_month)
+    signals, baselines, rebuilt = update_stress_signals(counts, baselines)
+    baselines.save(ANALYTICS_DIR)
+
+    if full_rebuild or rebuilt:
+        write_table(signals, "fact_stress_signals", ANALYTICS_DIR, OUTPUT_FORMATS, partition_by="month_start")
+        fact_stress_signals = signals
+    else:
+        scored_months = [month_key(m) for m in signals["month_start"].unique()]
+        print(f"Incremental: {len(scored_months)} complaint month(s) scored for stress signals")
+        replace_partitions(signals, "fact_stress_signals", ANALYTICS_DIR, OUTPUT_FORMATS,
+                           partition_by="month_start", replace_keys=scored_months)
+        fact_stress_signals = read_table("fact_stress_signals", ANALYTICS_DIR)
+
+    portfolio = read_table("agg_portfolio_monthly", ANALYTICS_DIR, columns=["month_start", "high_risk_exposure_pct"])
+    correlation = signal_correlation(fact_stress_signals, portfolio)
+    write_table(correlation, "fact_stress_signal_correlation", ANALYTICS_DIR, OUTPUT_FORMATS)
+
+    anomalies = signals[signals["is_anomaly"] == 1]
+    print("\n===== STRESS SIGNALS =====")
+    print(f"{len(signals):,} segment-months scored, {len(anomalies):,} flagged (z >= threshold)")
+    if len(anomalies):
+        print(anomalies.sort_values("z_score", ascending=False)
+                       .head(10)[["month_start", "dimension", "segment", "complaints_count", "expected_count", "z_score"]]
+                       .to_string(index=False))
+    print("Saved data/analytics/fact_stress_signals and fact_stress_signal_correlation")
+
+    return {"stress_signals": signals, "stress_signal_correlation": correlation}
 
-fact_loans.to_csv(os.path.join(ANALYTICS_DIR, "fact_loans.csv"), index=False)
+# -----------------------------
+# 7c) Loan Cube (month x segment x product, additive measures; see olap_cube.py)
+# -----------------------------
+def build_loan_cube(fact_loans_wide: pd.DataFrame, full_rebuild: bool, touched_months: list) -> dict:
+    # Codes only ever grow, so cells of months an incremental run did not rebuild stay decodable
+    codes = build_codes(fact_loans_wide, existing=None if full_rebuild else read_table(CODES_TABLE, ANALYTICS_DIR))
+    cube = build_cube(fact_loans_wide, codes)
+
+    write_table(codes, CODES_TABLE, ANALYTICS_DIR, OUTPUT_FORMATS)
+    if full_rebuild:
+        write_table(cube, CUBE_TABLE, ANALYTICS_DIR, OUTPUT_FORMATS, partition_by="month_start")
+    else:
+        replace_partitions(cube, CUBE_TABLE, ANALYTICS_DIR, OUTPUT_FORMATS,
+                           partition_by="month_start", replace_keys=touched_months)
 
-print("Saved analytics tables:")
-print("   - data/analytics/dim_time.csv")
-print("   - data/analytics/dim_borrower_segment.csv")
-print("   - data/analytics/dim_loan_product.csv")
-print("   - data/analytics/fact_loans.csv")
-print("   - data/analytics/fact_macro_monthly.csv")
+    print(f"Saved loan cube: {len(cube):,} cells for {len(fact_loans_wide):,} loans")
+    return {"loan_cube": cube, "loan_cube_codes": codes}
 
 # -----------------------------
 # 8) Final Sanity Check (macro join must not be 100% null)
 # -----------------------------
-macro_cols = ["unemployment_rate", "cpi_inflation_proxy", "fed_funds_rate_avg"]
-present_cols = [c for c in macro_cols if c in fact_loans.columns]
-if present_cols:
-    null_pct = (fact_loans[present_cols].isna().mean() * 100).round(2)
-    print("\n===== SANITY CHECK: Macro columns null % in fact_loans =====")
-    print(null_pct)
-else:
-    print("\nMacro columns not found in fact_loans; check merge keys and macro_monthly.")
+def sanity_check(fact_loans_wide: pd.DataFrame, complaints_monthly: pd.DataFrame,
+                 macro_features_monthly: pd.DataFrame) -> dict:
+    # complaints_monthly is only an ordering input: its date parse stats are part of the report
+    macro_cols = ["unemployment_rate", "cpi_inflation_proxy", "fed_funds_rate_avg"]
+    present_cols = [c for c in macro_cols if c in fact_loans_wide.columns]
+    if present_cols:
+        null_pct = (fact_loans_wide[present_cols].isna().mean() * 100).round(2)
+        print("\n===== SANITY CHECK: Macro columns null % in fact_loans =====")
+        print(null_pct)
+    else:
+        print("\nMacro columns not found in fact_loans; check merge keys and macro_monthly.")
+
+    # Month features join 1:1 on issue month: gaps here mean the lookback history is missing
+    feature_cols = [c for c in macro_features_monthly.columns if c.endswith(("_lag12", "_z12m", "_yoy"))]
+    with_features = join_month_features(fact_loans_wide[["issue_month_start"]], macro_features_monthly, feature_cols)
+    if len(with_features) != len(fact_loans_wide):
+        raise ValueError("month feature join changed the fact_loans row count")
+    print("\n===== SANITY CHECK: Month feature null % on fact_loans =====")
+    print((with_features[feature_cols].isna().mean() * 100).round(2))
+
+    print("\n===== SANITY CHECK: Date parse failures =====")
+    print(parse_failure_report()[["column", "format", "rows", "missing_rows", "failed_rows", "failed_pct"]].to_string(index=False))
+    return {}
+
+# -----------------------------
+# 9) Load Star Schema (optional)
+# -----------------------------
+DB_TABLES = [
+    "dim_time",
+    "dim_borrower_segment",
+    "dim_loan_product",
+    "macro_monthly",
+    "complaints_monthly",
+    "complaints_by_product_month",
+    "macro_features_monthly",
+    "complaint_features_by_product_month",
+    "fact_loans",
+    "stress_signals",
+    "stress_signal_correlation",
+    "complaint_keywords_monthly",
+    "complaint_topics_monthly",
+]
 
+def load_db(full_rebuild: bool, touched_months: list, aggregates: dict, **tables) -> dict:
+    from db_loader import get_engine, load_star_schema
+
+    # Incremental runs only replace the rebuilt months of the month-keyed loan tables
+    load_tables = {
+        "dim_time": tables["dim_time"],
+        "dim_borrower_segment": tables["dim_borrower_segment"],
+        "dim_loan_product": tables["dim_loan_product"],
+        "fact_macro_monthly": tables["macro_monthly"],
+        "fact_complaints_monthly": tables["complaints_monthly"],
+        "fact_complaints_by_product_month": tables["complaints_by_product_month"],
+        "fact_macro_features_monthly": tables["macro_features_monthly"],
+        "fact_complaint_features_by_product_month": tables["complaint_features_by_product_month"],
+        "fact_loans": tables["fact_loans"],
+        **aggregates,
+        "fact_stress_signals": tables["stress_signals"],
+        "fact_stress_signal_correlation": tables["stress_signal_correlation"],
+        "fact_complaint_keywords_monthly": tables["complaint_keywords_monthly"],
+        "fact_complaint_topics_monthly": tables["complaint_topics_monthly"],
+    }
+    replace_keys = {}
+    if not full_rebuild:
+        replace_keys = {name: ("month_start", touched_months) for name in aggregates}
+        replace_keys["fact_loans"] = ("issue_month_start", touched_months)
+        replace_keys["fact_stress_signals"] = (
+            "month_start", [month_key(m) for m in tables["stress_signals"]["month_start"].unique()])
+
+    print("\n===== LOADING STAR SCHEMA =====")
+    load_star_schema(get_engine(DB_URL), load_tables, method=DB_LOAD_METHOD, replace_keys=replace_keys)
+    return {}
+
+def save_run_manifest(loan_hashes: dict, macro_hashes: dict, income_bins: list | None,
+                      fact_loans: pd.DataFrame, aggregates: dict) -> dict:
+    # fact_loans / aggregates are ordering inputs: the manifest is written after the tables
+    # Record what was materialized so the next incremental run only rebuilds the delta
+    save_manifest({
+        "pipeline_version": BUILD_VERSION,
+        "fact_loans": loan_hashes,
+        "fact_macro_monthly": macro_hashes,
+        "income_bins": income_bins,
+    }, ANALYTICS_DIR)
+    return {}
+
+# -----------------------------
+# 10) Stage graph + run
+# -----------------------------
+WINDOW_OUTPUTS = ["loan_window", "manifest", "full_rebuild", "loan_hashes", "changed_loan_months", "removed_loan_months"]
+FEATURE_INPUTS = ["macro_monthly", "manifest", "full_rebuild", "loan_hashes",
+                  "changed_loan_months", "removed_loan_months", "changed_macro_months"]
+
+def processed_files(*names: str) -> list[str]:
+    return [p for name in names for p in table_paths(name, PROCESSED_DIR, OUTPUT_FORMATS)]
+
+def analytics_files(*names: str) -> list[str]:
+    return [p for name in names for p in table_paths(name, ANALYTICS_DIR, OUTPUT_FORMATS)]
+
+def snapshot_files(*names: str) -> list[str]:
+    return [os.path.join(SNAPSHOT_DIR, name, SNAPSHOT_META) for name in names] if WRITE_SNAPSHOTS else []
+
+def loan_stages(engine: str) -> list[Stage]:
+    # The incremental manifest decides what gets rebuilt, so it is a source of the window
+    window_sources = [os.path.join(ANALYTICS_DIR, MANIFEST_FILE)] if INCREMENTAL else []
+    # A frozen band version is read from the versions file; otherwise the stage (re)writes it
+    bands_file = os.path.join(ANALYTICS_DIR, BANDS_FILE)
+    band_sources = [bands_file] if INCOME_BAND_VERSION is not None else []
+    band_artifacts = [] if INCOME_BAND_VERSION is not None else [bands_file]
+    if engine == "pandas":
+        return [
+            Stage("load", load_loans, outputs=["loans_raw"], sources=[LOANS_FILE]),
+            Stage("window", detect_window, inputs=["loans_raw"], outputs=["issue_months", *WINDOW_OUTPUTS],
+                  sources=window_sources),
+            Stage("loans_features", build_loan_features, inputs=["loans_raw", "issue_months", *FEATURE_INPUTS],
+                  outputs=["engineered_loans", "touched_months", "income_bins"], sources=band_sources,
+                  artifacts=processed_files("loans_processed") + band_artifacts),
+        ]
+    if engine == "partitioned":
+        # These stages fan out over their own process pool, so they run in the parent
+        return [
+            Stage("load", plan_loan_partitions, outputs=["loan_partitions"], sources=[LOANS_FILE]),
+            Stage("window", detect_window_partitioned, inputs=["loan_partitions"],
+                  outputs=["income_sketch", *WINDOW_OUTPUTS], local=True, sources=window_sources),
+            Stage("loans_features", build_loan_features_partitioned,
+                  inputs=["loan_partitions", "income_sketch", *FEATURE_INPUTS],
+                  outputs=["engineered_loans", "touched_months", "income_bins"], local=True, sources=band_sources,
+                  artifacts=processed_files("loans_processed") + band_artifacts),
+        ]
+    raise ValueError(f"Unknown loans engine {engine!r}; use 'pandas' or 'partitioned'")
+
+def build_stages(engine: str = LOANS_ENGINE) -> list[Stage]:
+    # Incremental runs continue from the persisted stress baselines
+    stress_sources = [os.path.join(ANALYTICS_DIR, STATE_FILE)] if INCREMENTAL else []
+    stages = [
+        *loan_stages(engine),
+        *[
+            Stage(name, process_macro_series, inputs=["loan_window"], outputs=[name, f"{name}_hashes"],
+                  params={"name": name, "file_name": file_name, "value_col": value_col, "out_name": out_name},
+                  sources=[os.path.join(RAW_DIR, file_name)])
+            for name, file_name, value_col, out_name in MACRO_SERIES
+        ],
+        Stage("macro", combine_macro,
+              inputs=["loan_window", "manifest", "full_rebuild",
+                      "macro_unrate", "macro_cpi", "macro_dff",
+                      "macro_unrate_hashes", "macro_cpi_hashes", "macro_dff_hashes"],
+              outputs=["macro_monthly", "macro_history", "macro_hashes", "changed_macro_months"],
+              artifacts=processed_files("macro_monthly_processed") + analytics_files("fact_macro_monthly")),
+        Stage("complaints", process_complaints,
+              outputs=["complaints_monthly", "complaints_by_product_month", "complaints_by_state_month"],
+              sources=[COMPLAINTS_FILE],
+              artifacts=(processed_files("complaints_processed") if WRITE_COMPLAINTS_PROCESSED else [])
+              + analytics_files("fact_complaints_monthly", "fact_complaints_by_product_month")
+              + snapshot_files("complaints_processed")),
+        Stage("month_features", build_month_features,
+              inputs=["loan_window", "macro_history", "complaints_monthly", "complaints_by_product_month"],
+              outputs=["macro_features_monthly", "complaint_features_by_product_month"],
+              artifacts=analytics_files("fact_macro_features_monthly", "fact_complaint_features_by_product_month")),
+        Stage("narrative_index", index_narratives, inputs=["full_rebuild"],
+              outputs=["complaint_keywords_monthly", "complaint_topics_monthly"], sources=[COMPLAINTS_FILE],
+              artifacts=[os.path.join(ANALYTICS_DIR, INDEX_DIR, INDEX_MANIFEST)]
+              + analytics_files("fact_complaint_keywords_monthly", "fact_complaint_topics_monthly")),
+        Stage("dim_time", build_dim_time, inputs=["loan_hashes", "macro_monthly", "complaints_monthly"],
+              outputs=["dim_time"], artifacts=analytics_files("dim_time")),
+        Stage("validate", validate_loans, inputs=["engineered_loans", "dim_time", "full_rebuild", "touched_months"],
+              outputs=["loans", "dq_summary"], artifacts=analytics_files("dq_quarantine", "dq_check_summary")),
+        Stage("dims", build_dims, inputs=["loans", "full_rebuild"],
+              outputs=["dim_borrower_segment", "dim_loan_product", "loan_keys"],
+              artifacts=analytics_files("dim_borrower_segment", "dim_loan_product")),
+        Stage("facts", build_facts, inputs=["loans", "loan_keys", "macro_monthly", "full_rebuild", "touched_months"],
+              outputs=["fact_loans_wide", "fact_loans", "aggregates"],
+              artifacts=analytics_files("fact_loans", *AGG_TABLES) + snapshot_files("fact_loans")),
+        Stage("stress_signals", score_stress_signals,
+              inputs=["complaints_monthly", "complaints_by_product_month", "complaints_by_state_month",
+                      "aggregates", "full_rebuild"],
+              outputs=["stress_signals", "stress_signal_correlation"], sources=stress_sources,
+              artifacts=[os.path.join(ANALYTICS_DIR, STATE_FILE)]
+              + analytics_files("fact_stress_signals", "fact_stress_signal_correlation")),
+        Stage("loan_cube", build_loan_cube, inputs=["fact_loans_wide", "full_rebuild", "touched_months"],
+              outputs=["loan_cube", "loan_cube_codes"], artifacts=analytics_files(CUBE_TABLE, CODES_TABLE)),
+        # Parent-process stages: the parse failure report needs every stage's stats
+        Stage("sanity_check", sanity_check,
+              inputs=["fact_loans_wide", "complaints_monthly", "macro_features_monthly"], local=True,
+              cacheable=False),
+        Stage("save_manifest", save_run_manifest,
+              inputs=["loan_hashes", "macro_hashes", "income_bins", "fact_loans", "aggregates"], local=True,
+              cacheable=False),
+    ]
+    if LOAD_TO_DB:
+        stages.append(Stage("db_load", load_db, inputs=["full_rebuild", "touched_months", "aggregates", *DB_TABLES],
+                            local=True, cacheable=False))
+    return stages
+
+def pipeline_version(engine: str) -> str:
+    """Cache version: the pipeline's own sources plus every setting that changes what stages produce."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sources = glob.glob(os.path.join(here, "*.py")) + glob.glob(os.path.join(here, "*.json"))
+    config = json.dumps({
+        "build_version": BUILD_VERSION,
+        "engine": engine,
+        "output_formats": OUTPUT_FORMATS,
+        "incremental": INCREMENTAL,
+        "write_complaints_processed": WRITE_COMPLAINTS_PROCESSED,
+        "dirs": [RAW_DIR, PROCESSED_DIR, ANALYTICS_DIR],
+    }, sort_keys=True)
+    return code_fingerprint(sources, extra=config)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the raw files and build the processed / analytics tables.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for independent stages (default 1: run in order in this process)")
+    parser.add_argument("--stage", action="append", dest="stages", metavar="NAME",
+                        help="Run only this stage and the stages it depends on (repeatable)")
+    parser.add_argument("--engine", choices=["pandas", "partitioned"], default=LOANS_ENGINE,
+                        help="Loans engine for load / window / loans_features")
+    parser.add_argument("--no-cache", action="store_true", help="Run every stage, ignoring and not filling the cache")
+    parser.add_argument("--list-stages", action="store_true", help="Print the stage graph and exit")
+    args = parser.parse_args()
+
+    stages = build_stages(args.engine)
+    if args.list_stages:
+        for stage in resolve(stages, args.stages):
+            print(f"{stage.name:<16} <- {', '.join(stage.inputs) or '-'}")
+    else:
+        os.makedirs(PROCESSED_DIR, exist_ok=True)
+        os.makedirs(ANALYTICS_DIR, exist_ok=True)
+
+        report = RunReport(RUN_REPORT_DIR, profile_stage=PROFILE_STAGE, profilers=PROFILERS)
+        cache = None
+        if USE_CACHE and not args.no_cache:
+            cache = StageCache(CACHE_DIR, version=pipeline_version(args.engine), max_bytes=CACHE_MAX_BYTES)
+        run_stages(stages, targets=args.stages, workers=args.workers, report=report, cache=cache)
+
+        print("\n===== RUN REPORT (seconds / MB) =====")
+        print(report.to_frame().to_string(index=False))
+        print(f"Saved run report: {report.write_json()}")
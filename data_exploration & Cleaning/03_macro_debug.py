@@ -1,5 +1,7 @@
 import pandas as pd
 
+from snapshots import SNAPSHOT_DIR, Snapshot
+
 RAW_DIR = "data/raw"
 
 # -----------------------------
@@ -78,4 +80,30 @@ unrate_2018 = unrate[(unrate["observation_date"] >= "2018-01-01") &
 print("\nRows in 2018 Q1:", len(unrate_2018))
 print(unrate_2018)
 
+# -----------------------------
+print("\n==============================")
+print(" LOAN / COMPLAINT MONTHS vs MACRO ")
+print("==============================")
+
+# Date ranges straight off the memory-mapped snapshots (no CSV parse); written by 02
+macro_ranges = {
+    "CPI": (cpi["observation_date"].min(), cpi["observation_date"].max()),
+    "DFF": (dff["observation_date"].min(), dff["observation_date"].max()),
+    "UNRATE": (unrate["observation_date"].min(), unrate["observation_date"].max()),
+}
+for name, col in [("fact_loans", "issue_month_start"), ("complaints_processed", "date_received")]:
+    if not Snapshot.exists(name):
+        print(f"\n{name}: no snapshot in {SNAPSHOT_DIR}/ (run 02_clean_feature_engineer.py)")
+        continue
+    snap = Snapshot(name)
+    start, end = snap.date_range(col)
+    if pd.isna(start):
+        print(f"\n{name}.{col}: no dates")
+        continue
+    print(f"\n{name}.{col}: {start.date()} to {end.date()} ({snap.rows:,} rows, "
+          f"{snap.missing_pct([col]).iloc[0]:.2f}% missing)")
+    for series, (lo, hi) in macro_ranges.items():
+        covered = lo <= start.replace(day=1) and hi >= end.replace(day=1)
+        print(f"   {series}: {lo.date()} to {hi.date()} -> {'covers' if covered else 'DOES NOT cover'} {name}")
+
 print("\nMacro debug complete.")
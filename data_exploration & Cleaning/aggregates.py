@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Materialized versions of the SQL/*-view.sql aggregates
+# -----------------------------
+# Same columns and grain as vw_portfolio_monthly / vw_risk_by_product / vw_risk_by_segment,
+# computed once per load so the views can read a few thousand summary rows instead of
+# re-grouping fact_loans on every dashboard interaction. Every table is keyed by
+# month_start, so an incremental run only recomputes (and replaces) the touched months.
+
+AGG_TABLES = ["agg_portfolio_monthly", "agg_risk_by_product", "agg_risk_by_segment"]
+
+PRODUCT_KEYS = ["loan_purpose", "term_bucket", "grade"]
+SEGMENT_KEYS = ["income_band", "emp_length_bucket", "homeownership", "verified_income", "grade"]
+MACRO_COLS = ["unemployment_rate", "cpi_inflation_proxy", "fed_funds_rate_avg"]
+
+def _round(s: pd.Series, decimals: int) -> pd.Series:
+    # MySQL ROUND() on DECIMAL rounds half away from zero; numpy rounds half to even
+    factor = 10.0 ** decimals
+    return np.sign(s) * np.floor(np.abs(s) * factor + 0.5) / factor
+
+def _coalesce(s: pd.Series, default: str = "Unknown") -> pd.Series:
+    # COALESCE(col, 'Unknown') on text keys
+    return s.astype(object).where(s.notna(), default).astype(str)
+
+def _risk_measures(fact_loans: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    df = pd.DataFrame({k: fact_loans[k] for k in keys})
+    df["loan_amount"] = fact_loans["loan_amount"]
+    df["interest_rate"] = fact_loans["interest_rate"]
+    df["high_risk_flag"] = fact_loans["high_risk_flag"]
+    df["behavioral_risk_flag"] = fact_loans["behavioral_risk_flag"]
+    df["high_risk_amount"] = np.where(fact_loans["high_risk_flag"] == 1, fact_loans["loan_amount"], 0)
+
+    out = df.groupby(keys, dropna=False, observed=True, sort=True).agg(
+        loan_count=("loan_amount", "size"),
+        exposure=("loan_amount", lambda s: s.sum(min_count=1)),
+        avg_interest_rate=("interest_rate", "mean"),
+        high_risk_rate=("high_risk_flag", "mean"),
+        behavioral_risk_rate=("behavioral_risk_flag", "mean"),
+        high_risk_exposure=("high_risk_amount", "sum"),
+    ).reset_index()
+
+    out["avg_interest_rate"] = _round(out["avg_interest_rate"], 3)
+    out["high_risk_rate"] = _round(out["high_risk_rate"], 4)
+    out["behavioral_risk_rate"] = _round(out["behavioral_risk_rate"], 4)
+    return out
+
+def portfolio_monthly(fact_loans: pd.DataFrame, macro_monthly: pd.DataFrame) -> pd.DataFrame:
+    """Rows of vw_portfolio_monthly for every issue month present in fact_loans."""
+    df = pd.DataFrame({
+        "month_start": fact_loans["issue_month_start"],
+        "loan_amount": fact_loans["loan_amount"],
+        "interest_rate": fact_loans["interest_rate"],
+        "behavioral_risk_flag": fact_loans["behavioral_risk_flag"],
+        "high_risk_amount": np.where(fact_loans["high_risk_flag"] == 1, fact_loans["loan_amount"], 0),
+    })
+    out = df.groupby("month_start", dropna=False, sort=True).agg(
+        loan_count=("loan_amount", "size"),
+        total_exposure=("loan_amount", lambda s: s.sum(min_count=1)),
+        high_risk_exposure=("high_risk_amount", "sum"),
+        avg_interest_rate=("interest_rate", "mean"),
+        behavioral_risk_rate=("behavioral_risk_flag", "mean"),
+    ).reset_index()
+
+    out.insert(1, "year", out["month_start"].dt.year)
+    out.insert(2, "month", out["month_start"].dt.month)
+    out.insert(6, "high_risk_exposure_pct", _round(out["high_risk_exposure"] / out["total_exposure"].replace(0, np.nan), 4))
+    out["avg_interest_rate"] = _round(out["avg_interest_rate"], 3)
+    out["behavioral_risk_rate"] = _round(out["behavioral_risk_rate"], 4)
+
+    macro = macro_monthly[["month_start"] + [c for c in MACRO_COLS if c in macro_monthly.columns]].rename(
+        columns={"cpi_inflation_proxy": "cpi_proxy", "fed_funds_rate_avg": "fed_funds_rate"}
+    )
+    return out.merge(macro, on="month_start", how="left")
+
+def risk_by_product(fact_loans: pd.DataFrame) -> pd.DataFrame:
+    """Rows of vw_risk_by_product (month x loan_purpose x term_bucket x grade)."""
+    df = fact_loans.copy()
+    for k in PRODUCT_KEYS:
+        df[k] = _coalesce(df[k])
+    return _risk_measures(df.rename(columns={"issue_month_start": "month_start"}), ["month_start"] + PRODUCT_KEYS)
+
+def risk_by_segment(fact_loans: pd.DataFrame) -> pd.DataFrame:
+    """Rows of vw_risk_by_segment (month x income/emp-length/homeownership/verification x grade)."""
+    df = fact_loans.copy()
+    for k in SEGMENT_KEYS:
+        df[k] = _coalesce(df[k])
+    return _risk_measures(df.rename(columns={"issue_month_start": "month_start"}), ["month_start"] + SEGMENT_KEYS)
+
+def build_aggregates(fact_loans: pd.DataFrame, macro_monthly: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    return {
+        "agg_portfolio_monthly": portfolio_monthly(fact_loans, macro_monthly),
+        "agg_risk_by_product": risk_by_product(fact_loans),
+        "agg_risk_by_segment": risk_by_segment(fact_loans),
+    }
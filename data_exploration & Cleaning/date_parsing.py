@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Deterministic date parsing
+# -----------------------------
+# Date columns in these files have few distinct values (issue_month: dozens across
+# millions of loans; complaint dates: a few thousand days), so values are factorized,
+# only the distinct strings are parsed with one explicit format detected from a
+# sample, and the result is mapped back through the codes.
+
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m",
+    "%b-%Y",
+    "%B-%Y",
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y%m%d",
+]
+
+SAMPLE_SIZE = 500
+
+# Per-column parse statistics of this process (see parse_failure_report)
+PARSE_STATS: dict[str, dict] = {}
+
+def detect_format(values, candidates: list[str] = CANDIDATE_FORMATS, sample_size: int = SAMPLE_SIZE) -> str | None:
+    """Return the candidate format that parses the largest share of a sample of distinct values."""
+    sample = pd.Series(pd.unique(pd.Series(values).dropna().astype(str).str.strip()))
+    sample = sample[sample != ""].head(sample_size)
+    if sample.empty:
+        return None
+
+    best, best_ok = None, 0.0
+    for fmt in candidates:
+        ok = pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean()
+        if ok > best_ok:
+            best, best_ok = fmt, ok
+        if ok == 1.0:
+            break
+    return best
+
+def _parse_uniques(uniques: pd.Index, fmt: str | None, candidates: list[str]) -> pd.DatetimeIndex:
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    parsed = pd.to_datetime(text, format=fmt, errors="coerce") if fmt else pd.Series(pd.NaT, index=text.index)
+
+    # Mixed-format files: remaining distinct values try the other candidates in order
+    for other in candidates:
+        missing = parsed.isna() & text.ne("")
+        if not missing.any():
+            break
+        if other != fmt:
+            parsed[missing] = pd.to_datetime(text[missing], format=other, errors="coerce")
+    return pd.DatetimeIndex(parsed)
+
+def parse_dates(series: pd.Series, name: str | None = None, fmt: str | None = None,
+                candidates: list[str] = CANDIDATE_FORMATS, stats: dict | None = None) -> pd.Series:
+    """
+    Parse a text date column to datetime64 by parsing distinct values only.
+    fmt pins the primary format (e.g. one detected on an earlier chunk); otherwise
+    it is detected from a sample. Failures become NaT and are counted in PARSE_STATS[name]
+    (or in `stats`, e.g. a per-partition dict later folded in with merge_parse_stats).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if fmt is None:
+        fmt = detect_format(uniques, candidates)
+
+    parsed_uniques = _parse_uniques(uniques, fmt, candidates)
+    # Code -1 (missing input) maps onto the trailing NaT slot
+    lookup = np.append(parsed_uniques.values.astype("datetime64[ns]"), np.datetime64("NaT", "ns"))
+    out = pd.Series(lookup[codes], index=series.index, name=series.name)
+
+    if name:
+        _record(PARSE_STATS if stats is None else stats, name, series, codes, parsed_uniques, fmt)
+    return out
+
+def _record(target: dict, name: str, series: pd.Series, codes: np.ndarray, parsed_uniques: pd.DatetimeIndex,
+            fmt: str | None):
+    failed_unique = np.flatnonzero(parsed_uniques.isna())
+    stats = target.setdefault(name, {"format": fmt, "rows": 0, "missing_rows": 0,
+                                          "failed_rows": 0, "distinct_values": 0, "failed_values": []})
+    stats["format"] = stats["format"] or fmt
+    stats["rows"] += len(series)
+    stats["missing_rows"] += int((codes == -1).sum())
+    stats["failed_rows"] += int(np.isin(codes, failed_unique).sum()) if len(failed_unique) else 0
+    stats["distinct_values"] += len(parsed_uniques)
+    # Keep a few examples of unparseable values for debugging
+    examples = [str(series.iloc[int(np.argmax(codes == i))]) for i in failed_unique[:5]]
+    stats["failed_values"] = (stats["failed_values"] + examples)[:5]
+
+def merge_parse_stats(stats: dict, target: dict | None = None):
+    """Add per-column counts collected elsewhere (e.g. one partition of a file) into PARSE_STATS."""
+    target = PARSE_STATS if target is None else target
+    for name, s in stats.items():
+        if name not in target:
+            target[name] = {**s, "failed_values": list(s["failed_values"])}
+            continue
+        t = target[name]
+        t["format"] = t["format"] or s["format"]
+        for k in ("rows", "missing_rows", "failed_rows", "distinct_values"):
+            t[k] += s[k]
+        t["failed_values"] = (t["failed_values"] + s["failed_values"])[:5]
+
+def parse_failure_report() -> pd.DataFrame:
+    """Per-column summary of every parse_dates call made with a name in this run."""
+    if not PARSE_STATS:
+        return pd.DataFrame(columns=["column", "format", "rows", "missing_rows", "failed_rows", "failed_pct"])
+    report = pd.DataFrame([{"column": k, **v} for k, v in PARSE_STATS.items()])
+    report["failed_pct"] = (report["failed_rows"] / report["rows"].where(report["rows"] > 0) * 100).round(4)
+    return report
+
+def month_start(dt: pd.Series) -> pd.Series:
+    """First day of the month, via a datetime64[M] cast (NaT stays NaT)."""
+    values = dt.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]")
+    return pd.Series(values, index=dt.index, name=dt.name)
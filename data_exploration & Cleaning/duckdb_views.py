@@ -0,0 +1,196 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import pandas as pd
+
+from db_loader import LOAD_ORDER
+
+# DuckDB is optional: only this offline query layer needs it
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# -----------------------------
+# Config
+# -----------------------------
+ANALYTICS_DIR = "data/analytics"
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SQL")
+VIEW_SQL_GLOB = "*view.sql"
+
+# MySQL-only syntax in the view files -> DuckDB equivalent
+MYSQL_TO_DUCKDB = [
+    (r"`([^`]*)`", r'"\1"'),
+    (r"\bDATE_FORMAT\s*\(", "strftime("),
+    (r"\bCURDATE\s*\(\s*\)", "current_date"),
+    (r"\bIFNULL\s*\(", "COALESCE("),
+]
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _require_duckdb():
+    if duckdb is None:
+        raise ImportError("The offline view layer needs duckdb: pip install duckdb")
+
+def _quote(path: str) -> str:
+    return "'" + path.replace(os.sep, "/").replace("'", "''") + "'"
+
+def table_source(name: str, base_dir: str) -> str | None:
+    """DuckDB scan for a table written by table_io.write_table; Parquet preferred, like read_table."""
+    part_dir = os.path.join(base_dir, name)
+    pq_file = os.path.join(base_dir, f"{name}.parquet")
+    csv_file = os.path.join(base_dir, f"{name}.csv")
+    if os.path.isdir(part_dir):
+        return f"read_parquet({_quote(os.path.join(part_dir, '**', '*.parquet'))}, hive_partitioning = true)"
+    if os.path.exists(pq_file):
+        return f"read_parquet({_quote(pq_file)})"
+    if os.path.exists(csv_file):
+        return f"read_csv({_quote(csv_file)}, header = true)"
+    return None
+
+def translate_view_sql(sql_text: str) -> list[tuple[str, str]]:
+    """
+    Split a MySQL view file into (view_name, DuckDB statement) pairs: drops comments
+    and USE statements and rewrites the few MySQL-only functions. Window functions
+    (LAG ... OVER), COALESCE, NULLIF and ROUND are the same in both dialects.
+    """
+    sql_text = re.sub(r"--[^\n]*", "", sql_text)
+    views = []
+    for stmt in [s.strip() for s in sql_text.split(";") if s.strip()]:
+        if re.match(r"USE\b", stmt, re.I):
+            continue
+        m = re.match(r"CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+(\w+)\s+AS\b", stmt, re.I)
+        if not m:
+            continue
+        for pattern, repl in MYSQL_TO_DUCKDB:
+            stmt = re.sub(pattern, repl, stmt, flags=re.I)
+        views.append((m.group(1), re.sub(r"^CREATE\s+VIEW\b", "CREATE OR REPLACE VIEW", stmt, flags=re.I)))
+    return views
+
+def load_view_definitions(sql_dir: str = SQL_DIR) -> dict[str, str]:
+    views = {}
+    for path in sorted(glob.glob(os.path.join(sql_dir, VIEW_SQL_GLOB))):
+        with open(path) as f:
+            views.update(translate_view_sql(f.read()))
+    return views
+
+# -----------------------------
+# Catalog
+# -----------------------------
+class ViewCatalog:
+    """
+    In-process DuckDB database over the pipeline outputs: each analytics table is a
+    view on its CSV / Parquet files (or an in-memory copy with materialize=True) and
+    every SQL/*view.sql definition is created on top, so the vw_* views run without
+    MySQL and come back as DataFrames.
+    """
+
+    def __init__(self, analytics_dir: str = ANALYTICS_DIR, sql_dir: str = SQL_DIR, materialize: bool = False,
+                 threads: int | None = None, database: str = ":memory:"):
+        _require_duckdb()
+        self.con = duckdb.connect(database)
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        self.tables = self._register_tables(analytics_dir, materialize)
+        self.views, self.skipped = self._create_views(load_view_definitions(sql_dir))
+
+    def _register_tables(self, analytics_dir: str, materialize: bool) -> dict[str, str]:
+        kind = "TABLE" if materialize else "VIEW"
+        tables = {}
+        for name in LOAD_ORDER:
+            source = table_source(name, analytics_dir)
+            if source is None:
+                continue
+            self.con.execute(f"CREATE OR REPLACE {kind} {name} AS SELECT * FROM {source}")
+            tables[name] = source
+        return tables
+
+    def _create_views(self, definitions: dict[str, str]) -> tuple[list[str], dict[str, str]]:
+        # Views may select from other views (vw_fact_loans_features <- vw_fact_loans):
+        # keep retrying until a pass creates nothing new
+        pending, created, errors = dict(definitions), [], {}
+        while pending:
+            errors, before = {}, len(pending)
+            for name, stmt in list(pending.items()):
+                try:
+                    self.con.execute(stmt)
+                except duckdb.CatalogException as e:
+                    errors[name] = str(e).splitlines()[0]
+                    continue
+                created.append(name)
+                del pending[name]
+            if len(pending) == before:
+                break
+        return created, errors
+
+    def query(self, sql: str, params: list | None = None) -> pd.DataFrame:
+        return self.con.execute(sql, params or []).df()
+
+    def view(self, name: str, where: str | None = None, order_by: str | None = None,
+             limit: int | None = None) -> pd.DataFrame:
+        if name not in self.views and name not in self.tables:
+            raise KeyError(f"Unknown view or table: {name}. Available: {self.views + list(self.tables)}")
+        sql = f"SELECT * FROM {name}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql)
+
+    def check(self) -> pd.DataFrame:
+        """Run every view once: rows, columns, seconds and all-null columns (a sign of a broken join)."""
+        stats = []
+        for name in self.views:
+            t0 = time.perf_counter()
+            df = self.view(name)
+            stats.append({"view": name, "rows": len(df), "columns": df.shape[1],
+                          "seconds": round(time.perf_counter() - t0, 4),
+                          "all_null_cols": ", ".join(c for c in df.columns if len(df) and df[c].isna().all())})
+        return pd.DataFrame(stats)
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -----------------------------
+# CLI: query the vw_* views offline
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the SQL/ views in-process with DuckDB over data/analytics.")
+    parser.add_argument("--analytics-dir", default=ANALYTICS_DIR)
+    parser.add_argument("--view", help="view (or table) to print, e.g. vw_portfolio_monthly")
+    parser.add_argument("--where", help="optional filter for --view, e.g. \"grade = 'D'\"")
+    parser.add_argument("--sql", help="arbitrary query against the registered tables and views")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--materialize", action="store_true", help="copy the tables into memory first")
+    parser.add_argument("--check", action="store_true", help="run every view; exit 1 if any could not be created")
+    args = parser.parse_args()
+
+    with ViewCatalog(args.analytics_dir, materialize=args.materialize) as catalog:
+        print(f"Tables: {', '.join(catalog.tables) or '-'}")
+        print(f"Views:  {', '.join(catalog.views) or '-'}")
+        for name, err in catalog.skipped.items():
+            print(f"Skipped {name}: {err}")
+
+        if args.view:
+            print(f"\n===== {args.view} =====")
+            print(catalog.view(args.view, where=args.where, limit=args.limit).to_string(index=False))
+        if args.sql:
+            print("\n===== QUERY =====")
+            print(catalog.query(args.sql).head(args.limit).to_string(index=False))
+        if args.check:
+            print("\n===== VIEW CHECK =====")
+            print(catalog.check().to_string(index=False))
+            if catalog.skipped:
+                sys.exit(1)
@@ -0,0 +1,87 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import QuantileSketch
+
+# -----------------------------
+# Versioned income band cut points
+# -----------------------------
+# Quartile cut points are fitted from a QuantileSketch (merged over chunks / partitions)
+# and recorded in data/analytics/_income_bands.json. Every distinct set of cut points
+# gets a new version number. A fit equal to the current version reuses it, so the same
+# data never bumps the version. Reporting can pin a version ("freeze") so bands do not
+# move when the population shifts.
+
+BANDS_FILE = "_income_bands.json"
+QUARTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
+# Used when quartiles collapse (too few distinct incomes), as pd.qcut would fail
+FALLBACK_CUT_POINTS = [0, 40000, 80000, 120000, np.inf]
+
+def fit_cut_points(sketch: QuantileSketch) -> list[float]:
+    """Quartile cut points like pd.qcut(income, 4); the fixed fallback bands if any two coincide."""
+    bins = sketch.quantiles(QUARTILES)
+    if not sketch.n or np.any(np.diff(bins) <= 0):
+        return list(FALLBACK_CUT_POINTS)
+    return [float(b) for b in bins]
+
+def income_sketch(income: pd.Series, chunk_rows: int = 1_000_000) -> QuantileSketch:
+    sketch = QuantileSketch()
+    values = income.to_numpy(dtype=float, na_value=np.nan)
+    for start in range(0, len(values), chunk_rows):
+        sketch.update(values[start:start + chunk_rows])
+    return sketch
+
+class IncomeBandVersions:
+    def __init__(self, versions: list[dict] | None = None, current: int | None = None):
+        self.versions = versions or []
+        self.current_version = current
+
+    @property
+    def current(self) -> dict | None:
+        return next((v for v in self.versions if v["version"] == self.current_version), None)
+
+    def get(self, version: int) -> dict:
+        for v in self.versions:
+            if v["version"] == version:
+                return v
+        raise KeyError(f"Unknown income band version {version}; have {[v['version'] for v in self.versions]}")
+
+    def record(self, cut_points: list[float], sketch: QuantileSketch) -> dict:
+        """Make cut_points the current version (a new one unless they equal an existing version)."""
+        for v in self.versions:
+            if v["cut_points"] == cut_points:
+                self.current_version = v["version"]
+                return v
+        version = {
+            "version": max((v["version"] for v in self.versions), default=0) + 1,
+            "cut_points": cut_points,
+            "fitted_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "n": sketch.n,
+            "sketch_mode": "exact" if sketch.exact else "buckets",
+            "alpha": sketch.alpha,
+        }
+        self.versions.append(version)
+        self.current_version = version["version"]
+        return version
+
+    @classmethod
+    def load(cls, base_dir: str) -> "IncomeBandVersions":
+        path = os.path.join(base_dir, BANDS_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            d = json.load(f)
+        # JSON has no Infinity: open edges are stored as null
+        for v in d["versions"]:
+            v["cut_points"] = [np.inf if b is None else b for b in v["cut_points"]]
+        return cls(d["versions"], d["current"])
+
+    def save(self, base_dir: str):
+        path = os.path.join(base_dir, BANDS_FILE)
+        versions = [{**v, "cut_points": [None if np.isinf(b) else b for b in v["cut_points"]]} for v in self.versions]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"current": self.current_version, "versions": versions}, f, indent=2)
+        os.replace(tmp, path)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Partition manifest
+# -----------------------------
+# Lives next to the analytics tables and records, per materialized month, the hash of
+# the raw input slice it was built from (plus anything needed to rebuild consistently).
+MANIFEST_FILE = "_partitions.json"
+
+def month_key(ts: pd.Timestamp) -> str:
+    return pd.Timestamp(ts).strftime("%Y-%m-%d")
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """uint64 hash of every row's values (row order preserved)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def month_hashes(hashes: np.ndarray, months, columns, salt: str = "") -> dict[str, str]:
+    """
+    Fold precomputed row hashes into one hash per month (rows grouped by the aligned
+    `months` array). Lets partitioned readers hash their rows separately and still get
+    the same per-month hashes as hashing the whole file at once.
+    """
+    months = np.asarray(months)
+    header = ("|".join(map(str, columns)) + salt).encode()
+
+    out = {}
+    for month, idx in pd.Series(months).groupby(months).indices.items():
+        h = hashlib.blake2b(header, digest_size=16)
+        h.update(hashes[idx].tobytes())
+        out[month_key(month)] = h.hexdigest()
+    return dict(sorted(out.items()))
+
+def slice_hashes(df: pd.DataFrame, months: pd.Series, salt: str = "") -> dict[str, str]:
+    """
+    Content hash of every month slice of df (rows grouped by the aligned `months`
+    series). Rows with no month are ignored. Hashes cover column names and row order,
+    and `salt` (e.g. the pipeline version) so logic changes invalidate old partitions.
+    """
+    return month_hashes(row_hashes(df), months.to_numpy(), df.columns, salt)
+
+def combine_hashes(*hash_maps: dict[str, str]) -> dict[str, str]:
+    """Merge per-month hashes of several inputs (e.g. the three FRED series) into one per month."""
+    months = sorted(set().union(*hash_maps))
+    out = {}
+    for m in months:
+        h = hashlib.blake2b(digest_size=16)
+        for hm in hash_maps:
+            h.update(hm.get(m, "-").encode())
+        out[m] = h.hexdigest()
+    return out
+
+def diff_partitions(old: dict[str, str], new: dict[str, str]) -> tuple[list[str], list[str]]:
+    """Return (new or changed months, months that disappeared from the input)."""
+    changed = sorted(m for m, h in new.items() if old.get(m) != h)
+    removed = sorted(m for m in old if m not in new)
+    return changed, removed
+
+def load_manifest(base_dir: str) -> dict:
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest: dict, base_dir: str):
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
@@ -0,0 +1,196 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+
+# resource is Unix-only; on Windows peak RSS is simply not reported
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# -----------------------------
+# Memory
+# -----------------------------
+def peak_rss_mb() -> float | None:
+    """High-water mark of the process resident set size so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+def frame_mb(df: pd.DataFrame | None) -> float | None:
+    if df is None:
+        return None
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def _round(x: float | None, digits: int = 1) -> float | None:
+    return None if x is None else round(x, digits)
+
+# -----------------------------
+# Stage report
+# -----------------------------
+# One record per pipeline stage: wall / CPU seconds, rows in and out, size of the
+# stage's output frame and the process peak RSS when it finished (rss_growth_mb is
+# how much the stage pushed that high-water mark up). A single chosen stage can
+# additionally be run under cProfile and/or tracemalloc; their dumps land next to
+# the JSON report.
+
+PROFILERS = ("cprofile", "tracemalloc")
+REPORT_COLS = ["stage", "wall_s", "cpu_s", "rows_in", "rows_out", "frame_mb", "peak_rss_mb", "rss_growth_mb",
+               "cached"]
+
+def _slug(stage: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", stage.lower()).strip("_")
+
+class RunReport:
+    """
+    Stage timings for one pipeline run. Wrap a stage either with begin()/end() or
+    with the stage() context manager:
+
+        with report.stage("macro", rows_in=len(raw)) as rec:
+            ...
+            rec["out"] = macro_monthly
+
+    profile_stage names the stage to profile; profilers picks "cprofile",
+    "tracemalloc" or both.
+    """
+
+    def __init__(self, out_dir: str | None = None, profile_stage: str | None = None,
+                 profilers: tuple[str, ...] = ("cprofile",), run_id: str | None = None):
+        unknown = set(profilers) - set(PROFILERS)
+        if unknown:
+            raise ValueError(f"Unsupported profilers {sorted(unknown)}; use {PROFILERS}")
+        self.out_dir = out_dir
+        self.profile_stage = profile_stage
+        self.profilers = tuple(profilers)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.started = time.perf_counter()
+        self.records = []
+        self._open = None
+
+    # --- stage boundaries
+    def begin(self, stage: str, rows_in: int | None = None) -> dict:
+        if self._open is not None:
+            raise RuntimeError(f"Stage {self._open['stage']!r} is still open")
+        rec = {"stage": stage, "started_at": datetime.now().isoformat(timespec="seconds"), "rows_in": rows_in}
+        self._open = rec
+        self._peak_before = peak_rss_mb()
+        self._profiler = None
+        if stage == self.profile_stage:
+            if "tracemalloc" in self.profilers:
+                tracemalloc.start()
+            if "cprofile" in self.profilers:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+        self._t0, self._c0 = time.perf_counter(), time.process_time()
+        return rec
+
+    def config(self) -> dict:
+        """Constructor arguments for a report of the same run in another process."""
+        return {"out_dir": self.out_dir, "profile_stage": self.profile_stage,
+                "profilers": self.profilers, "run_id": self.run_id}
+
+    def end(self, out: pd.DataFrame | list[pd.DataFrame] | None = None, rows_out: int | None = None,
+            **extra) -> dict:
+        rec = self._open
+        if rec is None:
+            raise RuntimeError("end() called without begin()")
+        wall, cpu = time.perf_counter() - self._t0, time.process_time() - self._c0
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            rec["cprofile_file"] = self._dump_cprofile(rec["stage"])
+        if rec["stage"] == self.profile_stage and tracemalloc.is_tracing():
+            rec["tracemalloc_peak_mb"] = _round(tracemalloc.get_traced_memory()[1] / 1024 ** 2)
+            rec["tracemalloc_file"] = self._dump_tracemalloc(rec["stage"])
+            tracemalloc.stop()
+
+        out = rec.pop("out", out)
+        frames = [] if out is None else [out] if isinstance(out, pd.DataFrame) else list(out)
+        peak = peak_rss_mb()
+        rec.update({
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "rows_out": rows_out if rows_out is not None else (sum(len(f) for f in frames) if frames else None),
+            "frame_mb": _round(sum(frame_mb(f) for f in frames)) if frames else None,
+            "peak_rss_mb": _round(peak),
+            "rss_growth_mb": None if peak is None else _round(peak - self._peak_before),
+            **extra,
+        })
+        self.records.append(rec)
+        self._open = None
+        return rec
+
+    @contextmanager
+    def stage(self, stage: str, rows_in: int | None = None):
+        rec = self.begin(stage, rows_in)
+        try:
+            yield rec
+        finally:
+            self.end()
+
+    # --- profiler dumps
+    def _profile_path(self, stage: str, ext: str) -> str | None:
+        if not self.out_dir:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        return os.path.join(self.out_dir, f"{self.run_id}_{_slug(stage)}.{ext}")
+
+    def _dump_cprofile(self, stage: str) -> str | None:
+        stats = pstats.Stats(self._profiler, stream=io.StringIO()).sort_stats("cumulative")
+        path = self._profile_path(stage, "prof")
+        if path:
+            # Binary dump for snakeviz / pstats; the top of it is also printed
+            stats.dump_stats(path)
+        text = io.StringIO()
+        stats.stream = text
+        stats.print_stats(25)
+        print(f"\n===== cProfile: {stage} (top 25 by cumulative time) =====")
+        print(text.getvalue())
+        return path
+
+    def _dump_tracemalloc(self, stage: str) -> str | None:
+        top = tracemalloc.take_snapshot().statistics("lineno")[:25]
+        lines = [str(s) for s in top]
+        print(f"\n===== tracemalloc: {stage} (top 25 allocation sites still live) =====")
+        print("\n".join(lines))
+        path = self._profile_path(stage, "tracemalloc.txt")
+        if path:
+            with open(path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+        return path
+
+    # --- output
+    def to_frame(self) -> pd.DataFrame:
+        report = pd.DataFrame(self.records).reindex(columns=REPORT_COLS)
+        return report.astype({"rows_in": "Int64", "rows_out": "Int64"})
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "total_wall_s": round(time.perf_counter() - self.started, 3),
+            "peak_rss_mb": _round(peak_rss_mb()),
+            "profile_stage": self.profile_stage,
+            "stages": self.records,
+        }
+
+    def write_json(self, path: str | None = None) -> str:
+        """Write the run report (default: <out_dir>/run_<run_id>.json) and return its path."""
+        if path is None:
+            if not self.out_dir:
+                raise ValueError("RunReport has no out_dir; pass an explicit path")
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, f"run_{self.run_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
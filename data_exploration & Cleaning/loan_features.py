@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from income_bands import fit_cut_points, income_sketch
+from quantile_sketch import QuantileSketch
+from risk_rules import RiskRuleEngine
+
+# -----------------------------
+# Loan feature transform
+# -----------------------------
+# Row-local cleaning + features of section 5, shared by the in-memory pandas path and
+# the partitioned engine. Everything here is row-by-row except the income quartiles,
+# whose cut points are passed in (fitted once over all loans) when partitions are used.
+
+# Exclude out-of-scope / low-quality fields from analytics layer (do NOT touch raw)
+DROP_LOANS_ANALYTICS = [
+    "annual_income_joint",
+    "verification_income_joint",
+    "debt_to_income_joint",
+]
+
+BEHAVIOR_COLS = [
+    "months_since_last_delinqu",
+    "months_since_90d_late",
+    "num_accounts_120d_past_due",
+    "num_historical_failed_to_pay",
+    "account_never_delinqu_percent",
+]
+
+INCOME_BAND_LABELS = ["Low", "Lower-Mid", "Upper-Mid", "High"]
+EMP_LENGTH_BINS = [-np.inf, 0, 2, 5, 10, np.inf]
+EMP_LENGTH_LABELS = ["0 or less", "1-2", "3-5", "6-10", "10+"]
+
+def first_existing_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
+    for c in candidates:
+        if c in df.columns:
+            return c
+    return None
+
+def loan_columns(loans: pd.DataFrame) -> tuple[str | None, str | None, str | None]:
+    """(annual income, interest rate, loan amount) column names as they appear in this file."""
+    return (
+        first_existing_col(loans, ["annual_income", "annual_inc"]),
+        first_existing_col(loans, ["interest_rate", "int_rate"]),
+        first_existing_col(loans, ["loan_amount", "loan_amnt"]),
+    )
+
+def clean_income(income: pd.Series) -> pd.Series:
+    # Non-positive incomes are data errors, not a band
+    return income.where(~(income <= 0))
+
+def fit_income_bins(income: pd.Series | QuantileSketch) -> list[float]:
+    """
+    Quartile cut points (as pd.qcut) of an income column or of a sketch merged over
+    chunks / partitions; fixed fallback bands when quartiles collapse.
+    """
+    return fit_cut_points(income if isinstance(income, QuantileSketch) else income_sketch(income))
+
+def income_band_edges(bins: list[float]) -> list[float]:
+    """pd.cut edges for fitted cut points: the outer edges are opened to +/- inf."""
+    return [-np.inf] + list(bins[1:-1]) + [np.inf]
+
+def income_band(income: pd.Series, bins: list[float] | None = None) -> tuple[pd.Series, list[float]]:
+    """
+    Quartile income bands. With bins=None the quartiles are fitted on `income`
+    (pd.qcut); otherwise the given cut points are applied, with open outer edges so
+    later loads outside the fitted range still land in Low/High.
+    """
+    if bins is None:
+        try:
+            bands, bins = pd.qcut(income, q=4, labels=INCOME_BAND_LABELS, retbins=True)
+            return bands, [float(b) for b in bins]
+        except ValueError:
+            bins = [0, 40000, 80000, 120000, np.inf]
+            return pd.cut(income, bins=bins, labels=INCOME_BAND_LABELS), bins
+
+    return pd.cut(income, bins=income_band_edges(bins), labels=INCOME_BAND_LABELS), list(bins)
+
+def engineer_features(loans: pd.DataFrame, issue_months: pd.DataFrame, macro_monthly: pd.DataFrame,
+                      risk_rules: RiskRuleEngine, income_bins: list[float] | None = None
+                      ) -> tuple[pd.DataFrame, list[float] | None]:
+    """
+    Add the section-5 features to `loans` in place and return (loans, income cut points).
+    issue_months holds issue_month_dt / issue_month_start aligned on the loans index.
+    """
+    # Parsed issue_month and join key from the window detection (aligned on the row index;
+    # reindexed because assigning a Series to an empty frame would adopt the Series' rows)
+    loans["issue_month_dt"] = issue_months["issue_month_dt"].reindex(loans.index)
+    loans["issue_month_start"] = issue_months["issue_month_start"].reindex(loans.index)
+
+    for col in DROP_LOANS_ANALYTICS:
+        if col in loans.columns:
+            loans.drop(columns=[col], inplace=True)
+
+    # Normalize common numeric fields (light-touch sanity guards)
+    annual_inc_col, int_rate_col, loan_amt_col = loan_columns(loans)
+
+    if annual_inc_col:
+        loans[annual_inc_col] = clean_income(loans[annual_inc_col])
+
+    if int_rate_col:
+        loans.loc[(loans[int_rate_col] < 0) | (loans[int_rate_col] > 100), int_rate_col] = np.nan
+
+    if loan_amt_col:
+        loans.loc[loans[loan_amt_col] <= 0, loan_amt_col] = np.nan
+
+    # --- Risk Segmentation (grade -> risk_band / high_risk_flag) + Behavioral Risk Flag
+    # Declared in risk_rules.json and evaluated in one vectorized pass (see risk_rules.py)
+    for c in BEHAVIOR_COLS:
+        if c not in loans.columns:
+            loans[c] = np.nan
+
+    risk_outputs = risk_rules.evaluate(loans)
+    for c in risk_outputs.columns:
+        loans[c] = risk_outputs[c]
+
+    # --- Income banding (quantiles) using individual income only
+    if annual_inc_col:
+        loans["income_band"], income_bins = income_band(loans[annual_inc_col], income_bins)
+
+    # --- Employment length bucket (your emp_length is numeric float in your earlier output)
+    if "emp_length" in loans.columns:
+        loans["emp_length_bucket"] = pd.cut(loans["emp_length"], bins=EMP_LENGTH_BINS, labels=EMP_LENGTH_LABELS)
+
+    # --- Term bucket
+    if "term" in loans.columns:
+        loans["term_bucket"] = loans["term"].astype(str).str.replace(" months", "", regex=False)
+
+    # --- Join macro onto loans (monthly): a per-column month lookup instead of a merge,
+    # which would copy the whole loans frame (same result as a left merge on month_start)
+    macro_by_month = macro_monthly.set_index("month_start")
+    loans["month_start"] = loans["issue_month_start"].where(loans["issue_month_start"].isin(macro_by_month.index))
+    for c in macro_by_month.columns:
+        loans[c] = loans["issue_month_start"].map(macro_by_month[c])
+
+    return loans, income_bins
@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Inverted index over complaint narratives
+# -----------------------------
+# Narratives are tokenized (lower case, contractions folded: "can't" -> "cant",
+# stopwords and XXXX redactions dropped) and every unigram and adjacent-token bigram
+# ("lost my job" -> "lost", "job", "lost job") becomes a 64-bit term hash. Postings are
+# stored per segment as CSR arrays in .npy files and opened memory-mapped:
+#   term_hashes (sorted) / offsets  -> docs (row in the segment) + tf (term frequency)
+#   doc_ids / doc_month / doc_product -> complaint_id, month (months since 1970), product code
+# A lookup is a binary search plus one slice per segment, so term counts by month and
+# product take milliseconds whatever the size of the complaints export.
+# New complaint batches are added as new segments (complaint_ids already indexed are
+# skipped); compact() merges segments once there are many.
+
+INDEX_DIR = "narrative_index"
+MANIFEST_FILE = "_index.json"
+TERMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hardship_terms.json")
+
+MAX_SEGMENTS = 16
+MAX_TOKEN_LEN = 24
+MISSING_MONTH = np.iinfo(np.int32).min
+
+TOKEN_PATTERN = r"[a-z]+(?:'[a-z]+)?"
+# Negations ("not", "no", "never") are kept: "can pay" and "cant pay" must differ
+STOPWORDS = frozenset("""
+a an the my our your his her their its this that these those i me we you he she they it
+of to in on at for by with from as into about and or but so if then than
+is am are was were be been being have has had do does did will would should could
+just also very there here what which who whom
+""".split())
+FOLDS = {"cannot": "cant", "unemployment": "unemployed"}
+
+# Bigram hash = a * PAIR_MULT + b (mod 2^64): no strings are built for bigrams
+PAIR_MULT = np.uint64(0x9E3779B97F4A7C15)
+HASH_PROBE = "forbearance"
+
+# -----------------------------
+# Tokens / term hashes
+# -----------------------------
+def _hash(strings) -> np.ndarray:
+    return pd.util.hash_array(np.asarray(strings, dtype=object))
+
+def _pair_hash(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return a * PAIR_MULT + b
+
+def _tokens(texts: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """(text position, token hash) in reading order; normalization runs once per distinct token."""
+    found = texts.reset_index(drop=True).str.lower().str.replace("’", "'", regex=False) \
+        .str.findall(TOKEN_PATTERN).explode().dropna()
+    codes, uniques = pd.factorize(found)
+    norm = [FOLDS.get(t, t) for t in pd.Index(uniques).str.replace("'", "", regex=False)]
+    keep = np.array([t not in STOPWORDS and len(t) <= MAX_TOKEN_LEN and t.strip("x") != "" for t in norm] + [False])
+    hashes = np.append(_hash(norm), np.uint64(0))
+    kept = keep[codes]
+    return found.index.to_numpy()[kept].astype(np.int32), hashes[codes][kept]
+
+def query_hashes(phrase: str) -> np.ndarray:
+    """Term hashes a document must contain: one unigram, or every adjacent bigram of the phrase."""
+    _, h = _tokens(pd.Series([phrase]))
+    if len(h) == 0:
+        raise ValueError(f"Query {phrase!r} has no indexable tokens (only stopwords?)")
+    return h if len(h) == 1 else _pair_hash(h[:-1], h[1:])
+
+def term_postings(texts: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(term hash, doc, tf) sorted by term then doc, for unigrams and adjacent bigrams of each text."""
+    doc, h = _tokens(texts)
+    same_doc = doc[1:] == doc[:-1]
+    doc = np.concatenate([doc, doc[1:][same_doc]])
+    h = np.concatenate([h, _pair_hash(h[:-1], h[1:])[same_doc]])
+    order = np.lexsort((doc, h))
+    doc, h = doc[order], h[order]
+    # Runs of equal (term, doc) collapse into one posting with its count
+    starts = np.flatnonzero(np.concatenate([[True], (h[1:] != h[:-1]) | (doc[1:] != doc[:-1])])) if len(h) else \
+        np.array([], dtype=np.int64)
+    tf = np.diff(np.append(starts, len(h)))
+    return h[starts], doc[starts], np.minimum(tf, np.iinfo(np.uint16).max).astype(np.uint16)
+
+def _month_index(months: pd.Series) -> np.ndarray:
+    values = pd.to_datetime(months, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    out = values.astype("datetime64[M]").astype(np.int64).astype(np.int32)
+    out[np.isnat(values)] = MISSING_MONTH
+    return out
+
+def _month_start(month: np.ndarray) -> np.ndarray:
+    return month.astype("datetime64[M]").astype("datetime64[ns]")
+
+# -----------------------------
+# Segments
+# -----------------------------
+SEGMENT_ARRAYS = ["term_hashes", "offsets", "docs", "tf", "doc_ids", "doc_month", "doc_product"]
+
+class Segment:
+    def __init__(self, path: str):
+        self.path = path
+        for name in SEGMENT_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+    @staticmethod
+    def write(path: str, hashes: np.ndarray, docs: np.ndarray, tf: np.ndarray,
+              doc_ids: np.ndarray, doc_month: np.ndarray, doc_product: np.ndarray):
+        term_starts = np.flatnonzero(np.concatenate([[True], hashes[1:] != hashes[:-1]])) if len(hashes) else \
+            np.array([], dtype=np.int64)
+        arrays = {
+            "term_hashes": hashes[term_starts].astype(np.uint64),
+            "offsets": np.append(term_starts, len(hashes)).astype(np.int64),
+            "docs": docs.astype(np.int32), "tf": tf.astype(np.uint16),
+            "doc_ids": doc_ids.astype(np.int64), "doc_month": doc_month.astype(np.int32),
+            "doc_product": doc_product.astype(np.int16),
+        }
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+        os.replace(tmp, path)
+
+    def lookup(self, h: np.uint64) -> tuple[np.ndarray, np.ndarray]:
+        i = int(np.searchsorted(self.term_hashes, h))
+        if i == len(self.term_hashes) or self.term_hashes[i] != h:
+            return np.array([], dtype=np.int32), np.array([], dtype=np.uint16)
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.docs[lo:hi], self.tf[lo:hi]
+
+    def match(self, hashes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Docs containing every hash, with the smallest tf among them (the phrase count for a bigram)."""
+        docs, tf = self.lookup(hashes[0])
+        for h in hashes[1:]:
+            if not len(docs):
+                break
+            other_docs, other_tf = self.lookup(h)
+            docs, i, j = np.intersect1d(docs, other_docs, assume_unique=True, return_indices=True)
+            tf = np.minimum(tf[i], other_tf[j])
+        return np.asarray(docs), np.asarray(tf)
+
+# -----------------------------
+# Index
+# -----------------------------
+class NarrativeIndex:
+    """
+    Segmented narrative index in `path`. add() indexes a batch of complaints;
+    counts() / search() answer keyword and phrase queries from the memory-mapped postings.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        # Term hashes come from pandas' hash_array: refuse an index hashed differently
+        probe = int(_hash([HASH_PROBE])[0])
+        if manifest and manifest["hash_probe"] != probe:
+            raise ValueError(f"{path} was built with a different term hash; rebuild it (NarrativeIndex.reset)")
+        self.products = manifest.get("products", [])
+        self.segment_names = manifest.get("segments", [])
+        self.next_segment = manifest.get("next_segment", 1)
+        self.hash_probe = probe
+        self.segments = [Segment(os.path.join(path, name)) for name in self.segment_names]
+
+    @classmethod
+    def reset(cls, path: str) -> "NarrativeIndex":
+        if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            shutil.rmtree(path)
+        return cls(path)
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        manifest = {"hash_probe": self.hash_probe, "products": self.products, "segments": self.segment_names,
+                    "next_segment": self.next_segment, "docs": self.n_docs}
+        tmp = os.path.join(self.path, MANIFEST_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, MANIFEST_FILE))
+
+    @property
+    def n_docs(self) -> int:
+        return int(sum(len(s.doc_ids) for s in self.segments))
+
+    def _product_codes(self, products: pd.Series) -> np.ndarray:
+        # Append-only: codes of already indexed products never change
+        new = sorted(set(products.dropna().astype(str)) - set(self.products))
+        self.products = self.products + new
+        codes = pd.Categorical(products.astype("string"), categories=self.products).codes
+        return codes.astype(np.int16)
+
+    def _new_segment(self, name: str, arrays: tuple):
+        Segment.write(os.path.join(self.path, name), *arrays)
+        return Segment(os.path.join(self.path, name))
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    def add(self, complaints: pd.DataFrame) -> int:
+        """
+        Index complaints (complaint_id, product, month_start, complaint_narrative) as a new
+        segment. Rows without an ID or narrative and IDs already indexed are skipped.
+        Returns the number of complaints added.
+        """
+        batch = complaints.dropna(subset=["complaint_id", "complaint_narrative"])
+        batch = batch.drop_duplicates("complaint_id", keep="last")
+        if self.segments and len(batch):
+            indexed = np.concatenate([s.doc_ids for s in self.segments])
+            batch = batch[~np.isin(batch["complaint_id"].to_numpy(dtype=np.int64), indexed)]
+        if not len(batch):
+            return 0
+
+        hashes, docs, tf = term_postings(batch["complaint_narrative"].astype(str))
+        name = f"seg_{self.next_segment:06d}"
+        os.makedirs(self.path, exist_ok=True)
+        self.segments.append(self._new_segment(name, (
+            hashes, docs, tf, batch["complaint_id"].to_numpy(dtype=np.int64),
+            _month_index(batch["month_start"]), self._product_codes(batch["product"]),
+        )))
+        self.segment_names.append(name)
+        self.next_segment += 1
+        self._save_manifest()
+        return len(batch)
+
+    def compact(self):
+        """Merge every segment into one (doc rows are renumbered, postings re-sorted)."""
+        if len(self.segments) <= 1:
+            return
+        parts, doc_base = [], 0
+        for s in self.segments:
+            hashes = np.repeat(np.asarray(s.term_hashes), np.diff(s.offsets))
+            parts.append((hashes, np.asarray(s.docs) + doc_base, np.asarray(s.tf)))
+            doc_base += len(s.doc_ids)
+        hashes, docs, tf = (np.concatenate(p) for p in zip(*parts))
+        order = np.lexsort((docs, hashes))
+        doc_arrays = [np.concatenate([getattr(s, a) for s in self.segments]) for a in ("doc_ids", "doc_month", "doc_product")]
+
+        old = self.segment_names
+        name = f"seg_{self.next_segment:06d}"
+        merged = self._new_segment(name, (hashes[order], docs[order], tf[order], *doc_arrays))
+        self.segments, self.segment_names = [merged], [name]
+        self.next_segment += 1
+        self._save_manifest()
+        for o in old:
+            shutil.rmtree(os.path.join(self.path, o), ignore_errors=True)
+
+    # -----------------------------
+    # Query
+    # -----------------------------
+    def _matches(self, phrase: str, where: dict | None = None):
+        """(segment, matching doc rows, tf) per segment, after product / month filters."""
+        hashes = query_hashes(phrase)
+        where = where or {}
+        products = where.get("product")
+        product_codes = [self.products.index(p) for p in ([products] if isinstance(products, str) else products or [])
+                         if p in self.products]
+        for s in self.segments:
+            docs, tf = s.match(hashes)
+            keep = np.ones(len(docs), dtype=bool)
+            if products is not None:
+                keep &= np.isin(s.doc_product[docs], product_codes)
+            if "months" in where:
+                keep &= np.isin(s.doc_month[docs], _month_index(pd.Series(where["months"])))
+            yield s, docs[keep], tf[keep]
+
+    def search(self, phrase: str, where: dict | None = None) -> pd.DataFrame:
+        """Complaints mentioning `phrase`: complaint_id, product, month_start, mentions."""
+        parts = [pd.DataFrame({"complaint_id": s.doc_ids[docs], "product_code": s.doc_product[docs],
+                               "month": s.doc_month[docs], "mentions": tf.astype(np.int64)})
+                 for s, docs, tf in self._matches(phrase, where)]
+        out = pd.concat(parts, ignore_index=True) if parts else \
+            pd.DataFrame(columns=["complaint_id", "product_code", "month", "mentions"])
+        return self._labelled(out).sort_values("complaint_id", ignore_index=True)
+
+    def _labelled(self, df: pd.DataFrame) -> pd.DataFrame:
+        """product_code / month integer columns -> product names and month_start dates, in place."""
+        out = {}
+        for c in df.columns:
+            if c == "product_code":
+                out["product"] = np.asarray(self.products + [None], dtype=object)[df[c].to_numpy(dtype=np.int64)]
+            elif c == "month":
+                month = df[c].to_numpy(dtype=np.int32)
+                out["month_start"] = np.where(month == MISSING_MONTH, np.datetime64("NaT", "ns"), _month_start(month))
+            else:
+                out[c] = df[c].to_numpy()
+        return pd.DataFrame(out)
+
+    def counts(self, phrases: list[str], by: tuple[str, ...] = ("month_start", "product"),
+               where: dict | None = None) -> pd.DataFrame:
+        """Per phrase and `by` group: complaints mentioning it and total mentions."""
+        parts = []
+        for phrase in phrases:
+            for s, docs, tf in self._matches(phrase, where):
+                parts.append(pd.DataFrame({"keyword": phrase, "product_code": s.doc_product[docs],
+                                           "month": s.doc_month[docs], "mentions": tf.astype(np.int64)}))
+        return self._grouped(parts, ["keyword", *by])
+
+    def _grouped(self, parts: list[pd.DataFrame], keys: list[str]) -> pd.DataFrame:
+        if not parts or not sum(len(p) for p in parts):
+            return pd.DataFrame(columns=[*keys, "complaint_count", "mention_count"])
+        df = pd.concat(parts, ignore_index=True)
+        # Like the complaint facts: no month / product, no group
+        if "month_start" in keys:
+            df = df[df["month"] != MISSING_MONTH]
+        if "product" in keys:
+            df = df[df["product_code"] >= 0]
+        # Group on the integer codes; only the (small) result is labelled
+        int_keys = [{"month_start": "month", "product": "product_code"}.get(k, k) for k in keys]
+        out = (df.groupby(int_keys, sort=True)
+                 .agg(complaint_count=("mentions", "size"), mention_count=("mentions", "sum"))
+                 .reset_index())
+        return self._labelled(out)
+
+    def narratives_by_month(self) -> pd.DataFrame:
+        """Indexed (narrative-bearing) complaints per month_start and product: the topic-share denominator."""
+        parts = [pd.DataFrame({"product_code": s.doc_product, "month": s.doc_month, "mentions": 0}) for s in self.segments]
+        out = self._grouped(parts, ["month_start", "product"])
+        return out.drop(columns="mention_count").rename(columns={"complaint_count": "narratives_count"})
+
+    def topic_counts(self, topics: dict[str, list[str]]) -> pd.DataFrame:
+        """Per topic, month_start and product: complaints mentioning any of the topic's keywords."""
+        parts = []
+        for topic, phrases in topics.items():
+            per_segment = [[] for _ in self.segments]
+            for phrase in phrases:
+                for i, (_, docs, _) in enumerate(self._matches(phrase)):
+                    per_segment[i].append(docs)
+            for s, matched in zip(self.segments, per_segment):
+                docs = np.unique(np.concatenate(matched)) if matched else np.array([], dtype=np.int32)
+                parts.append(pd.DataFrame({"topic": topic, "product_code": s.doc_product[docs],
+                                           "month": s.doc_month[docs], "mentions": 1}))
+        return self._grouped(parts, ["topic", "month_start", "product"]).drop(columns="mention_count")
+
+# -----------------------------
+# Monthly keyword facts
+# -----------------------------
+def load_topics(path: str = TERMS_FILE) -> dict[str, list[str]]:
+    with open(path) as f:
+        return json.load(f)["topics"]
+
+def keyword_facts(index: NarrativeIndex, topics: dict[str, list[str]]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    fact_complaint_keywords_monthly: month_start, product, topic, keyword, complaint_count, mention_count
+    fact_complaint_topics_monthly: month_start, product, topic, complaint_count, narratives_count, topic_share
+    """
+    keyword_topic = {k: t for t, keywords in topics.items() for k in keywords}
+    keywords = index.counts(list(keyword_topic))
+    keywords.insert(0, "topic", keywords["keyword"].map(keyword_topic))
+    keywords = keywords[["month_start", "product", "topic", "keyword", "complaint_count", "mention_count"]]
+
+    narratives = index.narratives_by_month()
+    by_topic = index.topic_counts(topics)
+    by_topic = by_topic[["month_start", "product", "topic", "complaint_count"]].merge(
+        narratives, on=["month_start", "product"], how="left")
+    by_topic["topic_share"] = by_topic["complaint_count"] / by_topic["narratives_count"]
+    return (keywords.sort_values(["month_start", "product", "topic", "keyword"], ignore_index=True),
+            by_topic.sort_values(["month_start", "product", "topic"], ignore_index=True))
+
+# -----------------------------
+# CLI: ad-hoc queries against a built index
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the complaint narrative index.")
+    parser.add_argument("phrases", nargs="+", help='keywords or phrases, e.g. "lost job" forbearance')
+    parser.add_argument("--index", default=os.path.join("data", "analytics", INDEX_DIR))
+    parser.add_argument("--product", action="append", help="only these products (repeatable)")
+    parser.add_argument("--by", nargs="*", default=["month_start"], help="group columns (month_start / product)")
+    parser.add_argument("--ids", action="store_true", help="list the matching complaints instead of counts")
+    args = parser.parse_args()
+
+    index = NarrativeIndex(args.index)
+    where = {"product": args.product} if args.product else None
+    t0 = time.perf_counter()
+    if args.ids:
+        out = pd.concat([index.search(p, where).assign(keyword=p) for p in args.phrases], ignore_index=True)
+    else:
+        out = index.counts(args.phrases, by=tuple(args.by), where=where)
+    elapsed_ms = 1e3 * (time.perf_counter() - t0)
+    print(out.to_string(index=False))
+    print(f"\n{len(out):,} rows in {elapsed_ms:.1f} ms ({index.n_docs:,} narratives, {len(index.segments)} segment(s))")
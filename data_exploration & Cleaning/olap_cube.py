@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from table_io import read_table
+
+# -----------------------------
+# Loan cube: month x segment x product cells with additive measures
+# -----------------------------
+# The dashboards group fact_loans by ever-changing subsets of these attributes. The cube
+# stores one row per observed combination at the finest grain, with the attributes as
+# small integer codes (agg_loan_cube_codes holds code -> value) and only additive
+# measures: sums and counts, never averages. Any rollup is then a group-by-sum over a few
+# thousand cells, and rates are re-derived from the summed numerators / denominators,
+# so they stay exact at every level.
+
+CUBE_TABLE = "agg_loan_cube"
+CODES_TABLE = "agg_loan_cube_codes"
+
+CUBE_DIMS = ["income_band", "emp_length_bucket", "homeownership", "verified_income",
+             "grade", "loan_purpose", "term_bucket"]
+MEASURES = ["loan_count", "exposure", "high_risk_exposure", "interest_rate_sum", "interest_rate_count",
+            "high_risk_count", "behavioral_risk_count"]
+
+UNKNOWN = "Unknown"  # NULL attributes, as COALESCE(col, 'Unknown') in the views / aggregates.py
+
+def _labels(s: pd.Series) -> pd.Series:
+    return s.astype(object).where(s.notna(), UNKNOWN).astype(str)
+
+# -----------------------------
+# Codes
+# -----------------------------
+def build_codes(fact_loans_wide: pd.DataFrame, existing: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    (dimension, code, value) rows for every cube dimension. Values already coded in
+    `existing` keep their code and new values are appended after them, so cells of
+    months not rebuilt by an incremental run stay valid.
+    """
+    parts = []
+    for dim in CUBE_DIMS:
+        known = pd.Series([], dtype=object)
+        if existing is not None and not existing.empty:
+            known = existing.loc[existing["dimension"] == dim].sort_values("code")["value"].astype(str)
+        values = _labels(fact_loans_wide[dim]).unique() if dim in fact_loans_wide.columns else np.array([UNKNOWN])
+        new = sorted(set(values) - set(known))
+        all_values = list(known) + new
+        parts.append(pd.DataFrame({"dimension": dim, "code": np.arange(len(all_values), dtype=np.int16),
+                                   "value": all_values}))
+    return pd.concat(parts, ignore_index=True)
+
+def encode(fact_loans_wide: pd.DataFrame, codes: pd.DataFrame) -> dict[str, np.ndarray]:
+    out = {}
+    for dim in CUBE_DIMS:
+        lookup = codes.loc[codes["dimension"] == dim]
+        values = _labels(fact_loans_wide[dim]) if dim in fact_loans_wide.columns \
+            else pd.Series(UNKNOWN, index=fact_loans_wide.index)
+        out[dim] = pd.Categorical(values, categories=lookup.sort_values("code")["value"]).codes.astype(np.int16)
+    return out
+
+# -----------------------------
+# Build
+# -----------------------------
+def build_cube(fact_loans_wide: pd.DataFrame, codes: pd.DataFrame) -> pd.DataFrame:
+    """One row per (month_start, coded dims) combination present in fact_loans_wide."""
+    month_start = fact_loans_wide["issue_month_start"]
+    months, month_idx = np.unique(month_start.to_numpy(), return_inverse=True)
+    dim_codes = encode(fact_loans_wide, codes)
+    sizes = [len(months)] + [int((codes["dimension"] == d).sum()) for d in CUBE_DIMS]
+
+    # One int64 cell id per loan (mixed-radix over the dims), then bincount per measure
+    cell_id = np.ravel_multi_index([month_idx] + [dim_codes[d] for d in CUBE_DIMS], sizes)
+    cells, inverse = np.unique(cell_id, return_inverse=True)
+    amount = fact_loans_wide["loan_amount"].to_numpy(dtype=float)
+    rate = fact_loans_wide["interest_rate"].to_numpy(dtype=float)
+    high_risk = fact_loans_wide["high_risk_flag"].to_numpy() == 1
+
+    def total(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(inverse, weights=weights, minlength=len(cells))
+
+    unravelled = np.unravel_index(cells, sizes)
+    cube = pd.DataFrame({"month_start": months[unravelled[0]]})
+    for i, dim in enumerate(CUBE_DIMS, start=1):
+        cube[dim] = unravelled[i].astype(np.int16)
+    cube["loan_count"] = np.bincount(inverse, minlength=len(cells))
+    cube["exposure"] = total(np.nan_to_num(amount))
+    cube["high_risk_exposure"] = total(np.where(high_risk, np.nan_to_num(amount), 0.0))
+    cube["interest_rate_sum"] = total(np.nan_to_num(rate))
+    cube["interest_rate_count"] = total(~np.isnan(rate)).astype(np.int64)
+    cube["high_risk_count"] = total(high_risk).astype(np.int64)
+    cube["behavioral_risk_count"] = total(fact_loans_wide["behavioral_risk_flag"].to_numpy() == 1).astype(np.int64)
+    return cube
+
+# -----------------------------
+# Rollups
+# -----------------------------
+class LoanCube:
+    """
+    Rollups of agg_loan_cube to any subset of month_start + CUBE_DIMS, e.g.
+    cube.rollup(["income_band", "grade"]) for the Income x Grade heat-map or
+    cube.rollup(["loan_purpose"], where={"grade": ["D", "E"]}) for a filtered treemap.
+    """
+
+    def __init__(self, cells: pd.DataFrame, codes: pd.DataFrame):
+        self.cells = cells
+        self.codes = codes
+        self.values = {dim: codes.loc[codes["dimension"] == dim].sort_values("code")["value"].to_numpy()
+                       for dim in CUBE_DIMS}
+
+    @classmethod
+    def from_tables(cls, analytics_dir: str = "data/analytics") -> "LoanCube":
+        cells = read_table(CUBE_TABLE, analytics_dir)
+        codes = read_table(CODES_TABLE, analytics_dir)
+        # Parquet reads hand back categoricals; codes are plain ints here
+        return cls(cells.astype({d: np.int16 for d in CUBE_DIMS}), codes.astype({"value": str}))
+
+    def _mask(self, where: dict) -> np.ndarray:
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, wanted in where.items():
+            wanted = [wanted] if isinstance(wanted, str) or not np.iterable(wanted) else list(wanted)
+            if dim == "month_start":
+                mask &= self.cells["month_start"].isin(pd.to_datetime(wanted)).to_numpy()
+            elif dim in self.values:
+                wanted_codes = np.flatnonzero(np.isin(self.values[dim], [str(v) for v in wanted]))
+                mask &= np.isin(self.cells[dim].to_numpy(), wanted_codes)
+            else:
+                raise KeyError(f"Unknown cube dimension: {dim}. Use month_start or one of {CUBE_DIMS}")
+        return mask
+
+    def rollup(self, dims: list[str], where: dict | None = None) -> pd.DataFrame:
+        """Summed measures per combination of `dims`, plus the re-averaged rates the views expose."""
+        unknown = [d for d in dims if d != "month_start" and d not in self.values]
+        if unknown:
+            raise KeyError(f"Unknown cube dimension(s): {unknown}. Use month_start or any of {CUBE_DIMS}")
+        cells = self.cells[self._mask(where)] if where else self.cells
+
+        if dims:
+            out = cells.groupby(list(dims), sort=True)[MEASURES].sum().reset_index()
+        else:
+            out = cells[MEASURES].sum().to_frame().T.astype(cells[MEASURES].dtypes.to_dict())
+        for dim in dims:
+            if dim != "month_start":
+                out[dim] = self.values[dim][out[dim].to_numpy()]
+
+        out["avg_interest_rate"] = out["interest_rate_sum"] / out["interest_rate_count"].replace(0, np.nan)
+        out["high_risk_rate"] = out["high_risk_count"] / out["loan_count"]
+        out["behavioral_risk_rate"] = out["behavioral_risk_count"] / out["loan_count"]
+        out["high_risk_exposure_pct"] = out["high_risk_exposure"] / out["exposure"].replace(0, np.nan)
+        return out
+
+    def share(self, dims: list[str], measure: str = "exposure", where: dict | None = None) -> pd.DataFrame:
+        """Rollup with each cell's share of the total `measure` (product concentration treemaps)."""
+        out = self.rollup(dims, where)
+        out[f"{measure}_share"] = out[measure] / out[measure].sum()
+        return out.sort_values(measure, ascending=False).reset_index(drop=True)
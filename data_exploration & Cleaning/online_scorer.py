@@ -0,0 +1,226 @@
+from bisect import bisect_left
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from date_parsing import CANDIDATE_FORMATS, month_start, parse_dates
+from income_bands import IncomeBandVersions
+from loan_features import (EMP_LENGTH_BINS, EMP_LENGTH_LABELS, INCOME_BAND_LABELS, first_existing_col,
+                           income_band_edges)
+from risk_rules import FlagRule, RiskRuleEngine
+from table_io import read_table
+
+# -----------------------------
+# Online scoring of new loan applications
+# -----------------------------
+# The section-5 features of a single application (or a micro-batch), without running
+# the batch pipeline: risk rules, income band, emp-length and term buckets and the
+# macro context of the issue month. Everything the batch path fits or joins is loaded
+# once and held in memory:
+#   - the compiled risk rules (map rules memoize each raw grade, flags are comparisons)
+#   - frozen income cut points (a version from _income_bands.json)
+#   - a month -> macro values index built from fact_macro_monthly
+# score() is pure Python over a dict (no DataFrame), for per-request latency;
+# score_frame() is the vectorized path for batches and gives the same values as
+# engineer_features with the same cut points.
+
+FEATURES = ["grade_clean", "grade_score", "risk_band", "high_risk_flag", "behavioral_risk_flag",
+            "income_band", "emp_length_bucket", "term_bucket", "issue_month_start"]
+
+# Batches smaller than this are scored record by record: below ~1k records the fixed
+# DataFrame setup costs more than the per-record dict lookups
+VECTOR_MIN_RECORDS = 1024
+
+# issue_month as the loans file writes it ("Mar-2018"); tried first, then the other
+# candidate formats in parse_dates' order, so the record path parses what the batch path does
+ISSUE_MONTH_FORMAT = "%b-%Y"
+# Longer text is not a date in any candidate format
+MAX_DATE_CHARS = 32
+# Cap of the raw issue_month -> month memo (values come from clients)
+MONTH_CACHE_MAX = 10_000
+
+# JSON types a record's input fields may hold
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+def _missing(v) -> bool:
+    return v is None or v != v
+
+def _json_values(values: pd.Series) -> list:
+    """Column as a list of JSON-ready Python values (missing -> None)."""
+    if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(values):
+        # Few distinct values: convert each once and broadcast through the codes
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        if pd.api.types.is_datetime64_any_dtype(values):
+            uniques = uniques.strftime("%Y-%m-%d")
+        return np.asarray(list(uniques) + [None], dtype=object)[codes].tolist()
+    out = values.tolist()
+    if values.dtype.kind in "fO":
+        out = [None if v is None or v != v else v for v in out]
+    return out
+
+def _bucket(x: np.ndarray, inner_edges: list[float], labels: list[str]) -> pd.Categorical:
+    # Same bins as pd.cut(right=True) with open outer edges: (-inf, e1], (e1, e2], ..., (ek, inf)
+    # NaN and +/-inf (e.g. the text "inf") are missing, as in LoanScorer._number
+    codes = np.searchsorted(np.asarray(inner_edges, dtype=float), x, side="left")
+    codes[~np.isfinite(x)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+class LoanScorer:
+    def __init__(self, risk_rules: RiskRuleEngine, income_bins: list[float], macro_monthly: pd.DataFrame,
+                 band_version: int | None = None, month_format: str = ISSUE_MONTH_FORMAT):
+        self.risk_rules = risk_rules
+        self.income_bins = list(income_bins)
+        self.band_version = band_version
+        self.income_edges = income_band_edges(income_bins)[1:-1]
+        self.emp_edges = EMP_LENGTH_BINS[1:-1]
+
+        macro = macro_monthly.copy()
+        macro["month_start"] = pd.to_datetime(macro["month_start"])
+        self.macro = macro.set_index("month_start").sort_index()
+        self.macro_cols = list(self.macro.columns)
+        # Record path: month -> {column: value}; NaN becomes None so results are JSON-ready
+        self.macro_by_month = {
+            ts: {c: None if pd.isna(v) else float(v) for c, v in row.items()}
+            for ts, row in self.macro.iterrows()
+        }
+        self._no_macro = dict.fromkeys(self.macro_cols)
+        self._months = {}  # raw issue_month text -> month start (or None)
+        self.month_formats = [month_format] + [f for f in CANDIDATE_FORMATS if f != month_format]
+        self.features = FEATURES + self.macro_cols
+        # Record fields the batch path reads, so only those become DataFrame columns
+        self.input_cols = list(dict.fromkeys(risk_rules.inputs + ["annual_income", "annual_inc", "emp_length",
+                                                                  "term", "issue_month"]))
+        self._no_inputs = dict.fromkeys(self.input_cols)
+        # Fields compared with numbers by the flag rules (numeric text is accepted, as in score())
+        self.numeric_cols = {col for r in risk_rules.rules if isinstance(r, FlagRule)
+                             for col, _, value, _ in r.conditions if isinstance(value, (int, float))}
+
+    @classmethod
+    def from_artifacts(cls, analytics_dir: str = "data/analytics", band_version: int | None = None,
+                       rules_path: str | None = None) -> "LoanScorer":
+        """Scorer with the risk rules, the current (or a pinned) income band version and the macro facts of a build."""
+        versions = IncomeBandVersions.load(analytics_dir)
+        bands = versions.get(band_version) if band_version is not None else versions.current
+        if bands is None:
+            raise FileNotFoundError(f"No income band versions in {analytics_dir}; run 02_clean_feature_engineer.py first")
+        rules = RiskRuleEngine.from_file(rules_path) if rules_path else RiskRuleEngine.from_file()
+        return cls(rules, bands["cut_points"], read_table("fact_macro_monthly", analytics_dir), bands["version"])
+
+    @property
+    def info(self) -> dict:
+        return {
+            "risk_rules_version": self.risk_rules.version,
+            "risk_rules_fingerprint": self.risk_rules.fingerprint,
+            "income_band_version": self.band_version,
+            "income_cut_points": [None if np.isinf(b) else b for b in self.income_bins],
+            "macro_months": len(self.macro),
+            "features": self.features,
+        }
+
+    def invalid_fields(self, record: dict) -> list[str]:
+        """Input fields whose value is not a JSON scalar (e.g. a list or object for grade)."""
+        return [c for c in self.input_cols if not isinstance(record.get(c), SCALAR_TYPES)]
+
+    # -----------------------------
+    # Single record
+    # -----------------------------
+    def _parse_month(self, raw) -> pd.Timestamp | None:
+        # strptime over the formats (pinned one first) instead of a pandas parse per value;
+        # text without digits or longer than any date is rejected without trying them
+        text = str(raw).strip()
+        if len(text) > MAX_DATE_CHARS or not any(ch.isdigit() for ch in text):
+            return None
+        for fmt in self.month_formats:
+            try:
+                parsed = datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+            return pd.Timestamp(parsed.year, parsed.month, 1)
+        return None
+
+    def _month(self, raw) -> pd.Timestamp | None:
+        if _missing(raw):
+            return None
+        if raw not in self._months:
+            if len(self._months) >= MONTH_CACHE_MAX:
+                self._months.clear()
+            self._months[raw] = self._parse_month(raw)
+        return self._months[raw]
+
+    @staticmethod
+    def _number(v) -> float | None:
+        if _missing(v):
+            return None
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            return None
+        # Text such as "nan" / "inf" parses; the batch path treats both as missing
+        return v if np.isfinite(v) else None
+
+    def score(self, record: dict) -> dict:
+        """Features of one application, as JSON-ready Python values."""
+        # A field the application leaves out is a missing value (as a None column in a batch)
+        record = {**self._no_inputs, **record}
+        out = self.risk_rules.evaluate_record(record)
+
+        income = record["annual_income"]
+        income = self._number(record["annual_inc"] if _missing(income) else income)
+        out["income_band"] = None if income is None or income <= 0 else \
+            INCOME_BAND_LABELS[bisect_left(self.income_edges, income)]
+        emp_length = self._number(record.get("emp_length"))
+        out["emp_length_bucket"] = None if emp_length is None else EMP_LENGTH_LABELS[bisect_left(self.emp_edges, emp_length)]
+        term = record.get("term")
+        out["term_bucket"] = None if _missing(term) else str(term).replace(" months", "")
+
+        month = self._month(record.get("issue_month"))
+        out["issue_month_start"] = month.strftime("%Y-%m-%d") if month is not None else None
+        out.update(self.macro_by_month.get(month, self._no_macro))
+        return {c: out.get(c) for c in self.features}
+
+    # -----------------------------
+    # Batches
+    # -----------------------------
+    def score_frame(self, loans: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized features for a frame of applications (aligned on its index)."""
+        out = self.risk_rules.evaluate(loans)
+
+        income_col = first_existing_col(loans, ["annual_income", "annual_inc"])
+        if income_col:
+            income = pd.to_numeric(loans[income_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            out["income_band"] = _bucket(np.where(income <= 0, np.nan, income), self.income_edges, INCOME_BAND_LABELS)
+        if "emp_length" in loans.columns:
+            emp_length = pd.to_numeric(loans["emp_length"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            out["emp_length_bucket"] = _bucket(emp_length, self.emp_edges, EMP_LENGTH_LABELS)
+        if "term" in loans.columns:
+            # Missing terms stay missing (not "None" / "nan"), as in score()
+            term = loans["term"]
+            out["term_bucket"] = term.astype(str).str.replace(" months", "", regex=False).where(term.notna(), None)
+
+        if "issue_month" in loans.columns:
+            issue_month_start = month_start(parse_dates(loans["issue_month"]))
+        else:
+            issue_month_start = pd.Series(pd.NaT, index=loans.index, dtype="datetime64[ns]")
+        out["issue_month_start"] = issue_month_start
+        # Macro lookup by position in the month index (-1 = no macro month -> NaN)
+        pos = self.macro.index.get_indexer(issue_month_start)
+        for c in self.macro_cols:
+            values = self.macro[c].to_numpy(dtype=float)
+            out[c] = np.where(pos >= 0, values[pos], np.nan)
+        return out
+
+    def score_records(self, records: list[dict]) -> list[dict]:
+        """Features of a micro-batch: per record when small, vectorized otherwise."""
+        if len(records) < VECTOR_MIN_RECORDS:
+            return [self.score(r) for r in records]
+        # Object columns keep each value as sent (e.g. term 36 stays "36", not "36.0"); every
+        # input field gets a column, so a field no record sends is missing, as in score()
+        fields = self.input_cols
+        loans = pd.DataFrame({c: pd.Series([r.get(c) for r in records], dtype=object) for c in fields})
+        for c in self.numeric_cols:
+            loans[c] = pd.to_numeric(loans[c], errors="coerce")
+        # Either income field name is accepted; annual_income wins when both are sent
+        loans["annual_income"] = loans["annual_income"].where(loans["annual_income"].notna(), loans.pop("annual_inc"))
+        out = self.score_frame(loans).reindex(columns=self.features)
+        columns = {c: _json_values(out[c]) for c in out.columns}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
@@ -0,0 +1,175 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from date_parsing import month_start, parse_dates
+from income_bands import income_sketch
+from incremental import row_hashes
+from loan_features import clean_income, engineer_features, loan_columns
+from quantile_sketch import QuantileSketch
+from risk_rules import RULES_FILE, RiskRuleEngine
+from schemas import downcast_counts, loans_dtypes
+
+# -----------------------------
+# Partitioned loans engine
+# -----------------------------
+# Alternative to loading loans_full_schema.csv into one frame: the file is cut into
+# newline-aligned byte ranges and every range is parsed and transformed by its own
+# worker process, so parsing and feature work use all cores and each worker only
+# holds its slice. Two passes over the file:
+#   1) scan: issue months and row hashes per partition (a few bytes per row), plus a
+#      quantile sketch of cleaned income that merges across partitions
+#   2) features: the section-5 transform per partition, with income quartile cut
+#      points fitted once from the merged sketch of pass 1
+# Byte ranges assume no line breaks inside quoted fields (true for this export); a range
+# boundary that looks like it falls inside one makes the plan fall back to one range.
+
+SAMPLE_ROWS = 10_000
+
+def byte_ranges(path: str, partitions: int) -> list[tuple[int, int]]:
+    """
+    Split the data lines of a CSV (header excluded) into up to `partitions` newline-aligned
+    ranges. Assumes no newlines inside quoted fields: a boundary there would cut a record
+    in two (see quoted_newline_at).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        bounds = [f.tell()]
+        for i in range(1, partitions):
+            f.seek(bounds[0] + (size - bounds[0]) * i // partitions)
+            f.readline()  # skip to the start of the next full line
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def quoted_newline_at(path: str, ranges: list[tuple[int, int]]) -> bool:
+    """
+    True if a line next to a range boundary has an odd number of quote characters, i.e.
+    the boundary is likely inside a quoted field. A check of the boundary lines only, so
+    a quoted field spanning three or more lines with a quote-free middle line is missed.
+    """
+    with open(path, "rb") as f:
+        for start, _ in ranges[1:]:
+            f.seek(max(0, start - 65_536))
+            before = f.read(start - f.tell()).rsplit(b"\n", 2)[-2:]
+            after = f.readline()
+            if any(line.count(b'"') % 2 for line in before + [after]):
+                return True
+    return False
+
+def partition_dtypes(path: str, sample_rows: int = SAMPLE_ROWS) -> tuple[list[str], dict, list[str]]:
+    """
+    Column names, one dtype per column for every partition, and the columns typed from
+    the sample. Pinned loan dtypes (schemas.py) are kept; other columns are fixed from a
+    sample (numeric -> float64, else object) so a partition without NaNs cannot come back
+    int64 while another is float. read_range falls back to text for sampled columns whose
+    range holds non-numeric values.
+    """
+    pinned = loans_dtypes(pd.read_csv(path, nrows=0).columns)
+    sample = pd.read_csv(path, nrows=sample_rows, dtype=pinned)
+    dtypes, sampled = {}, []
+    for c in sample.columns:
+        if c in pinned:
+            dtypes[c] = pinned[c]
+        elif pd.api.types.is_numeric_dtype(sample[c].dtype) and not pd.api.types.is_bool_dtype(sample[c].dtype):
+            dtypes[c] = "float64"
+            sampled.append(c)
+        else:
+            dtypes[c] = "object"
+    return list(sample.columns), dtypes, sampled
+
+def plan_partitions(path: str, partitions: int) -> dict:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing file: {path}")
+    columns, dtypes, sampled = partition_dtypes(path)
+    ranges = byte_ranges(path, partitions)
+    if len(ranges) > 1 and quoted_newline_at(path, ranges):
+        print(f"{path}: a partition boundary may fall inside a quoted multi-line field; reading it as one range")
+        ranges = [(ranges[0][0], ranges[-1][1])]
+    return {"path": path, "columns": columns, "dtypes": dtypes, "sampled": sampled, "ranges": ranges}
+
+def read_range(parts: dict, start: int, end: int) -> pd.DataFrame:
+    with open(parts["path"], "rb") as f:
+        f.seek(start)
+        buf = f.read(end - start)
+    # Count columns downcast per range; concat_partitions widens them back to float32
+    # when any range has gaps, matching a whole-file read_loans_csv
+    try:
+        return downcast_counts(pd.read_csv(io.BytesIO(buf), header=None, names=parts["columns"], dtype=parts["dtypes"]))
+    except ValueError:
+        if not parts.get("sampled"):
+            raise
+    # A column typed float64 from the sample holds text in this range: read the sampled
+    # columns as text and keep each one numeric only where all of its values are
+    dtypes = {**parts["dtypes"], **dict.fromkeys(parts["sampled"], "object")}
+    df = pd.read_csv(io.BytesIO(buf), header=None, names=parts["columns"], dtype=dtypes)
+    for c in parts["sampled"]:
+        try:
+            df[c] = pd.to_numeric(df[c]).astype("float64")
+        except (ValueError, TypeError):
+            pass
+    return downcast_counts(df)
+
+def map_partitions(fn, parts: dict, workers: int, **kwargs) -> list:
+    """fn(parts, start, end, **kwargs) for every byte range, results in file order."""
+    if workers <= 1:
+        return [fn(parts, start, end, **kwargs) for start, end in parts["ranges"]]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, parts, start, end, **kwargs) for start, end in parts["ranges"]]
+        return [f.result() for f in futures]
+
+def concat_partitions(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate in order; categoricals whose partitions saw different categories stay categorical."""
+    out = pd.concat(frames, ignore_index=True)
+    for c in frames[0].columns:
+        if isinstance(frames[0][c].dtype, pd.CategoricalDtype) and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = pd.Series(union_categoricals([f[c] for f in frames], sort_categories=True), index=out.index)
+    return out
+
+# -----------------------------
+# Loans: pass 1 (scan) / pass 2 (features)
+# -----------------------------
+def scan_loans_partition(parts: dict, start: int, end: int) -> dict:
+    df = read_range(parts, start, end)
+    stats = {}
+    months = month_start(parse_dates(df["issue_month"], name="issue_month", stats=stats))
+    annual_inc_col, _, _ = loan_columns(df)
+    return {
+        "rows": len(df),
+        "row_hashes": row_hashes(df),
+        "months": months.to_numpy(),
+        "income": income_sketch(clean_income(df[annual_inc_col])) if annual_inc_col else None,
+        "parse_stats": stats,
+    }
+
+def loans_features_partition(parts: dict, start: int, end: int, macro_monthly: pd.DataFrame,
+                             income_bins: list[float] | None, rebuild_months: list[str] | None = None,
+                             rules_file: str = RULES_FILE) -> pd.DataFrame:
+    loans = read_range(parts, start, end)
+    issue_month_dt = parse_dates(loans["issue_month"])
+    issue_months = pd.DataFrame({"issue_month_dt": issue_month_dt, "issue_month_start": month_start(issue_month_dt)})
+
+    if rebuild_months is not None:
+        keep = issue_months["issue_month_start"].isin(pd.to_datetime(pd.Series(rebuild_months, dtype=object)))
+        loans, issue_months = loans[keep].copy(), issue_months[keep]
+
+    loans, _ = engineer_features(loans, issue_months, macro_monthly, RiskRuleEngine.from_file(rules_file), income_bins)
+    return loans
+
+def scan_loans(parts: dict, workers: int) -> dict:
+    """Pass 1 over all partitions, concatenated in file order."""
+    scans = map_partitions(scan_loans_partition, parts, workers)
+    sketches = [s["income"] for s in scans if s["income"] is not None]
+    return {
+        "row_hashes": np.concatenate([s["row_hashes"] for s in scans]),
+        "months": pd.Series(np.concatenate([s["months"] for s in scans])),
+        "income": reduce(QuantileSketch.merge, sketches, QuantileSketch()) if sketches else None,
+        "parse_stats": [s["parse_stats"] for s in scans],
+    }
@@ -0,0 +1,196 @@
+import copy
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import pandas as pd
+
+import date_parsing
+from instrumentation import RunReport
+from stage_cache import StageCache
+
+# -----------------------------
+# Stage DAG
+# -----------------------------
+# A stage is a plain function from named inputs to a dict of named outputs. Edges
+# are implied by names: a stage runs once every stage producing one of its inputs
+# has finished. With workers > 1, stages whose inputs are ready run concurrently in
+# a process pool, so the run takes as long as the slowest branch instead of the sum
+# of all stages. Inputs/outputs cross the process boundary by pickling, so chains
+# of stages that hand a big frame to each other gain nothing from extra workers;
+# the win is independent branches (FRED series, complaints vs loans).
+#
+# With a StageCache, stages whose key (code version, raw source files, upstream keys)
+# was seen before are not run: their outputs come from the cache, and a cached stage
+# whose consumers are all cached as well is skipped entirely.
+
+class Stage:
+    def __init__(self, name: str, fn, inputs: list[str] = (), outputs: list[str] = (),
+                 params: dict | None = None, local: bool = False, sources: list[str] = (),
+                 artifacts: list[str] = (), cacheable: bool = True):
+        """
+        fn(**inputs, **params) must return a dict with exactly `outputs` as keys.
+        local=True keeps the stage in the parent process (stages that print reports
+        built from parent state, or that need the whole result set anyway).
+        sources are the raw files the stage reads (part of its cache key); artifacts are
+        files it writes, which must still be the ones written for the key of a cache hit. cacheable=False for
+        stages that must always run (reports, loads into a database, manifests).
+        """
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.local = local
+        self.sources = list(sources)
+        self.artifacts = list(artifacts)
+        self.cacheable = cacheable
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+def _producers(stages: list[Stage]) -> dict[str, Stage]:
+    producers = {}
+    for s in stages:
+        for o in s.outputs:
+            if o in producers:
+                raise ValueError(f"Output {o!r} is produced by both {producers[o].name!r} and {s.name!r}")
+            producers[o] = s
+    return producers
+
+def resolve(stages: list[Stage], targets: list[str] | None = None) -> list[Stage]:
+    """Stages needed for `targets` (stage names; None = all), in a valid run order."""
+    by_name = {s.name: s for s in stages}
+    producers = _producers(stages)
+    unknown = [t for t in (targets or []) if t not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {unknown}; available: {list(by_name)}")
+
+    ordered, state = [], {}
+
+    def visit(stage: Stage):
+        if state.get(stage.name) == "done":
+            return
+        if state.get(stage.name) == "visiting":
+            raise ValueError(f"Cycle in pipeline stages at {stage.name!r}")
+        state[stage.name] = "visiting"
+        for i in stage.inputs:
+            if i not in producers:
+                raise ValueError(f"Stage {stage.name!r} needs {i!r}, which no stage produces")
+            visit(producers[i])
+        state[stage.name] = "done"
+        ordered.append(stage)
+
+    for name in (targets or list(by_name)):
+        visit(by_name[name])
+    return ordered
+
+def _rows(values) -> int | None:
+    frames = [v for v in values if isinstance(v, pd.DataFrame)]
+    return sum(len(f) for f in frames) if frames else None
+
+def _execute(stage: Stage, inputs: dict, report_config: dict, in_worker: bool = True) -> tuple[dict, dict, dict]:
+    # The stage's report record and date parse stats are shipped back to the parent;
+    # pool workers are reused, so they start every stage with empty stats
+    if in_worker:
+        date_parsing.PARSE_STATS.clear()
+    before = copy.deepcopy(date_parsing.PARSE_STATS)
+    report = RunReport(**report_config)
+    report.begin(stage.name, rows_in=_rows(inputs.values()))
+    outputs = stage.fn(**inputs, **stage.params)
+    if set(outputs) != set(stage.outputs):
+        raise ValueError(f"Stage {stage.name!r} returned {sorted(outputs)}, declared {sorted(stage.outputs)}")
+    frames = [v for v in outputs.values() if isinstance(v, pd.DataFrame)]
+    rec = report.end(frames or None, rows_out=_rows(outputs.values()))
+    stats = {k: v for k, v in date_parsing.PARSE_STATS.items() if before.get(k) != v}
+    return outputs, rec, stats
+
+def _cache_plan(plan: list[Stage], cache: StageCache, keep: set) -> tuple[dict, dict, set]:
+    """
+    (key per cacheable stage, {cached stage: outputs to load}, cached stages nobody needs).
+    Outputs are loaded only if a stage that actually runs consumes them, or a target produced them.
+    """
+    producers = _producers(plan)
+    keys, hits = {}, set()
+    for s in plan:
+        upstream = list(dict.fromkeys(producers[i].name for i in s.inputs))
+        # A stage fed by an uncacheable one has no stable key
+        if not s.cacheable or any(u not in keys for u in upstream):
+            continue
+        keys[s.name] = cache.key(s, [keys[u] for u in upstream])
+        if cache.has(s, keys[s.name]):
+            hits.add(s.name)
+
+    needed = {i for s in plan if s.name not in hits for i in s.inputs} | keep
+    cached = {s.name: [o for o in s.outputs if o in needed] for s in plan if s.name in hits}
+    skipped = {name for name, outputs in cached.items() if not outputs}
+    return keys, {name: outputs for name, outputs in cached.items() if outputs}, skipped
+
+def run_stages(stages: list[Stage], targets: list[str] | None = None, workers: int = 1,
+               report: RunReport | None = None, cache: StageCache | None = None) -> dict:
+    """
+    Run the stages needed for `targets` and return their outputs. Intermediate outputs
+    are released as soon as no remaining stage needs them.
+    """
+    plan = resolve(stages, targets)
+    report = report or RunReport()
+    report_config = report.config()
+    keep = {o for s in plan if s.name in (targets or []) for o in s.outputs}
+    keys, cached, skipped = _cache_plan(plan, cache, keep) if cache else ({}, {}, set())
+    consumers = {}
+    for s in plan:
+        for i in s.inputs:
+            consumers[i] = consumers.get(i, 0) + 1
+
+    results, pending = {}, [s for s in plan if s.name not in skipped]
+    for s in plan:
+        if s.name in skipped:
+            report.records.append({"stage": s.name, "cached": "skipped"})
+
+    def finish(stage: Stage, outputs: dict, rec: dict, stats: dict, from_cache: bool = False):
+        results.update(outputs)
+        report.records.append(rec)
+        date_parsing.PARSE_STATS.update(stats)
+        if stage.name in keys and not from_cache:
+            cache.put(stage, keys[stage.name], outputs, stats)
+            cache.stamp(stage, keys[stage.name])
+        for i in stage.inputs:
+            consumers[i] -= 1
+            if consumers[i] == 0 and i not in keep:
+                results.pop(i, None)
+
+    def ready(stage: Stage) -> bool:
+        return stage.name in cached or all(i in results for i in stage.inputs)
+
+    def run_inline(stage: Stage):
+        if stage.name in cached:
+            rec_report = RunReport(**report_config)
+            rec_report.begin(stage.name)
+            outputs, stats = cache.get(stage, keys[stage.name], cached[stage.name])
+            frames = [v for v in outputs.values() if isinstance(v, pd.DataFrame)]
+            finish(stage, outputs, rec_report.end(frames or None, cached="hit"), stats, from_cache=True)
+            return
+        # Inline stages see the parse stats of everything that ran before them
+        finish(stage, *_execute(stage, {i: results[i] for i in stage.inputs}, report_config, in_worker=False))
+
+    if workers <= 1:
+        for stage in pending:
+            run_inline(stage)
+        return results
+
+    running = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for stage in [s for s in pending if ready(s)]:
+                pending.remove(stage)
+                if stage.local or stage.name in cached:
+                    run_inline(stage)
+                else:
+                    inputs = {i: results[i] for i in stage.inputs}
+                    running[pool.submit(_execute, stage, inputs, report_config)] = stage
+            if not running:
+                if pending and not any(ready(s) for s in pending):
+                    raise RuntimeError(f"Pipeline stalled; waiting stages: {[s.name for s in pending]}")
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage = running.pop(fut)
+                finish(stage, *fut.result())
+    return results
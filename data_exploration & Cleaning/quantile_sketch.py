@@ -0,0 +1,147 @@
+import numpy as np
+
+# -----------------------------
+# Mergeable quantile sketch
+# -----------------------------
+# Summarises a numeric column chunk by chunk (or partition by partition, month by month)
+# so quantiles no longer need the whole column in memory:
+#   - exact mode: sorted distinct values + counts. Incomes are mostly round numbers, so
+#     this stays small, and quantiles equal np.quantile / pd.qcut on the full column.
+#   - bucket mode (DDSketch-style): once there are more than max_exact distinct values, they
+#     fold into log-spaced buckets. A bucket's representative is within a relative error
+#     alpha of every value in it, and the memory is O(log(max / min) / alpha).
+# Merging adds counts, so merge order never changes the result, and min / max stay exact.
+
+DEFAULT_ALPHA = 0.001
+DEFAULT_MAX_EXACT = 200_000
+
+class QuantileSketch:
+    def __init__(self, alpha: float = DEFAULT_ALPHA, max_exact: int = DEFAULT_MAX_EXACT):
+        self.alpha = alpha
+        self.max_exact = max_exact
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        # exact mode
+        self.values = np.array([], dtype=float)
+        self.counts = np.array([], dtype=np.int64)
+        # bucket mode (values <= 0 are counted apart; they have no log bucket)
+        self.exact = True
+        self.offset = 0
+        self.buckets = np.array([], dtype=np.int64)
+        self.nonpositive = 0
+
+    # -----------------------------
+    # Build / merge
+    # -----------------------------
+    def update(self, x) -> "QuantileSketch":
+        x = np.asarray(x, dtype=float)
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return self
+        self.n += len(x)
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        if self.exact:
+            values, counts = np.unique(x, return_counts=True)
+            self._add_exact(values, counts)
+        else:
+            self._add_buckets(x, np.ones(len(x), dtype=np.int64))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.alpha != self.alpha:
+            raise ValueError(f"Cannot merge sketches with different alpha ({self.alpha} vs {other.alpha})")
+        if not other.n:
+            return self
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.exact and other.exact:
+            self._add_exact(other.values, other.counts)
+            return self
+        self._to_buckets()
+        if other.exact:
+            self._add_buckets(other.values, other.counts)
+        else:
+            self._add_bucket_counts(other.offset, other.buckets)
+            self.nonpositive += other.nonpositive
+        return self
+
+    def _add_exact(self, values: np.ndarray, counts: np.ndarray):
+        merged, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.values = merged
+        if len(self.values) > self.max_exact:
+            self._to_buckets()
+
+    def _to_buckets(self):
+        if not self.exact:
+            return
+        values, counts = self.values, self.counts
+        self.exact = False
+        self.values = np.array([], dtype=float)
+        self.counts = np.array([], dtype=np.int64)
+        self._add_buckets(values, counts)
+
+    def _bucket_index(self, x: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(x) / np.log(self.gamma)).astype(np.int64)
+
+    def _add_buckets(self, x: np.ndarray, counts: np.ndarray):
+        positive = x > 0
+        self.nonpositive += int(counts[~positive].sum())
+        if positive.any():
+            idx = self._bucket_index(x[positive])
+            lo = int(idx.min())
+            self._add_bucket_counts(lo, np.bincount(idx - lo, weights=counts[positive]).astype(np.int64))
+
+    def _add_bucket_counts(self, offset: int, buckets: np.ndarray):
+        if not len(buckets):
+            return
+        if not len(self.buckets):
+            self.offset, self.buckets = offset, buckets.copy()
+            return
+        lo = min(self.offset, offset)
+        hi = max(self.offset + len(self.buckets), offset + len(buckets))
+        out = np.zeros(hi - lo, dtype=np.int64)
+        out[self.offset - lo:self.offset - lo + len(self.buckets)] += self.buckets
+        out[offset - lo:offset - lo + len(buckets)] += buckets
+        self.offset, self.buckets = lo, out
+
+    # -----------------------------
+    # Query
+    # -----------------------------
+    def _sorted_support(self) -> tuple[np.ndarray, np.ndarray]:
+        """(value, count) pairs in ascending order: exact values, or bucket representatives."""
+        if self.exact:
+            return self.values, self.counts
+        nz = np.flatnonzero(self.buckets)
+        reps = 2 * self.gamma ** (nz + self.offset) / (self.gamma + 1)
+        values = np.clip(reps, self.min, self.max)
+        counts = self.buckets[nz]
+        if self.nonpositive:
+            values, counts = np.concatenate([[self.min], values]), np.concatenate([[self.nonpositive], counts])
+        return values, counts
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Linear-interpolated quantiles, like np.quantile (exact in exact mode)."""
+        qs = np.asarray(qs, dtype=float)
+        if not self.n:
+            return np.full(qs.shape, np.nan)
+        values, counts = self._sorted_support()
+        cum = np.cumsum(counts)
+        h = (self.n - 1) * qs
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, self.n - 1)
+        # value at sorted rank r = first support value whose cumulative count exceeds r
+        v_lo = values[np.searchsorted(cum, lo, side="right")]
+        v_hi = values[np.searchsorted(cum, hi, side="right")]
+        out = v_lo + (h - lo) * (v_hi - v_lo)
+        # The outer quantiles are the tracked extremes, so cut points span the data exactly
+        return np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, out))
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.counts.nbytes + self.buckets.nbytes
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import operator
+import os
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Declarative risk rules
+# -----------------------------
+# Bands and flags are declared in risk_rules.json (grade mappings, thresholds,
+# lookback months) and compiled once into lookup arrays / NumPy comparisons:
+#   - "map" rules turn a text column into a band/score via its categorical codes,
+#     so string cleaning and dict lookups run once per distinct value, not per row
+#   - "flag" rules OR together vectorized conditions into a 0/1 int8 column
+# Rules are evaluated in order and may reference the outputs of earlier rules.
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "risk_rules.json")
+
+# Cap of the per-raw-value memo of the record path: values come from clients, so an
+# unbounded memo would grow with every distinct junk value a long-running service sees
+RECORD_CACHE_MAX = 10_000
+
+_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_NORMALIZERS = {
+    "strip_upper": lambda v: str(v).strip().upper(),
+    "strip_lower": lambda v: str(v).strip().lower(),
+}
+
+def _to_float(v) -> float:
+    """Numeric text as a float, anything else NaN (as pd.to_numeric(errors="coerce") in the batch path)."""
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _codes(values) -> tuple[np.ndarray, pd.Index]:
+    # Categorical columns already carry codes; anything else is factorized once.
+    # Missing values get code -1, which indexes the extra trailing slot of a lookup.
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return codes, pd.Index(uniques)
+
+class _Columns:
+    """Read-through view of the input frame plus the outputs of rules evaluated so far."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.index = df.index
+        self.extra = {}
+
+    def __contains__(self, col: str) -> bool:
+        return col in self.extra or col in self.df.columns
+
+    def __getitem__(self, col: str) -> pd.Series:
+        return self.extra[col] if col in self.extra else self.df[col]
+
+class MapRule:
+    def __init__(self, output: str, source: str, normalize: str | None = None,
+                 mapping: dict | None = None, default=None):
+        self.output = output
+        self.source = source
+        self.normalize = _NORMALIZERS[normalize] if normalize else None
+        self.mapping = mapping
+        self.default = default
+        self._lookup_cache = {}
+        self._record_cache = {}
+
+    def _map_value(self, raw):
+        v = raw
+        if self.normalize:
+            # Missing values are rendered like astype(str) does ("nan") before normalizing
+            v = self.normalize("nan" if pd.isna(raw) else raw)
+        if self.mapping is None:
+            return v
+        return self.mapping.get(v, self.default)
+
+    def lookup(self, categories: pd.Index) -> list:
+        key = tuple(categories)
+        if key not in self._lookup_cache:
+            self._lookup_cache[key] = [self._map_value(c) for c in categories] + [self._map_value(np.nan)]
+        return self._lookup_cache[key]
+
+    def evaluate_record(self, values: dict):
+        """Output for one record (None when it has no value); memoized per raw value."""
+        if self.source not in values:
+            return self.default
+        raw = values[self.source]
+        key = None if raw is None or raw != raw else raw  # NaN -> None
+        if key not in self._record_cache:
+            if len(self._record_cache) >= RECORD_CACHE_MAX:
+                self._record_cache.clear()
+            self._record_cache[key] = self._map_value(np.nan if key is None else key)
+        return self._record_cache[key]
+
+    def evaluate(self, cols: _Columns, n: int) -> pd.Series | None:
+        # Without the source column only rules with a default produce an output
+        if self.source not in cols:
+            return None if self.default is None else pd.Series([self.default] * n, index=cols.index)
+
+        codes, categories = _codes(cols[self.source])
+        lookup = self.lookup(categories)
+
+        if all(isinstance(v, (int, float, np.number)) or v is None for v in lookup):
+            arr = np.array([np.nan if v is None else v for v in lookup], dtype=float)[codes]
+            if not np.isnan(arr).any() and np.all(arr == np.round(arr)):
+                arr = arr.astype(np.int64)
+            return pd.Series(arr, index=cols.index)
+
+        # Text outputs stay categorical: one small lookup + integer codes per row
+        out_codes, out_cats = pd.factorize(pd.Series(lookup, dtype=object), use_na_sentinel=True)
+        return pd.Series(pd.Categorical.from_codes(out_codes[codes], categories=out_cats), index=cols.index)
+
+class FlagRule:
+    def __init__(self, output: str, conditions: list[dict], params: dict):
+        self.output = output
+        self.conditions = []
+        for c in conditions:
+            value = c["value"]
+            if isinstance(value, str) and value.startswith("$"):
+                value = params[value[1:]]
+            if c["op"] != "in" and c["op"] not in _OPS:
+                raise ValueError(f"Unsupported rule operator: {c['op']}")
+            self.conditions.append((c["col"], c["op"], value, c.get("fill")))
+
+    @staticmethod
+    def _condition(values: pd.Series, op: str, value, fill) -> np.ndarray:
+        if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(value, (str, list)):
+            x = values.to_numpy(dtype=float, na_value=np.nan)
+            if fill is not None:
+                x = np.where(np.isnan(x), fill, x)
+            return _OPS[op](x, value)
+
+        # Text / categorical: test the distinct values once, then broadcast via codes
+        codes, categories = _codes(values)
+        cats = np.asarray(categories, dtype=object)
+        targets = set(value) if op == "in" else None
+        hits = np.array(
+            [(c in targets) if op == "in" else bool(_OPS[op](c, value)) for c in cats] + [False], dtype=bool
+        )
+        if fill is not None:
+            hits[-1] = (fill in targets) if op == "in" else bool(_OPS[op](fill, value))
+        return hits[codes]
+
+    def evaluate_record(self, values: dict) -> int:
+        for col, op, value, fill in self.conditions:
+            v = values.get(col)
+            if isinstance(v, str) and isinstance(value, (int, float)):
+                v = _to_float(v)  # non-numeric text counts as missing, like the batch path
+            if v is None or v != v:  # missing / NaN
+                if fill is None:
+                    continue
+                v = fill
+            if (v in value) if op == "in" else _OPS[op](v, value):
+                return 1
+        return 0
+
+    def evaluate(self, cols: _Columns, n: int) -> pd.Series:
+        result = np.zeros(n, dtype=bool)
+        for col, op, value, fill in self.conditions:
+            if col in cols:
+                result |= self._condition(cols[col], op, value, fill)
+            elif fill is not None:
+                # Missing column behaves like an all-missing column
+                result |= bool(_OPS[op](fill, value)) if op != "in" else fill in value
+        return pd.Series(result.astype(np.int8), index=cols.index)
+
+class RiskRuleEngine:
+    """
+    Compiled rule set. evaluate() runs every rule in one pass over a DataFrame and
+    returns only the rule outputs, so the same engine scores a 10M-row batch or a
+    handful of new applications (score_records).
+    """
+
+    def __init__(self, config: dict):
+        self.version = config.get("version")
+        # Changes whenever any threshold/mapping changes (used to invalidate incremental builds)
+        self.fingerprint = hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=6).hexdigest()
+        params = config.get("params", {})
+        self.rules = []
+        for r in config["rules"]:
+            if r["type"] == "map":
+                self.rules.append(MapRule(r["output"], r["source"], r.get("normalize"),
+                                          r.get("mapping"), r.get("default")))
+            elif r["type"] == "flag":
+                self.rules.append(FlagRule(r["output"], r["any"], params))
+            else:
+                raise ValueError(f"Unknown rule type: {r['type']}")
+
+    @classmethod
+    def from_file(cls, path: str = RULES_FILE) -> "RiskRuleEngine":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    @property
+    def outputs(self) -> list[str]:
+        return [r.output for r in self.rules]
+
+    @property
+    def inputs(self) -> list[str]:
+        """Columns the rules read from the input (outputs of earlier rules excluded)."""
+        cols = []
+        for r in self.rules:
+            for col in [r.source] if isinstance(r, MapRule) else [c[0] for c in r.conditions]:
+                if col not in cols and col not in self.outputs:
+                    cols.append(col)
+        return cols
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        cols = _Columns(df)
+        for rule in self.rules:
+            result = rule.evaluate(cols, len(df))
+            if result is not None:
+                cols.extra[rule.output] = result
+        return pd.DataFrame(cols.extra, index=df.index)
+
+    def evaluate_record(self, record: dict) -> dict:
+        """Rule outputs for one record (a plain dict, no DataFrame): the online scoring path."""
+        values = dict(record)
+        out = {}
+        for rule in self.rules:
+            result = rule.evaluate_record(values)
+            if result is not None:
+                values[rule.output] = out[rule.output] = result
+        return out
+
+    def score_records(self, records: list[dict]) -> list[dict]:
+        return self.evaluate(pd.DataFrame.from_records(records)).to_dict("records")
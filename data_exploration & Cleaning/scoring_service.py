@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from online_scorer import LoanScorer
+
+# -----------------------------
+# Local HTTP scoring service (asyncio, stdlib only)
+# -----------------------------
+#   GET  /health        -> scorer info (rule fingerprint, income band version, macro months)
+#   POST /score         -> one application (JSON object) -> its features
+#   POST /score/batch   -> a JSON list of applications (or {"records": [...]}) -> list of features
+# Connections are kept alive, so a client pays the TCP handshake once. Records whose
+# input fields are not JSON scalars are rejected with 400 before scoring. Scoring is
+# CPU-bound and runs on the event loop: a request is a few dict lookups, and batches
+# switch to the vectorized path (LoanScorer.score_records).
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ScoringService:
+    def __init__(self, scorer: LoanScorer):
+        self.scorer = scorer
+        self.requests = 0
+        self.records = 0
+        self.started = time.time()
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        if path == "/health":
+            return 200, {**self.scorer.info, "requests": self.requests, "records_scored": self.records,
+                         "uptime_s": round(time.time() - self.started, 1)}
+        if path not in ("/score", "/score/batch"):
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": f"{path} expects POST"}
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+
+        if path == "/score":
+            if not isinstance(payload, dict):
+                return 400, {"error": "/score expects one JSON object"}
+            bad = self.scorer.invalid_fields(payload)
+            if bad:
+                return 400, {"error": f"Fields must be a string, number, boolean or null: {bad}"}
+            self.records += 1
+            return 200, self.scorer.score(payload)
+
+        records = payload.get("records") if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            return 400, {"error": "/score/batch expects a list of JSON objects (or {\"records\": [...]})"}
+        bad = {i: fields for i, r in enumerate(records) if (fields := self.scorer.invalid_fields(r))}
+        if bad:
+            first = next(iter(bad))
+            return 400, {"error": f"{len(bad)} record(s) with fields that are not a string, number, boolean or null; "
+                                  f"first: record {first} {bad[first]}"}
+        self.records += len(records)
+        return 200, self.scorer.score_records(records)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, result = 413, {"error": f"Body over {MAX_BODY_BYTES} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    self.requests += 1
+                    try:
+                        status, result = self.handle(method, path.split("?", 1)[0], body)
+                    except Exception as e:  # a bad record must not take the service down
+                        status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                data = json.dumps(result).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(scorer: LoanScorer, host: str, port: int):
+    service = ScoringService(scorer)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Scoring on http://{host}:{port} (income bands v{scorer.band_version}, "
+          f"rules {scorer.risk_rules.fingerprint}, {scorer.info['macro_months']} macro months)")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve online loan scoring over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--analytics-dir", default=os.path.join("data", "analytics"))
+    parser.add_argument("--band-version", type=int, default=None,
+                        help="income band version to apply (default: the current one)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(LoanScorer.from_artifacts(args.analytics_dir, args.band_version), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
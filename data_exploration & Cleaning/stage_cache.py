@@ -0,0 +1,173 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+# -----------------------------
+# Stage output cache
+# -----------------------------
+# Every cacheable stage gets a key derived from
+#   - the code/config version of the run (hash of the pipeline sources + settings),
+#   - the stage name and its fixed params,
+#   - the content hash of the raw files it reads (its `sources`),
+#   - the keys of the upstream stages that produce its inputs,
+# so an unchanged stage is recognised without hashing any intermediate frame. Each
+# output is pickled separately under <cache_dir>/<stage>/<key>/ (so a hit loads only
+# the outputs someone still needs), next to the date parse stats the stage recorded.
+# The cache is kept under max_bytes by evicting the least recently used entries
+# (hits refresh the entry's mtime).
+#
+# Keys chain: a changed stage changes the key of every stage downstream of it, so e.g.
+# a new complaints file re-runs complaints, month_features, narrative_index and dim_time,
+# and through dim_time validate, dims, facts, stress_signals and loan_cube as well.
+#
+# A stage's side-effect tables (artifacts) are only trusted for the key that wrote them:
+# after a stage runs, a stamp file (_stage_<name>.json, next to its artifacts) records
+# the key and the size / mtime of every artifact. A hit needs a matching stamp, so
+# switching inputs X -> Y -> X re-runs the stages whose tables still hold Y's data.
+
+CACHE_DIR = "data/cache"
+MAX_CACHE_BYTES = 5 * 1024 ** 3
+FILE_HASHES = "_file_hashes.json"
+STATS_FILE = "_parse_stats.json"
+STAMP_FILE = "_stage_{name}.json"
+CHUNK_BYTES = 8 * 1024 ** 2
+
+def _blake(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _file_stamp(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def code_fingerprint(paths: list[str], extra: str = "") -> str:
+    """Hash of the given source files (e.g. every *.py / *.json of the pipeline) plus a config string."""
+    h = hashlib.blake2b(extra.encode(), digest_size=16)
+    for path in sorted(paths):
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+class StageCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, version: str = "", max_bytes: int = MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._memo_path = os.path.join(cache_dir, FILE_HASHES)
+        self._file_memo = self._load_memo()
+
+    # --- raw file hashes (re-hashed only when size or mtime changed)
+    def _load_memo(self) -> dict:
+        if not os.path.exists(self._memo_path):
+            return {}
+        with open(self._memo_path) as f:
+            return json.load(f)
+
+    def file_digest(self, path: str) -> str:
+        stamp = _file_stamp(path)
+        memo = self._file_memo.get(os.path.abspath(path))
+        if memo and memo["stamp"] == stamp:
+            return memo["digest"]
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+                h.update(block)
+        self._file_memo[os.path.abspath(path)] = {"stamp": stamp, "digest": h.hexdigest()}
+        with open(self._memo_path, "w") as f:
+            json.dump(self._file_memo, f, indent=2)
+        return h.hexdigest()
+
+    # --- entries
+    def key(self, stage, upstream_keys: list[str]) -> str:
+        sources = [f"{os.path.basename(p)}={self.file_digest(p) if os.path.exists(p) else '-'}"
+                   for p in stage.sources]
+        params = json.dumps(stage.params, sort_keys=True, default=str)
+        return _blake(self.version, stage.name, params, *sources, *upstream_keys)
+
+    def _entry(self, stage_name: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage_name, key)
+
+    # --- artifact stamps (one per stage and artifact directory)
+    @staticmethod
+    def _stamp_paths(stage) -> dict[str, list[str]]:
+        by_dir = {}
+        for a in stage.artifacts:
+            by_dir.setdefault(os.path.dirname(a) or ".", []).append(a)
+        return {os.path.join(d, STAMP_FILE.format(name=stage.name)): paths for d, paths in by_dir.items()}
+
+    def stamp(self, stage, key: str):
+        """Record that the stage's artifacts on disk were written for `key`."""
+        for stamp_path, paths in self._stamp_paths(stage).items():
+            if not all(os.path.exists(a) for a in paths):
+                continue
+            with open(stamp_path, "w") as f:
+                json.dump({"key": key, "files": {os.path.basename(a): _file_stamp(a) for a in paths}}, f, indent=2)
+
+    def artifacts_match(self, stage, key: str) -> bool:
+        for stamp_path, paths in self._stamp_paths(stage).items():
+            if not os.path.exists(stamp_path) or not all(os.path.exists(a) for a in paths):
+                return False
+            with open(stamp_path) as f:
+                stamp = json.load(f)
+            files = {os.path.basename(a): _file_stamp(a) for a in paths}
+            if stamp.get("key") != key or stamp.get("files") != files:
+                return False
+        return True
+
+    def has(self, stage, key: str) -> bool:
+        # The stats file is written last, so its presence marks a complete entry. The
+        # stage's side-effect tables must also be the ones written for this key (not
+        # missing, not left over from a run with other inputs), or it has to run again.
+        complete = os.path.exists(os.path.join(self._entry(stage.name, key), STATS_FILE))
+        return complete and self.artifacts_match(stage, key)
+
+    def get(self, stage, key: str, outputs: list[str] | None = None) -> tuple[dict, dict]:
+        """(outputs, parse stats) of a cached stage run; `outputs` limits which outputs are loaded."""
+        entry = self._entry(stage.name, key)
+        loaded = {}
+        for name in (stage.outputs if outputs is None else outputs):
+            with open(os.path.join(entry, f"{name}.pkl"), "rb") as f:
+                loaded[name] = pickle.load(f)
+        with open(os.path.join(entry, STATS_FILE)) as f:
+            stats = json.load(f)
+        os.utime(entry)
+        return loaded, stats
+
+    def put(self, stage, key: str, outputs: dict, parse_stats: dict):
+        entry = self._entry(stage.name, key)
+        tmp = f"{entry}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, value in outputs.items():
+            with open(os.path.join(tmp, f"{name}.pkl"), "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp, STATS_FILE), "w") as f:
+            json.dump(parse_stats, f, default=str)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict(keep=entry)
+
+    def evict(self, keep: str | None = None):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in glob.glob(os.path.join(self.cache_dir, "*", "*", "")):
+            entry = entry.rstrip(os.sep)
+            size = sum(os.path.getsize(f) for f in glob.glob(os.path.join(entry, "*")))
+            entries.append((os.path.getmtime(entry), size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
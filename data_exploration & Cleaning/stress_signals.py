@@ -0,0 +1,218 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from incremental import diff_partitions, month_hashes, month_key, row_hashes
+from time_features import month_index
+
+# -----------------------------
+# Complaint stress signals
+# -----------------------------
+# Early-warning scores over monthly complaint counts per product and per state (plus
+# the overall count). Every (dimension, segment) keeps a baseline that is updated one
+# month at a time, vectorized over all segments:
+#   - level: EWMA of the deseasonalized count
+#   - var:   EWMA of the squared forecast error
+#   - season: 12 multiplicative calendar-month factors, learned after a year of history
+# A month is scored against the baseline *before* it is folded in:
+#   z = (count - level * season) / sqrt(max(var, expected))   (Poisson floor for small counts)
+# and flagged when z >= Z_THRESHOLD after WARMUP_MONTHS of history. The baselines are
+# persisted, so a run only folds the months that arrived since the last one. The
+# latest month of the export is still filling up: it is scored provisionally and only
+# folded in once a later month exists.
+
+EWMA_ALPHA = 0.3
+SEASONAL_GAMMA = 0.2
+SEASON_MIN_MONTHS = 12
+WARMUP_MONTHS = 6
+Z_THRESHOLD = 3.0
+
+CORR_LAGS = [0, 1, 2, 3]
+MIN_CORR_MONTHS = 6
+
+STATE_FILE = "_stress_state.json"
+KEY_COLS = ["dimension", "segment"]
+SIGNAL_COLS = ["month_start", "dimension", "segment", "complaints_count", "expected_count",
+               "baseline_std", "z_score", "is_anomaly", "is_provisional"]
+CORR_COLS = ["dimension", "segment", "lag_months", "n_months", "correlation"]
+
+class StressBaselines:
+    """Per-segment EWMA / seasonal baselines, as arrays aligned on `keys`."""
+
+    def __init__(self):
+        self.keys = pd.MultiIndex.from_tuples([], names=KEY_COLS)
+        self.level = np.zeros(0)
+        self.var = np.zeros(0)
+        self.n = np.zeros(0, dtype=np.int64)
+        self.season = np.ones((0, 12))
+        self.last_month = None
+        self.month_hashes = {}  # hash of the counts of every folded month with data
+
+    # --- persistence
+    def to_dict(self) -> dict:
+        return {
+            "last_month": month_key(self.last_month) if self.last_month is not None else None,
+            "month_hashes": self.month_hashes,
+            "keys": [list(k) for k in self.keys],
+            "level": self.level.tolist(),
+            "var": self.var.tolist(),
+            "n": self.n.tolist(),
+            "season": self.season.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StressBaselines":
+        b = cls()
+        b.keys = pd.MultiIndex.from_tuples([tuple(k) for k in d["keys"]], names=KEY_COLS)
+        b.level = np.asarray(d["level"], dtype=float)
+        b.var = np.asarray(d["var"], dtype=float)
+        b.n = np.asarray(d["n"], dtype=np.int64)
+        b.season = np.asarray(d["season"], dtype=float).reshape(len(b.keys), 12)
+        b.last_month = pd.Timestamp(d["last_month"]) if d["last_month"] else None
+        b.month_hashes = d["month_hashes"]
+        return b
+
+    @classmethod
+    def load(cls, base_dir: str) -> "StressBaselines":
+        path = os.path.join(base_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, base_dir: str):
+        path = os.path.join(base_dir, STATE_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    # --- updates
+    def _add_keys(self, keys: pd.MultiIndex):
+        new = keys.difference(self.keys)
+        if not len(new):
+            return
+        self.keys = self.keys.append(new)
+        self.level = np.concatenate([self.level, np.zeros(len(new))])
+        self.var = np.concatenate([self.var, np.zeros(len(new))])
+        self.n = np.concatenate([self.n, np.zeros(len(new), dtype=np.int64)])
+        self.season = np.vstack([self.season, np.ones((len(new), 12))])
+
+    def step(self, month: pd.Timestamp, counts: pd.Series, commit: bool = True) -> pd.DataFrame:
+        """
+        Score one month's counts (indexed by dimension/segment; known segments missing
+        from `counts` had 0 complaints) and, if commit, fold them into the baselines.
+        """
+        self._add_keys(counts.index)
+        x = counts.reindex(self.keys, fill_value=0).to_numpy(dtype=float)
+        moy = pd.Timestamp(month).month - 1
+
+        season = self.season[:, moy]
+        has_base = self.n > 0
+        expected = np.where(has_base, self.level * season, np.nan)
+        std = np.sqrt(np.fmax(self.var, np.fmax(expected, 1.0)))
+        z = np.where(self.n >= WARMUP_MONTHS, (x - expected) / std, np.nan)
+
+        scored = pd.DataFrame({
+            "month_start": pd.Timestamp(month),
+            "dimension": self.keys.get_level_values("dimension"),
+            "segment": self.keys.get_level_values("segment"),
+            "complaints_count": x.astype(np.int64),
+            "expected_count": expected,
+            "baseline_std": np.where(has_base, std, np.nan),
+            "z_score": z,
+            "is_anomaly": (z >= Z_THRESHOLD).astype(np.int8),
+            "is_provisional": np.int8(not commit),
+        })
+
+        if commit:
+            resid = np.where(has_base, x - expected, 0.0)
+            learn_season = (self.n >= SEASON_MIN_MONTHS) & (self.level > 0)
+            ratio = np.divide(x, self.level, out=np.ones_like(x), where=self.level > 0)
+            self.season[learn_season, moy] = (SEASONAL_GAMMA * ratio + (1 - SEASONAL_GAMMA) * season)[learn_season]
+            self.var = np.where(has_base, (1 - EWMA_ALPHA) * (self.var + EWMA_ALPHA * resid ** 2), 0.0)
+            self.level = np.where(has_base, EWMA_ALPHA * x / season + (1 - EWMA_ALPHA) * self.level, x)
+            self.n = self.n + 1
+            self.last_month = pd.Timestamp(month)
+        return scored
+
+# -----------------------------
+# Pipeline helpers
+# -----------------------------
+def signal_counts(complaints_monthly: pd.DataFrame, by_product: pd.DataFrame, by_state: pd.DataFrame) -> pd.DataFrame:
+    """Long (month_start, dimension, segment, complaints_count) counts of every scored series."""
+    parts = [
+        complaints_monthly.assign(dimension="total", segment="all"),
+        by_product.rename(columns={"product": "segment"}).assign(dimension="product"),
+        by_state.rename(columns={"state": "segment"}).assign(dimension="state"),
+    ]
+    counts = pd.concat([p[["month_start", *KEY_COLS, "complaints_count"]] for p in parts], ignore_index=True)
+    counts["month_start"] = pd.to_datetime(counts["month_start"])
+    counts["segment"] = counts["segment"].astype(str)
+    return counts.sort_values(["month_start", *KEY_COLS]).reset_index(drop=True)
+
+def counts_month_hashes(counts: pd.DataFrame) -> dict[str, str]:
+    return month_hashes(row_hashes(counts), counts["month_start"].to_numpy(), counts.columns)
+
+def update_stress_signals(counts: pd.DataFrame, baselines: StressBaselines
+                          ) -> tuple[pd.DataFrame, StressBaselines, bool]:
+    """
+    Fold every closed month after baselines.last_month into the baselines and score
+    it, then score the latest (open) month without folding it in. Returns (signal rows
+    of the scored months, baselines, rebuilt). If a month that was already folded in
+    has different counts now, the baselines are rebuilt from an empty state (rebuilt=True).
+    """
+    if counts.empty:
+        return pd.DataFrame(columns=SIGNAL_COLS), baselines, False
+
+    hashes = counts_month_hashes(counts)
+    rebuilt = False
+    if baselines.last_month is not None:
+        folded = {m: h for m, h in hashes.items() if m <= month_key(baselines.last_month)}
+        changed, removed = diff_partitions(baselines.month_hashes, folded)
+        if changed or removed:
+            baselines, rebuilt = StressBaselines(), True
+
+    # Only the months after the baselines are split out: the per-run cost follows the new months
+    months = month_index(counts["month_start"].min(), counts["month_start"].max())
+    if baselines.last_month is not None:
+        months = months[months > baselines.last_month]
+        counts = counts[counts["month_start"] > baselines.last_month]
+    by_month = {m: g.set_index(KEY_COLS)["complaints_count"] for m, g in counts.groupby("month_start")}
+    empty = pd.Series([], dtype="int64", index=pd.MultiIndex.from_tuples([], names=KEY_COLS))
+    open_month = counts["month_start"].max() if len(counts) else None
+
+    scored = []
+    for month in months:
+        closed = month < open_month
+        scored.append(baselines.step(month, by_month.get(month, empty), commit=closed))
+        if closed and month_key(month) in hashes:
+            baselines.month_hashes[month_key(month)] = hashes[month_key(month)]
+
+    signals = pd.concat(scored, ignore_index=True) if scored else pd.DataFrame(columns=SIGNAL_COLS)
+    return signals, baselines, rebuilt
+
+def signal_correlation(signals: pd.DataFrame, portfolio_monthly: pd.DataFrame,
+                       lags: list[int] = CORR_LAGS) -> pd.DataFrame:
+    """
+    Pearson correlation of every segment's z-score in month t with the portfolio's
+    high_risk_exposure_pct in month t + lag (closed months only; NaN below MIN_CORR_MONTHS).
+    """
+    closed = signals[signals["is_provisional"] == 0]
+    if closed.empty or portfolio_monthly.empty:
+        return pd.DataFrame(columns=CORR_COLS)
+
+    z = closed.set_index(["month_start", *KEY_COLS])["z_score"].astype(float).unstack(KEY_COLS)
+    exposure = portfolio_monthly.set_index(pd.to_datetime(portfolio_monthly["month_start"]))["high_risk_exposure_pct"]
+    months = month_index(min(z.index.min(), exposure.index.min()), max(z.index.max(), exposure.index.max()))
+    z = z.reindex(months)
+    exposure = exposure.reindex(months).astype(float)
+
+    out = []
+    for lag in lags:
+        target = exposure.shift(-lag)  # exposure `lag` months after the complaint month
+        n_months = z.notna().mul(target.notna(), axis=0).sum()
+        corr = z.corrwith(target).where(n_months >= MIN_CORR_MONTHS)
+        out.append(pd.DataFrame({"lag_months": lag, "n_months": n_months, "correlation": corr}))
+    return pd.concat(out).reset_index()[CORR_COLS]
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Dimension attributes
+# -----------------------------
+BORROWER_SEGMENT_COLS = ["homeownership", "verified_income", "income_band", "emp_length_bucket", "state"]
+LOAN_PRODUCT_COLS = ["loan_purpose", "term", "term_bucket", "grade", "sub_grade", "risk_band",
+                     "disbursement_method", "application_type"]
+
+_NULL = "\x00"  # keeps NULL distinct from an empty string inside the hash
+
+# -----------------------------
+# Keys
+# -----------------------------
+def surrogate_key(df: pd.DataFrame, cols: list[str]) -> pd.Series:
+    """
+    Deterministic BIGINT key per attribute combination: a 63-bit hash of the
+    values rendered as text. The same combination gets the same id on every run,
+    on any machine, without reading the previous dim, so facts and dims built
+    in separate (or incremental) runs always join.
+    """
+    text = pd.DataFrame({c: df[c].astype(object).where(df[c].notna(), _NULL).astype(str) for c in cols})
+    h = pd.util.hash_pandas_object(text, index=False).to_numpy()
+    return pd.Series((h & np.uint64(0x7FFF_FFFF_FFFF_FFFF)).astype(np.int64), index=df.index)
+
+def build_dim(loans: pd.DataFrame, cols: list[str], id_col: str, existing: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    One row per distinct id among `loans` (which must already carry id_col),
+    unioned with an existing dim so incremental runs keep ids of months not rebuilt.
+    """
+    dim = loans[cols + [id_col]].drop_duplicates(subset=[id_col])
+    if existing is not None and not existing.empty:
+        existing = existing[~existing[id_col].isin(dim[id_col])]
+        dim = pd.concat([existing.astype({c: object for c in cols}), dim.astype({c: object for c in cols})],
+                        ignore_index=True)
+    return dim.sort_values(id_col).reset_index(drop=True)
@@ -0,0 +1,319 @@
+import os
+import shutil
+import pandas as pd
+
+# Parquet is optional: CSV keeps working without pyarrow installed
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# -----------------------------
+# Config
+# -----------------------------
+SUPPORTED_FORMATS = ["csv", "parquet"]
+
+# Schema-only file written into a partitioned table that has no rows
+EMPTY_PART_FILE = "part-empty.parquet"
+
+# Low-cardinality text columns stored as dictionaries in Parquet / category in pandas
+CATEGORICAL_COLS = [
+    "grade",
+    "sub_grade",
+    "risk_band",
+    "income_band",
+    "emp_length_bucket",
+    "term",
+    "term_bucket",
+    "loan_purpose",
+    "loan_status",
+    "homeownership",
+    "verified_income",
+    "state",
+    "disbursement_method",
+    "application_type",
+    "product",
+]
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+def _check_formats(formats: list[str]):
+    bad = [f for f in formats if f not in SUPPORTED_FORMATS]
+    if bad:
+        raise ValueError(f"Unsupported output format(s): {bad}. Use any of {SUPPORTED_FORMATS}.")
+    if "parquet" in formats:
+        _require_pyarrow()
+
+def parquet_path(name: str, base_dir: str) -> str:
+    # Single-file tables are <name>.parquet, partitioned tables are a <name>/ directory
+    file_path = os.path.join(base_dir, f"{name}.parquet")
+    dir_path = os.path.join(base_dir, name)
+    return dir_path if os.path.isdir(dir_path) else file_path
+
+def table_paths(name: str, base_dir: str, formats: list[str] = ("csv",)) -> list[str]:
+    """Files / directories write_table produces for `name` in the given formats."""
+    paths = []
+    if "csv" in formats:
+        paths.append(os.path.join(base_dir, f"{name}.csv"))
+    if "parquet" in formats:
+        paths.append(parquet_path(name, base_dir))
+    return paths
+
+def to_categorical(df: pd.DataFrame, cols: list[str] = CATEGORICAL_COLS) -> pd.DataFrame:
+    out = df.copy()
+    for c in cols:
+        if c in out.columns and out[c].dtype != "category":
+            out[c] = out[c].astype("category")
+    return out
+
+def _partition_schema(df: pd.DataFrame, col: str):
+    # Month keys are partitioned as dates (issue_month_start=2018-01-01/), not strings
+    if pd.api.types.is_datetime64_any_dtype(df[col]):
+        return pa.schema([(col, pa.date32())])
+    return pa.schema([(col, pa.Table.from_pandas(df[[col]].head(0), preserve_index=False).schema.field(col).type)])
+
+def _arrow_table(df: pd.DataFrame, partition_by: str | None = None):
+    if partition_by and pd.api.types.is_datetime64_any_dtype(df[partition_by]):
+        df = df.copy()
+        df[partition_by] = df[partition_by].dt.date
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def _write_empty_dataset(table, path: str):
+    # write_dataset writes no files for zero rows, so an empty partitioned table would
+    # leave no directory behind; keep a schema-only file so the table always exists
+    os.makedirs(path, exist_ok=True)
+    pq.write_table(table, os.path.join(path, EMPTY_PART_FILE))
+
+def _has_partitions(path: str) -> bool:
+    return os.path.isdir(path) and any("=" in e for e in os.listdir(path))
+
+# -----------------------------
+# Writers
+# -----------------------------
+def write_table(df: pd.DataFrame, name: str, out_dir: str, formats: list[str] = ("csv",),
+                partition_by: str | None = None) -> list[str]:
+    """
+    Write one pipeline table in every requested format and return the written paths.
+    - csv: <out_dir>/<name>.csv (unchanged from the original pipeline)
+    - parquet: <out_dir>/<name>.parquet, or a hive-partitioned <out_dir>/<name>/
+      directory when partition_by is given (e.g. issue_month_start); a partitioned
+      table with no rows is a directory holding one schema-only file
+    """
+    formats = list(formats)
+    _check_formats(formats)
+    written = []
+
+    if "csv" in formats:
+        path = os.path.join(out_dir, f"{name}.csv")
+        df.to_csv(path, index=False)
+        written.append(path)
+
+    if "parquet" in formats:
+        table = _arrow_table(to_categorical(df), partition_by)
+        if partition_by:
+            path = os.path.join(out_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            if len(df):
+                ds.write_dataset(
+                    table, path, format="parquet",
+                    partitioning=ds.partitioning(_partition_schema(df, partition_by), flavor="hive"),
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+            else:
+                _write_empty_dataset(table, path)
+        else:
+            path = os.path.join(out_dir, f"{name}.parquet")
+            pq.write_table(table, path)
+        written.append(path)
+
+    return written
+
+def replace_partitions(df: pd.DataFrame, name: str, out_dir: str, formats: list[str],
+                       partition_by: str, replace_keys: list) -> list[str]:
+    """
+    Replace only the partitions listed in replace_keys with the rows of df (which
+    must all fall inside replace_keys); every other partition is left untouched.
+    Parquet touches just those partition directories; the single-file CSV has to be
+    rewritten, so incremental runs should use parquet for delta-proportional writes.
+    """
+    formats = list(formats)
+    _check_formats(formats)
+    keys = pd.to_datetime(pd.Series(replace_keys)) if len(replace_keys) else pd.Series([], dtype="datetime64[ns]")
+    written = []
+
+    if "csv" in formats:
+        path = os.path.join(out_dir, f"{name}.csv")
+        if os.path.exists(path):
+            existing = pd.read_csv(path, parse_dates=[partition_by])
+            existing = existing[~existing[partition_by].isin(keys)]
+            df_csv = pd.concat([existing, df], ignore_index=True)
+        else:
+            df_csv = df
+        df_csv.to_csv(path, index=False)
+        written.append(path)
+
+    if "parquet" in formats:
+        path = os.path.join(out_dir, name)
+        for k in keys:
+            part_dir = os.path.join(path, f"{partition_by}={k.date().isoformat()}")
+            if os.path.isdir(part_dir):
+                shutil.rmtree(part_dir)
+        table = _arrow_table(to_categorical(df), partition_by)
+        if len(df):
+            empty_file = os.path.join(path, EMPTY_PART_FILE)
+            if os.path.exists(empty_file):
+                os.remove(empty_file)
+            ds.write_dataset(
+                table, path, format="parquet",
+                partitioning=ds.partitioning(_partition_schema(df, partition_by), flavor="hive"),
+                existing_data_behavior="delete_matching",
+            )
+        elif not _has_partitions(path):
+            _write_empty_dataset(table, path)
+        written.append(path)
+
+    return written
+
+class ChunkedTableWriter:
+    """
+    Append-only writer for tables produced chunk by chunk (e.g. the streamed
+    complaints dump). Every chunk must have the same columns and dtypes.
+    """
+
+    def __init__(self, name: str, out_dir: str, formats: list[str] = ("csv",)):
+        self.formats = list(formats)
+        _check_formats(self.formats)
+        self.csv_path = os.path.join(out_dir, f"{name}.csv") if "csv" in self.formats else None
+        self.parquet_path = os.path.join(out_dir, f"{name}.parquet") if "parquet" in self.formats else None
+        self._csv_header = True
+        self._pq_writer = None
+
+    def write(self, chunk: pd.DataFrame):
+        if self.csv_path:
+            chunk.to_csv(self.csv_path, mode="w" if self._csv_header else "a", header=self._csv_header, index=False)
+            self._csv_header = False
+
+        if self.parquet_path:
+            if self._pq_writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self._pq_writer = pq.ParquetWriter(self.parquet_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._pq_writer.schema, preserve_index=False)
+            self._pq_writer.write_table(table)
+
+    def close(self):
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+            self._pq_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -----------------------------
+# Reader
+# -----------------------------
+_OPS = {
+    "==": lambda f, v: f == v,
+    "=": lambda f, v: f == v,
+    "!=": lambda f, v: f != v,
+    "<": lambda f, v: f < v,
+    "<=": lambda f, v: f <= v,
+    ">": lambda f, v: f > v,
+    ">=": lambda f, v: f >= v,
+    "in": lambda f, v: f.isin(v),
+}
+
+def _filter_expression(schema, filters: list[tuple]):
+    expr = None
+    for col, op, value in filters:
+        if op not in _OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        target = schema.field(col).type
+        if pa.types.is_dictionary(target):
+            target = target.value_type
+
+        def cast(v):
+            if isinstance(v, str) and pa.types.is_temporal(target):
+                v = pd.Timestamp(v)
+            return pa.scalar(v).cast(target)
+
+        v = [cast(x) for x in value] if op == "in" else cast(value)
+        term = _OPS[op](pc.field(col), pa.array(v, type=target) if op == "in" else v)
+        expr = term if expr is None else expr & term
+    return expr
+
+def _hive_partition_col(path: str) -> str | None:
+    for entry in os.listdir(path):
+        if "=" in entry and os.path.isdir(os.path.join(path, entry)):
+            return entry.split("=", 1)[0]
+    return None
+
+def read_table(name: str, base_dir: str, columns: list[str] | None = None,
+               filters: list[tuple] | None = None, fmt: str | None = None) -> pd.DataFrame:
+    """
+    Read a table written by write_table. Prefers Parquet when present (typed,
+    column-pruned, filters pushed down to row groups / partitions), else CSV.
+    filters are AND-ed (column, op, value) tuples, e.g.
+    [("issue_month_start", ">=", "2018-02-01"), ("grade", "in", ["D", "E"])].
+    """
+    pq_path = parquet_path(name, base_dir)
+    csv_path = os.path.join(base_dir, f"{name}.csv")
+
+    if fmt is None:
+        fmt = "parquet" if pa is not None and os.path.exists(pq_path) else "csv"
+
+    if fmt == "parquet":
+        _require_pyarrow()
+        if not os.path.exists(pq_path):
+            raise FileNotFoundError(f"Missing file: {pq_path}")
+
+        partitioning = None
+        part_col = _hive_partition_col(pq_path) if os.path.isdir(pq_path) else None
+        if part_col:
+            partitioning = ds.partitioning(pa.schema([(part_col, pa.date32())]), flavor="hive") \
+                if part_col.endswith("month_start") else "hive"
+
+        dataset = ds.dataset(pq_path, format="parquet", partitioning=partitioning)
+        expr = _filter_expression(dataset.schema, filters) if filters else None
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+        if part_col and columns is None:
+            # Partition keys come back last; every partitioned table leads with its key
+            df = df[[part_col] + [c for c in df.columns if c != part_col]]
+
+        for c in df.columns:
+            if c.endswith("month_start") and not pd.api.types.is_datetime64_any_dtype(df[c]):
+                df[c] = pd.to_datetime(df[c])
+        return to_categorical(df)
+
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Missing file: {csv_path}")
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(list(columns) + [f[0] for f in filters or []]))
+    df = pd.read_csv(csv_path, usecols=usecols)
+    for c in df.columns:
+        if c.endswith("month_start") or c.startswith("date_"):
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    if filters:
+        for col, op, value in filters:
+            if op not in _OPS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                value = [pd.Timestamp(v) for v in value] if op == "in" else pd.Timestamp(value)
+            df = df[_OPS[op](df[col], value)]
+        df = df.reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return to_categorical(df)
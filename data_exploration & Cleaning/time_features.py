@@ -0,0 +1,136 @@
+import pandas as pd
+
+# -----------------------------
+# Monthly time-series features
+# -----------------------------
+# Lags, rolling means / stdevs, z-scores, YoY and MoM deltas for month-grain series
+# (FRED macro series, complaint counts). Series are laid out as a month x series
+# matrix on a complete month index, so every feature is one shift / rolling call over
+# all series at once (e.g. every complaint product in one pass), never a per-group loop.
+
+LAGS = [1, 3, 12]
+ROLLING_WINDOWS = [3, 12]
+ZSCORE_WINDOW = 12
+YOY_LAG = 12
+
+# History needed before the first output month for every feature to be defined
+LOOKBACK_MONTHS = max(LAGS + ROLLING_WINDOWS + [ZSCORE_WINDOW, YOY_LAG])
+
+FEATURE_SUFFIXES = (
+    [f"lag{k}" for k in LAGS]
+    + [f"{stat}{w}m" for w in ROLLING_WINDOWS for stat in ("mean", "std")]
+    + [f"z{ZSCORE_WINDOW}m", "yoy", "mom_change", "mom_pct"]
+)
+
+def month_index(start: pd.Timestamp, end: pd.Timestamp) -> pd.DatetimeIndex:
+    return pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="MS", name="month_start")
+
+def complete_months(wide: pd.DataFrame, start: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+                    fill=None) -> pd.DataFrame:
+    """Reindex a month_start-indexed frame onto every month of [start, end] (gaps -> fill / NaN)."""
+    start = wide.index.min() if start is None else start
+    end = wide.index.max() if end is None else end
+    out = wide.reindex(month_index(start, end))
+    return out if fill is None else out.fillna(fill)
+
+def feature_frames(wide: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    {suffix: month x series frame} for every feature of every column of `wide`, which
+    must be indexed by consecutive months. Windows need full history (NaN until then).
+    """
+    values = wide.astype(float)
+    frames = {}
+    for k in LAGS:
+        frames[f"lag{k}"] = values.shift(k)
+    for w in ROLLING_WINDOWS:
+        rolling = values.rolling(w, min_periods=w)
+        frames[f"mean{w}m"] = rolling.mean()
+        frames[f"std{w}m"] = rolling.std()
+
+    z_rolling = values.rolling(ZSCORE_WINDOW, min_periods=ZSCORE_WINDOW)
+    z_std = z_rolling.std()
+    frames[f"z{ZSCORE_WINDOW}m"] = (values - z_rolling.mean()) / z_std.where(z_std > 0)
+
+    frames["yoy"] = values - values.shift(YOY_LAG)
+    prev = values.shift(1)
+    frames["mom_change"] = values - prev
+    # Same as vw_complaints_monthly.mom_growth_rate (before its ROUND): NULL when last month is 0
+    frames["mom_pct"] = (values - prev) / prev.where(prev != 0)
+    return frames
+
+def to_wide(wide: pd.DataFrame, frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """One row per month: every series followed by its <series>_<feature> columns."""
+    cols = {}
+    for series in wide.columns:
+        cols[series] = wide[series]
+        for suffix, frame in frames.items():
+            cols[f"{series}_{suffix}"] = frame[series]
+    return pd.DataFrame(cols, index=wide.index).reset_index()
+
+def to_long(wide: pd.DataFrame, frames: dict[str, pd.DataFrame], key: str, value_name: str) -> pd.DataFrame:
+    """One row per (month, series key): the value plus <value_name>_<feature> columns."""
+    stacked = {value_name: wide.stack(future_stack=True)}
+    for suffix, frame in frames.items():
+        stacked[f"{value_name}_{suffix}"] = frame.stack(future_stack=True)
+    out = pd.DataFrame(stacked)
+    out.index = out.index.set_names(["month_start", key])
+    return out.reset_index()
+
+# -----------------------------
+# Pipeline tables
+# -----------------------------
+MACRO_SERIES_COLS = ["unemployment_rate", "cpi_inflation_proxy", "fed_funds_rate_avg"]
+
+def _observed_range(months: pd.Series) -> pd.DatetimeIndex:
+    # Complaint counts are 0 for quiet months inside the export, unknown outside it
+    months = pd.to_datetime(months)
+    return month_index(months.min(), months.max()) if len(months) else pd.DatetimeIndex([], name="month_start")
+
+def macro_features_monthly(macro_history: pd.DataFrame, complaints_monthly: pd.DataFrame,
+                           start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Wide month table for [start, end]: macro series and overall complaint count with
+    their features. macro_history should reach LOOKBACK_MONTHS before `start`.
+    """
+    history_start = pd.Timestamp(start) - pd.DateOffset(months=LOOKBACK_MONTHS)
+    wide = complete_months(macro_history.set_index("month_start")[MACRO_SERIES_COLS], history_start, end)
+
+    counts = complaints_monthly.set_index(pd.to_datetime(complaints_monthly["month_start"]))["complaints_count"]
+    observed = _observed_range(complaints_monthly["month_start"])
+    counts = counts.reindex(observed, fill_value=0).astype(float)
+    wide["complaints_count"] = counts.reindex(wide.index)
+
+    out = to_wide(wide, feature_frames(wide))
+    return out[out["month_start"] >= pd.Timestamp(start)].reset_index(drop=True)
+
+def complaint_features_by_product(complaints_by_product_month: pd.DataFrame) -> pd.DataFrame:
+    """Long (month_start, product) table of complaint counts and their features, all products at once."""
+    if complaints_by_product_month.empty:
+        cols = ["month_start", "product", "complaints_count"] + [f"complaints_count_{s}" for s in FEATURE_SUFFIXES]
+        return pd.DataFrame(columns=cols)
+
+    df = complaints_by_product_month.assign(month_start=pd.to_datetime(complaints_by_product_month["month_start"]))
+    wide = df.pivot_table(index="month_start", columns="product", values="complaints_count",
+                          aggfunc="sum", observed=True)
+    wide = wide.reindex(_observed_range(df["month_start"])).fillna(0)
+    wide.columns = wide.columns.astype(str)
+    out = to_long(wide, feature_frames(wide), key="product", value_name="complaints_count")
+    return out.sort_values(["month_start", "product"]).reset_index(drop=True)
+
+def join_month_features(loans: pd.DataFrame, features: pd.DataFrame, cols: list[str] | None = None,
+                        month_col: str = "issue_month_start") -> pd.DataFrame:
+    """
+    Attach month features to loans by month lookup (one feature row per month), so the
+    result always has exactly the loans' rows; a duplicate month in `features` is an error.
+    """
+    by_month = features.set_index("month_start")
+    if not by_month.index.is_unique:
+        raise ValueError("features must have one row per month_start")
+    cols = [c for c in (cols or by_month.columns) if c in by_month.columns]
+    months = loans[month_col]
+    return loans.assign(**{c: months.map(by_month[c]).to_numpy() for c in cols})
+
+def feature_null_pct(features: pd.DataFrame, cols: list[str]) -> pd.Series:
+    present = [c for c in cols if c in features.columns]
+    return (features[present].isna().mean() * 100).round(2) if present else pd.Series(dtype=float)
+
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Declarative data-quality checks
+# -----------------------------
+# Per-column constraints are declared in validation_rules.json and evaluated in one pass
+# over the loans frame. Each check sets one bit of a per-row int64 violation mask:
+#   - "range": numeric min / max (inclusive)
+#   - "allowed": the value must be one of a list (compared as text)
+#   - "pattern": the text must match a regex
+#   - "date_window": a date between min and max ("today" = run date)
+#   - "reference": the value must exist in a column of another table (e.g. dim_time)
+# Text checks look at each distinct category once and broadcast through the codes, so
+# the cost is a few vector ops per check, whatever the row count.
+# Rows failing any "error" check are quarantined (kept out of the facts, written with
+# their reason codes); "warn" checks are only counted. A check whose violation rate
+# exceeds its max_pct, or a quarantine above max_quarantine_pct, fails the run.
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "validation_rules.json")
+
+CHECK_TYPES = ["range", "allowed", "pattern", "date_window", "reference"]
+SEVERITIES = ["error", "warn"]
+
+def _distinct(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    # Categorical codes when available, else factorize once; missing -> -1
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), np.asarray(values.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+def _text(v) -> str:
+    # 36 and 36.0 (numeric categories) both read as "36"
+    if isinstance(v, (float, np.floating)) and float(v).is_integer():
+        v = int(v)
+    return str(v).strip()
+
+def _date(value: str) -> pd.Timestamp:
+    return pd.Timestamp.today().normalize() if value == "today" else pd.Timestamp(value)
+
+class Check:
+    def __init__(self, spec: dict):
+        if spec["type"] not in CHECK_TYPES:
+            raise ValueError(f"Unknown check type {spec['type']!r}; use one of {CHECK_TYPES}")
+        if spec.get("severity", "error") not in SEVERITIES:
+            raise ValueError(f"Unknown severity {spec['severity']!r}; use one of {SEVERITIES}")
+        self.code = spec["code"]
+        self.col = spec["col"]
+        self.type = spec["type"]
+        self.severity = spec.get("severity", "error")
+        self.allow_null = spec.get("allow_null", True)
+        self.max_pct = spec.get("max_pct")
+        self.spec = spec
+
+    def violations(self, df: pd.DataFrame, refs: dict[str, pd.DataFrame]) -> np.ndarray | None:
+        """Boolean array of violating rows, or None when the column (or reference table) is absent."""
+        if self.col not in df.columns:
+            return None
+        values = df[self.col]
+
+        if self.type in ("allowed", "pattern"):
+            codes, uniques = _distinct(values)
+            if self.type == "allowed":
+                allowed = {_text(v) for v in self.spec["values"]}
+                ok = np.array([_text(v) in allowed for v in uniques] + [self.allow_null], dtype=bool)
+            else:
+                regex = re.compile(self.spec["regex"])
+                ok = np.array([bool(regex.match(_text(v))) for v in uniques] + [self.allow_null], dtype=bool)
+            return ~ok[codes]
+
+        if self.type == "range":
+            x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            bad = np.zeros(len(x), dtype=bool)
+            if "min" in self.spec:
+                bad |= x < self.spec["min"]
+            if "max" in self.spec:
+                bad |= x > self.spec["max"]
+            missing = np.isnan(x)
+        elif self.type == "date_window":
+            x = pd.to_datetime(values, errors="coerce")
+            bad = np.zeros(len(x), dtype=bool)
+            if "min" in self.spec:
+                bad |= (x < _date(self.spec["min"])).to_numpy()
+            if "max" in self.spec:
+                bad |= (x > _date(self.spec["max"])).to_numpy()
+            missing = x.isna().to_numpy()
+        else:
+            ref = refs.get(self.spec["table"])
+            if ref is None:
+                return None
+            ref_values = ref[self.spec["ref_col"]]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                ref_values = pd.to_datetime(ref_values, errors="coerce")
+            missing = values.isna().to_numpy()
+            bad = ~values.isin(ref_values.dropna()).to_numpy() & ~missing
+
+        return bad | (missing & (not self.allow_null))
+
+class ValidationEngine:
+    """
+    Compiled check set. validate() returns the clean rows, the quarantined rows (with a
+    reason_codes column) and a per-check summary; enforce() raises if a threshold is hit.
+    """
+
+    def __init__(self, config: dict):
+        self.version = config.get("version")
+        # Changes whenever any check changes (used to invalidate incremental builds)
+        self.fingerprint = hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=6).hexdigest()
+        self.checks = [Check(c) for c in config["checks"]]
+        self.max_quarantine_pct = config.get("max_quarantine_pct")
+        if len(self.checks) > 63:
+            raise ValueError("At most 63 checks fit the int64 violation mask")
+
+    @classmethod
+    def from_file(cls, path: str = RULES_FILE) -> "ValidationEngine":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def validate(self, df: pd.DataFrame, refs: dict[str, pd.DataFrame] | None = None
+                 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        refs = refs or {}
+        n = len(df)
+        mask = np.zeros(n, dtype=np.int64)
+        error_bits = np.int64(0)
+        stats = []
+        for bit, check in enumerate(self.checks):
+            bad = check.violations(df, refs)
+            count = int(bad.sum()) if bad is not None else 0
+            if bad is not None:
+                mask |= bad.astype(np.int64) << bit
+                if check.severity == "error":
+                    error_bits |= np.int64(1) << bit
+            pct = round(100 * count / n, 4) if n else 0.0
+            status = "skipped" if bad is None else "ok" if count == 0 else \
+                "fail" if check.max_pct is not None and pct > check.max_pct else check.severity
+            stats.append({"code": check.code, "col": check.col, "type": check.type, "severity": check.severity,
+                          "violations": count, "violation_pct": pct, "max_pct": check.max_pct, "status": status})
+
+        # The quarantine total is enforced like a check of its own
+        quarantined = (mask & error_bits) != 0
+        count = int(quarantined.sum())
+        pct = round(100 * count / n, 4) if n else 0.0
+        over = self.max_quarantine_pct is not None and pct > self.max_quarantine_pct
+        stats.append({"code": "QUARANTINE_TOTAL", "col": "*", "type": "total", "severity": "error",
+                      "violations": count, "violation_pct": pct, "max_pct": self.max_quarantine_pct,
+                      "status": "fail" if over else "ok" if count == 0 else "error"})
+
+        quarantine = df[quarantined].copy()
+        quarantine["reason_codes"] = self._reason_codes(mask[quarantined])
+        clean = df[~quarantined] if count else df
+        return clean, quarantine, pd.DataFrame(stats)
+
+    def _reason_codes(self, mask: np.ndarray) -> np.ndarray:
+        # Distinct masks are few: build each "CODE_A;CODE_B" label once
+        uniques, inverse = np.unique(mask, return_inverse=True)
+        labels = np.array([";".join(c.code for bit, c in enumerate(self.checks) if m >> bit & 1) for m in uniques],
+                          dtype=object)
+        return labels[inverse]
+
+    @staticmethod
+    def enforce(summary: pd.DataFrame):
+        failed = summary[summary["status"] == "fail"]
+        if len(failed):
+            problems = [f"{r.code}: {r.violations:,} rows ({r.violation_pct}% > {r.max_pct}%)" for r in failed.itertuples()]
+            raise ValueError("Data-quality thresholds exceeded:\n  " + "\n  ".join(problems))
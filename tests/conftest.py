@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline modules are flat scripts in "data_exploration & Cleaning/" (as in benchmarks/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_exploration & Cleaning"))
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from db_loader import create_schema, get_engine, load_table
+
+def dim_time(months: int) -> pd.DataFrame:
+    month_start = pd.date_range("2018-01-01", periods=months, freq="MS")
+    return pd.DataFrame({"month_start": month_start, "year": month_start.year,
+                         "month": month_start.month, "quarter": month_start.quarter})
+
+def count(engine, table: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+def test_failed_load_leaves_table_unchanged(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'star.db'}")
+    create_schema(engine)
+    assert load_table(engine, "dim_time", dim_time(12))["rows"] == 12
+
+    # Duplicate primary keys fail half-way through the insert
+    with pytest.raises(Exception):
+        load_table(engine, "dim_time", pd.concat([dim_time(3), dim_time(3)]))
+    assert count(engine, "dim_time") == 12
+
+    load_table(engine, "dim_time", dim_time(2), replace_keys=("month_start", list(dim_time(2)["month_start"])))
+    assert count(engine, "dim_time") == 12
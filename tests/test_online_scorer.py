@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import online_scorer
+from online_scorer import LoanScorer
+from risk_rules import RiskRuleEngine
+from scoring_service import ScoringService
+
+# -----------------------------
+# Scorer over the shipped risk rules, fixed income cut points and three macro months
+# -----------------------------
+def make_scorer() -> LoanScorer:
+    macro = pd.DataFrame({
+        "month_start": pd.to_datetime(["2018-01-01", "2018-02-01", "2018-03-01"]),
+        "unemployment_rate": [4.1, 4.1, 4.0],
+        "cpi_inflation_proxy": [0.5, 0.4, np.nan],
+        "fed_funds_rate_avg": [1.4, 1.4, 1.5],
+    })
+    return LoanScorer(RiskRuleEngine.from_file(), [0.0, 40_000.0, 65_000.0, 95_000.0, 1e7], macro, band_version=1)
+
+RECORDS = [
+    {"grade": "b", "annual_income": 52_000, "emp_length": 3, "term": 36, "issue_month": "Feb-2018",
+     "months_since_90d_late": 5, "num_accounts_120d_past_due": 0, "num_historical_failed_to_pay": 0},
+    # Non-numeric text in numeric fields: missing, i.e. the rule's fill value applies
+    {"grade": " E ", "annual_income": "n/a", "emp_length": "ten", "term": "60 months", "issue_month": "2018-03",
+     "months_since_90d_late": "unknown", "num_accounts_120d_past_due": "abc", "num_historical_failed_to_pay": "2"},
+    {"grade": None, "annual_income": -5, "issue_month": "not a month", "months_since_last_delinqu": "12"},
+    {"grade": "Z", "annual_income": "120000", "emp_length": 12.0, "issue_month": "Dec-2030",
+     "num_historical_failed_to_pay": float("nan")},
+    {"grade": "A", "annual_inc": 70_000, "term": "36 months"},
+    {"grade": "C", "annual_income": None, "annual_inc": "30000", "issue_month": "01/15/2018"},
+    # Text that float() parses to NaN / inf is missing too
+    {"grade": "D", "annual_income": "nan", "emp_length": "NaN", "months_since_90d_late": "nan"},
+    {"grade": "B", "annual_income": "inf", "emp_length": "-inf", "num_historical_failed_to_pay": "inf"},
+    {},
+]
+
+def test_batch_size_does_not_change_results():
+    scorer = make_scorer()
+    one_by_one = [scorer.score(r) for r in RECORDS]
+    small = scorer.score_records(RECORDS)
+    # Past VECTOR_MIN_RECORDS the batch goes through score_frame
+    repeat = -(-online_scorer.VECTOR_MIN_RECORDS // len(RECORDS))
+    large = scorer.score_records(RECORDS * repeat)
+    assert len(large) >= online_scorer.VECTOR_MIN_RECORDS
+    assert small == one_by_one
+    assert large[:len(RECORDS)] == one_by_one
+
+def test_non_numeric_text_is_coerced():
+    scorer = make_scorer()
+    out = scorer.score(RECORDS[1])
+    assert out["behavioral_risk_flag"] == 1  # from num_historical_failed_to_pay "2"
+    assert out["income_band"] is None and out["emp_length_bucket"] is None
+    assert scorer.score({"num_accounts_120d_past_due": "abc"})["behavioral_risk_flag"] == 0
+    assert out["issue_month_start"] == "2018-03-01" and out["cpi_inflation_proxy"] is None
+    assert scorer.score(RECORDS[4])["income_band"] == "Upper-Mid"  # annual_inc is accepted too
+    for record in RECORDS[6:8]:
+        out = scorer.score(record)
+        assert out["income_band"] is None and out["emp_length_bucket"] is None
+
+def test_memos_are_bounded():
+    scorer = make_scorer()
+    for i in range(online_scorer.MONTH_CACHE_MAX + 50):
+        scorer.score({"grade": f"junk-{i}", "issue_month": f"junk-{i}"})
+    grade_rules = [r for r in scorer.risk_rules.rules if hasattr(r, "_record_cache")]
+    assert len(scorer._months) <= online_scorer.MONTH_CACHE_MAX
+    assert all(len(r._record_cache) <= online_scorer.MONTH_CACHE_MAX for r in grade_rules)
+
+# -----------------------------
+# Service: bad input is a 400, not a 500
+# -----------------------------
+def post(service: ScoringService, path: str, payload) -> tuple[int, object]:
+    return service.handle("POST", path, json.dumps(payload).encode())
+
+def test_service_scores_and_rejects_bad_input():
+    service = ScoringService(make_scorer())
+    status, body = post(service, "/score", RECORDS[1])
+    assert status == 200 and body["risk_band"] == "High"
+
+    assert post(service, "/score", {"grade": ["A"]})[0] == 400
+    assert post(service, "/score", {"grade": {"x": 1}})[0] == 400
+    assert post(service, "/score", {"issue_month": ["Feb-2018"]})[0] == 400
+    assert post(service, "/score", [RECORDS[0]])[0] == 400
+
+    status, body = post(service, "/score/batch", [RECORDS[0], {"grade": ["A"]}])
+    assert status == 400 and "record 1" in body["error"]
+    status, body = post(service, "/score/batch", {"records": RECORDS})
+    assert status == 200 and len(body) == len(RECORDS)
+    assert service.handle("POST", "/score", b"{not json")[0] == 400
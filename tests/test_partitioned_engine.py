@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from partitioned_engine import concat_partitions, plan_partitions, read_range
+
+def read_partitioned(path: str, partitions: int = 4) -> tuple[dict, pd.DataFrame]:
+    parts = plan_partitions(path, partitions)
+    return parts, concat_partitions([read_range(parts, start, end) for start, end in parts["ranges"]])
+
+def test_text_in_sampled_numeric_column(tmp_path):
+    # "extra" is numeric in the 10k-row sample, text in the last byte range
+    n = 50_000
+    extra = pd.Series(np.arange(n, dtype=float), dtype=object)
+    extra.iloc[n - 10] = "unknown"
+    path = str(tmp_path / "loans.csv")
+    pd.DataFrame({"issue_month": "Jan-2018", "extra": extra}).to_csv(path, index=False)
+
+    parts, loans = read_partitioned(path)
+    assert len(parts["ranges"]) == 4 and parts["sampled"] == ["extra"]
+    assert len(loans) == n
+    assert loans["extra"].iloc[n - 10] == "unknown" and loans["extra"].iloc[0] == 0.0
+
+def test_quoted_newlines_fall_back_to_one_range(tmp_path):
+    n = 20_000
+    path = str(tmp_path / "loans.csv")
+    pd.DataFrame({"issue_month": "Jan-2018", "emp_title": "line one\nline two"}, index=range(n)).to_csv(path, index=False)
+
+    parts, loans = read_partitioned(path)
+    assert len(parts["ranges"]) == 1
+    assert len(loans) == n and (loans["emp_title"] == "line one\nline two").all()
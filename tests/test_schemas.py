@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from schemas import read_loans_csv
+
+def test_counts_parse_compact_and_write_unchanged(tmp_path):
+    path = str(tmp_path / "loans.csv")
+    pd.DataFrame({
+        "delinq_2y": [0, 3, 1],
+        "tax_liens": [0, np.nan, 2],
+        "interest_rate": [7.5, 12.25, 9.0],
+    }).to_csv(path, index=False)
+
+    loans = read_loans_csv(path)
+    assert loans["delinq_2y"].dtype == "int16"
+    assert loans["tax_liens"].dtype == "float32" and loans["tax_liens"].isna().sum() == 1
+    assert loans["interest_rate"].dtype == "float32"
+
+    # Gap-free counts keep writing as whole numbers, as they did with pandas' default int64
+    out = str(tmp_path / "out.csv")
+    loans[["delinq_2y"]].to_csv(out, index=False)
+    assert open(out).read().split() == ["delinq_2y", "0", "3", "1"]
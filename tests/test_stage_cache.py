@@ -0,0 +1,71 @@
+import os
+
+from pipeline_dag import Stage, run_stages
+from stage_cache import StageCache
+
+# -----------------------------
+# Two-stage pipeline: "read" copies a raw file into a table (artifact), "count" uses its output
+# -----------------------------
+RUNS = []
+
+def read_source(source: str, table: str) -> dict:
+    RUNS.append("read")
+    with open(source) as f:
+        text = f.read()
+    with open(table, "w") as f:
+        f.write(text)
+    return {"text": text}
+
+def count_lines(text: str) -> dict:
+    RUNS.append("count")
+    return {"lines": len(text.splitlines())}
+
+def stages(tmp_path) -> list[Stage]:
+    source, table = str(tmp_path / "raw.csv"), str(tmp_path / "out" / "table.csv")
+    return [
+        Stage("read", read_source, outputs=["text"], params={"source": source, "table": table},
+              sources=[source], artifacts=[table]),
+        Stage("count", count_lines, inputs=["text"], outputs=["lines"]),
+    ]
+
+def run(tmp_path, text: str) -> dict:
+    with open(tmp_path / "raw.csv", "w") as f:
+        f.write(text)
+    RUNS.clear()
+    cache = StageCache(str(tmp_path / "cache"), version="test")
+    return run_stages(stages(tmp_path), targets=["count"], cache=cache)
+
+def table(tmp_path) -> str:
+    with open(tmp_path / "out" / "table.csv") as f:
+        return f.read()
+
+def test_unchanged_inputs_hit(tmp_path):
+    os.makedirs(tmp_path / "out")
+    assert run(tmp_path, "a\nb\n") == {"lines": 2}
+    assert RUNS == ["read", "count"]
+    assert run(tmp_path, "a\nb\n") == {"lines": 2}
+    assert RUNS == []
+
+def test_change_then_revert_rewrites_artifacts(tmp_path):
+    os.makedirs(tmp_path / "out")
+    run(tmp_path, "x1\nx2\n")
+    assert run(tmp_path, "y1\n") == {"lines": 1}
+    assert table(tmp_path) == "y1\n"
+
+    # Back to X: the cache holds X's outputs, but the table on disk was written for Y
+    assert run(tmp_path, "x1\nx2\n") == {"lines": 2}
+    assert "read" in RUNS
+    assert table(tmp_path) == "x1\nx2\n"
+
+def test_edited_or_missing_artifact_misses(tmp_path):
+    os.makedirs(tmp_path / "out")
+    run(tmp_path, "a\n")
+    with open(tmp_path / "out" / "table.csv", "w") as f:
+        f.write("edited by hand, longer\n")
+    run(tmp_path, "a\n")
+    assert RUNS == ["read"]
+    assert table(tmp_path) == "a\n"
+
+    os.remove(tmp_path / "out" / "table.csv")
+    run(tmp_path, "a\n")
+    assert RUNS == ["read"]
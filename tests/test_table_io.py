@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from table_io import read_table, replace_partitions, write_table
+
+def quarantine(months: list[str]) -> pd.DataFrame:
+    return pd.DataFrame({
+        "issue_month_start": pd.to_datetime(pd.Series(months, dtype=object)),
+        "loan_amount": pd.Series([1000.0] * len(months)),
+    })
+
+def test_empty_partitioned_table_exists(tmp_path):
+    paths = write_table(quarantine([]), "dq_quarantine", str(tmp_path), ["parquet"], partition_by="issue_month_start")
+    assert os.path.isdir(paths[0])
+
+    empty = read_table("dq_quarantine", str(tmp_path))
+    assert empty.empty and list(empty.columns) == ["issue_month_start", "loan_amount"]
+
+def test_replace_partitions_around_empty_table(tmp_path):
+    out = str(tmp_path)
+    write_table(quarantine([]), "dq_quarantine", out, ["parquet"], partition_by="issue_month_start")
+
+    replace_partitions(quarantine(["2018-01-01", "2018-02-01"]), "dq_quarantine", out, ["parquet"],
+                       partition_by="issue_month_start", replace_keys=["2018-01-01", "2018-02-01"])
+    loans = read_table("dq_quarantine", out)
+    assert len(loans) == 2 and loans["issue_month_start"].dt.month.tolist() == [1, 2]
+
+    replace_partitions(quarantine([]), "dq_quarantine", out, ["parquet"],
+                       partition_by="issue_month_start", replace_keys=["2018-01-01", "2018-02-01"])
+    assert read_table("dq_quarantine", out).empty